@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - a finite volume PDE solver in Python
+ #
+ #  FILE: "diagonalMatrix.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed by employees of the National Institute
+ # of Standards and Technology, an agency of the Federal Government.
+ # Pursuant to title 17 section 105 of the United States Code,
+ # works of NIST employees are not subject to copyright
+ # protection, and this software is considered to be in the public domain.
+ # FiPy is an experimental system.  NIST assumes no responsibility whatsoever
+ # for its use by other parties, and makes no guarantees, expressed
+ # or implied, about its quality, reliability, or any other characteristic.
+ # We would appreciate acknowledgement if the document is used.
+ #
+ # To the extent that NIST may hold copyright in countries other than the
+ # United States, you are hereby granted the non-exclusive irrevocable and
+ # unconditional right to print, publish, prepare derivative works and
+ # distribute this software, in any medium, or authorize others to do so on
+ # your behalf, on a royalty-free basis throughout the world.
+ #
+ # You may improve, modify, and create derivative works of the software or
+ # any portion of the software, and you may copy and distribute such
+ # modifications or works.  Modified works should carry a notice stating
+ # that you changed the software and should note the date and nature of any
+ # such change.  Please explicitly acknowledge the National Institute of
+ # Standards and Technology as the original source.
+ #
+ # This software can be redistributed and/or modified freely provided that
+ # any derivative works bear some notice that they are derived from it, and
+ # any modified versions bear some notice that they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+__docformat__ = 'restructuredtext'
+
+from fipy.matrices.sparseMatrix import _SparseMatrix
+from fipy.matrices.matrixFreeMatrix import _NotMatrixFreeError
+from fipy.tools import numerix
+
+__all__ = []
+
+class _DiagonalMatrix(_SparseMatrix):
+    r"""
+    Stands in for a sparse matrix while an explicit `Term` builds its
+    linear system. The diagonal is accumulated into a vector and the
+    off-diagonal entries are kept as unassembled triplets, which are
+    enough to form the products that explicit terms take with the old
+    value of the variable.
+
+        >>> from fipy import Grid1D
+        >>> from fipy.solvers import _MeshMatrix
+        >>> mesh = Grid1D(nx=3)
+        >>> x = numerix.array((1., 2., 4.))
+        >>> L = _MeshMatrix(mesh=mesh)
+        >>> LL = _DiagonalMatrix(mesh=mesh)
+        >>> for M in (L, LL):
+        ...     M.addAt((1., 2., 3.), (0, 1, 2), (1, 0, 2))
+        ...     M.addAtDiagonal(-1.)
+        >>> print numerix.allclose(L * x, LL * x)
+        True
+        >>> print numerix.allclose((3 * L - L) * x, (3 * LL - LL) * x)
+        True
+        >>> print LL.isDiagonal
+        False
+
+    Only a diagonal matrix can be inverted
+
+        >>> LL = _DiagonalMatrix(mesh=mesh)
+        >>> LL.addAt((1., 0., 3.), (0, 1, 2), (0, 0, 2))
+        >>> LL.addAtDiagonal(1.)
+        >>> print LL.isDiagonal
+        True
+        >>> print LL.diagonal
+        [ 2.  1.  4.]
+        >>> LL.take((0,), (1,))
+        Traceback (most recent call last):
+            ...
+        _NotMatrixFreeError: matrix entries are not stored
+    """
+
+    def __init__(self, mesh=None, bandwidth=0, sizeHint=None,
+                 numberOfVariables=1, numberOfEquations=1,
+                 diagonal=None, offDiagonal=None):
+        self.mesh = mesh
+        if diagonal is None:
+            diagonal = numerix.zeros((mesh.numberOfCells * numberOfVariables,), 'd')
+        self.diagonal = diagonal
+        if offDiagonal is None:
+            offDiagonal = []
+        self.offDiagonal = offDiagonal
+
+    def copy(self):
+        return self.__class__(mesh=self.mesh,
+                              diagonal=self.diagonal.copy(),
+                              offDiagonal=list(self.offDiagonal))
+
+    @property
+    def isDiagonal(self):
+        return len(self.offDiagonal) == 0
+
+    def addAt(self, values, id1, id2):
+        values, id1, id2 = [numerix.ravel(a) for a in numerix.broadcast_arrays(values, id1, id2)]
+        onDiagonal = (id1 == id2)
+        self.diagonal += numerix.bincount(id1[onDiagonal],
+                                          weights=values[onDiagonal],
+                                          minlength=len(self.diagonal))
+        offDiagonal = ~onDiagonal & (values != 0)
+        if offDiagonal.any():
+            self.offDiagonal.append((values[offDiagonal], id1[offDiagonal], id2[offDiagonal]))
+
+    def addAtDiagonal(self, values):
+        self.diagonal += values
+
+    def __iadd__(self, other):
+        if isinstance(other, _DiagonalMatrix):
+            self.diagonal += other.diagonal
+            self.offDiagonal += other.offDiagonal
+        elif other is not 0:
+            raise _NotMatrixFreeError, "sum with a stored matrix"
+        return self
+
+    def __add__(self, other):
+        return self.copy().__iadd__(other)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self + (-other)
+
+    def __rsub__(self, other):
+        return -self + other
+
+    def __isub__(self, other):
+        return self.__iadd__(-other)
+
+    def __neg__(self):
+        return self * -1
+
+    def __mul__(self, other):
+        if isinstance(other, _SparseMatrix):
+            raise _NotMatrixFreeError, "product of matrices"
+        elif numerix.shape(other) == ():
+            return self.__class__(mesh=self.mesh,
+                                  diagonal=self.diagonal * other,
+                                  offDiagonal=[(values * other, id1, id2)
+                                               for values, id1, id2 in self.offDiagonal])
+        else:
+            other = numerix.ravel(other)
+            product = self.diagonal * other
+            for values, id1, id2 in self.offDiagonal:
+                product += numerix.bincount(id1, weights=values * other[id2],
+                                            minlength=len(product))
+            return product
+
+    def __rmul__(self, other):
+        if isinstance(other, _SparseMatrix) or numerix.shape(other) != ():
+            raise _NotMatrixFreeError, "product from the left"
+        return self * other
+
+    def _notStored(self, *args):
+        raise _NotMatrixFreeError, "matrix entries are not stored"
+
+    put = putDiagonal = take = takeDiagonal = _notStored
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - a finite volume PDE solver in Python
+ #
+ #  FILE: "matrixFreeMatrix.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed by employees of the National Institute
+ # of Standards and Technology, an agency of the Federal Government.
+ # Pursuant to title 17 section 105 of the United States Code,
+ # works of NIST employees are not subject to copyright
+ # protection, and this software is considered to be in the public domain.
+ # FiPy is an experimental system.  NIST assumes no responsibility whatsoever
+ # for its use by other parties, and makes no guarantees, expressed
+ # or implied, about its quality, reliability, or any other characteristic.
+ # We would appreciate acknowledgement if the document is used.
+ #
+ # To the extent that NIST may hold copyright in countries other than the
+ # United States, you are hereby granted the non-exclusive irrevocable and
+ # unconditional right to print, publish, prepare derivative works and
+ # distribute this software, in any medium, or authorize others to do so on
+ # your behalf, on a royalty-free basis throughout the world.
+ #
+ # You may improve, modify, and create derivative works of the software or
+ # any portion of the software, and you may copy and distribute such
+ # modifications or works.  Modified works should carry a notice stating
+ # that you changed the software and should note the date and nature of any
+ # such change.  Please explicitly acknowledge the National Institute of
+ # Standards and Technology as the original source.
+ #
+ # This software can be redistributed and/or modified freely provided that
+ # any derivative works bear some notice that they are derived from it, and
+ # any modified versions bear some notice that they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+__docformat__ = 'restructuredtext'
+
+from fipy.matrices.sparseMatrix import _SparseMatrix
+from fipy.tools import numerix
+
+__all__ = []
+
+class _NotMatrixFreeError(NotImplementedError):
+    """Raised when building a `Term` needs more of its matrix than the
+    product with the vector the matrix is built for.
+    """
+    pass
+
+class _MatrixFreeMatrix(_SparseMatrix):
+    r"""
+    Stands in for a sparse matrix while a `Term` builds its linear
+    system. Rather than storing the entries it is given, it accumulates
+    the product of the matrix with the class attribute `vector`, so that
+    the residual :math:`\mathsf{L}\vec{x} - \vec{b}` costs about one
+    matrix-vector product.
+
+        >>> from fipy import Grid1D
+        >>> from fipy.solvers import _MeshMatrix
+        >>> mesh = Grid1D(nx=3)
+        >>> x = numerix.array((1., 2., 4.))
+        >>> L = _MeshMatrix(mesh=mesh)
+        >>> LL = _matrixFreeMatrixClass(x)(mesh=mesh)
+        >>> for M in (L, LL):
+        ...     M.addAt((1., 2., 3.), (0, 1, 2), (1, 0, 2))
+        ...     M.addAtDiagonal(-1.)
+        >>> print numerix.allclose(L * x, LL * x)
+        True
+        >>> print numerix.allclose((3 * L - L) * x, (3 * LL - LL) * x)
+        True
+
+    Anything else requires the matrix itself
+
+        >>> LL * (1., 1., 1.)
+        Traceback (most recent call last):
+            ...
+        _NotMatrixFreeError: product with a vector other than the one the matrix is built for
+        >>> LL * LL
+        Traceback (most recent call last):
+            ...
+        _NotMatrixFreeError: product of matrices
+        >>> LL.takeDiagonal()
+        Traceback (most recent call last):
+            ...
+        _NotMatrixFreeError: matrix entries are not stored
+    """
+
+    vector = None
+
+    def __init__(self, mesh=None, bandwidth=0, sizeHint=None,
+                 numberOfVariables=1, numberOfEquations=1, product=None):
+        self.mesh = mesh
+        if product is None:
+            product = numerix.zeros(self.vector.shape, 'd')
+        self.product = product
+
+    def copy(self):
+        return self.__class__(mesh=self.mesh, product=self.product.copy())
+
+    def addAt(self, values, id1, id2):
+        values = numerix.asarray(values) * self.vector[numerix.asarray(id2)]
+        self.product += numerix.bincount(numerix.asarray(id1).ravel(),
+                                         weights=values.ravel(),
+                                         minlength=len(self.product))
+
+    def addAtDiagonal(self, values):
+        values = numerix.array(values)
+        if values.shape not in ((), self.vector.shape):
+            raise _NotMatrixFreeError, "diagonal does not match the vector"
+        self.product += values * self.vector
+
+    def __iadd__(self, other):
+        self.product += self._productOf(other)
+        return self
+
+    def __add__(self, other):
+        return self.__class__(mesh=self.mesh, product=self.product + self._productOf(other))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self + (-other)
+
+    def __rsub__(self, other):
+        return -self + other
+
+    def __isub__(self, other):
+        return self.__iadd__(-other)
+
+    def __neg__(self):
+        return self.__class__(mesh=self.mesh, product=-self.product)
+
+    def __mul__(self, other):
+        if isinstance(other, _SparseMatrix):
+            raise _NotMatrixFreeError, "product of matrices"
+        elif numerix.shape(other) == ():
+            return self.__class__(mesh=self.mesh, product=self.product * other)
+        elif numerix.array_equal(numerix.ravel(other), self.vector):
+            return self.product.copy()
+        else:
+            raise _NotMatrixFreeError, "product with a vector other than the one the matrix is built for"
+
+    def __rmul__(self, other):
+        if isinstance(other, _SparseMatrix) or numerix.shape(other) != ():
+            raise _NotMatrixFreeError, "product from the left"
+        return self * other
+
+    def _productOf(self, other):
+        if isinstance(other, _MatrixFreeMatrix):
+            return other.product
+        elif other is 0:
+            return 0
+        else:
+            raise _NotMatrixFreeError, "sum with a stored matrix"
+
+    def _notStored(self, *args):
+        raise _NotMatrixFreeError, "matrix entries are not stored"
+
+    put = putDiagonal = take = takeDiagonal = _notStored
+
+def _matrixFreeMatrixClass(vector):
+    """
+    Return a `_MatrixFreeMatrix` class for the product with `vector`.
+    """
+    class _MatrixFreeMatrixClass(_MatrixFreeMatrix):
+        pass
+
+    _MatrixFreeMatrixClass.vector = vector
+
+    return _MatrixFreeMatrixClass
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -49,10 +49,13 @@ __docformat__ = 'restructuredtext'
 
 __all__ = []
 
+import zlib
+
 from pysparse import spmatrix
 from fipy.tools import numerix
 
 from fipy.matrices.sparseMatrix import _SparseMatrix
+from fipy.matrices.sparsityPattern import _getSparsityPattern
 
 class _PysparseMatrix(_SparseMatrix):
 
@@ -67,9 +70,6 @@ class _PysparseMatrix(_SparseMatrix):
         """
         self.matrix = matrix
 
-    def getCoupledClass(self):
-        return _CoupledPysparseMeshMatrix
-
     def copy(self):
         return _PysparseMatrix(matrix=self.matrix.copy())
 
@@ -281,6 +281,14 @@ class _PysparseMatrix(_SparseMatrix):
         """
         return self * x
 
+    @property
+    def _fingerprint(self):
+        """Cheap digest of the structure and values of the matrix, used
+        to decide whether a cached factorization can be reused.
+        """
+        return (self._shape,) + tuple(zlib.crc32(numerix.ascontiguousarray(arr))
+                                      for arr in self.matrix.find())
+
     def exportMmf(self, filename):
         """
         Exports the matrix to a Matrix Market file of the given filename.
@@ -319,7 +327,8 @@ class _PysparseMeshMatrix(_PysparseMatrixFromShape):
         :Parameters:
           - `mesh`: The `Mesh` to assemble the matrix for.
           - `bandwidth`: The proposed band width of the matrix.
-          - `sizeHint`: estimate of the number of non-zeros
+          - `sizeHint`: estimate of the number of non-zeros. Defaults to the
+            size of the mesh's cached sparsity pattern.
           - `matrix`: pre-assembled `ll_mat` to use for storage
           - `numberOfVariables`: The columns of the matrix is determined by numberOfVariables * self.mesh.numberOfCells.
           - `numberOfEquations`: The rows of the matrix is determined by numberOfEquations * self.mesh.numberOfCells.
@@ -330,6 +339,11 @@ class _PysparseMeshMatrix(_PysparseMatrixFromShape):
         self.numberOfEquations = numberOfEquations
         rows = numberOfEquations * self.mesh.numberOfCells
         cols = numberOfVariables * self.mesh.numberOfCells
+        if sizeHint is None and matrix is None:
+            ## preallocate storage for every entry the mesh can produce
+            sizeHint = _getSparsityPattern(mesh=self.mesh,
+                                           numberOfVariables=numberOfVariables,
+                                           numberOfEquations=numberOfEquations).nnz
         _PysparseMatrixFromShape.__init__(self, rows=rows, cols=cols, bandwidth=bandwidth, sizeHint=sizeHint, matrix=matrix, storeZeros=storeZeros)
 
     def __mul__(self, other):
@@ -50,10 +50,13 @@ __docformat__ = 'restructuredtext'
 
 __all__ = []
 
+import zlib
+
 import scipy.sparse as sp
 from fipy.tools import numerix
 
 from fipy.matrices.sparseMatrix import _SparseMatrix
+from fipy.matrices.sparsityPattern import _getSparsityPattern, _getStencilOffsets
 
 class _ScipyMatrix(_SparseMatrix):
 
@@ -67,13 +70,114 @@ class _ScipyMatrix(_SparseMatrix):
     def __init__(self, matrix):
         """Creates a `_ScipyMatrix`.
 
+        Contributions from `addAt()` and in-place addition that do not fit
+        the cached `_SparsityPattern`, or the diagonals of a DIA `matrix`,
+        are collected in an append-only COO buffer and only converted to
+        CSR, in a single pass, when `matrix` is next read.
+
         :Parameters:
           - `matrix`: The starting `spmatrix`
         """
         self.matrix = matrix
 
-    def getCoupledClass(self):
-        return _CoupledScipyMeshMatrix
+    _pattern = _patternMatrix = None
+
+    def _getMatrix(self):
+        if self._cooBuffer:
+            self._assemble()
+        return self._matrix
+
+    def _setMatrix(self, matrix):
+        self._matrix = matrix
+        self._cooBuffer = []
+
+    def _delMatrix(self):
+        del self._matrix
+        self._cooBuffer = []
+
+    matrix = property(_getMatrix, _setMatrix, _delMatrix)
+
+    def _assemble(self):
+        values, rows, cols = [numerix.concatenate(entries) for entries in zip(*self._cooBuffer)]
+        self._cooBuffer = []
+        self._matrix = self._matrix + sp.csr_matrix((values, (rows, cols)), self._matrix.shape)
+
+    def _addCOO(self, values, rows, cols):
+        """Scatter the (`values`, `rows`, `cols`) triples into the CSR data
+        array if they all fit the sparsity pattern, otherwise append them
+        to the COO buffer.
+        """
+        values = numerix.asarray(values, 'd').ravel()
+
+        if self._hasPattern():
+            positions = self._pattern._positions(rows, cols)
+            if positions is not None:
+                self._matrix.data += numerix.bincount(positions,
+                                                      weights=values,
+                                                      minlength=len(self._matrix.data))
+                return
+        elif self._matrix.format == "dia":
+            positions = self._diagonalPositions(rows, cols)
+            if positions is not None:
+                data = self._matrix.data
+                data += numerix.bincount(positions,
+                                         weights=values,
+                                         minlength=data.size).reshape(data.shape)
+                return
+
+        self._cooBuffer.append((values,
+                                numerix.asarray(rows).ravel(),
+                                numerix.asarray(cols).ravel()))
+
+    def _diagonalPositions(self, rows, cols):
+        """Return the offsets into the flattened data array of a DIA
+        `matrix` of the entries (`rows`, `cols`), or `None` if any of them
+        is not on one of its diagonals.
+        """
+        rows = numerix.asarray(rows).ravel()
+        cols = numerix.asarray(cols).ravel()
+        offsets = self._matrix.offsets
+        data = self._matrix.data
+
+        if len(rows) == 0:
+            return numerix.zeros((0,), 'int64')
+        elif len(offsets) == 0 or data.shape[1] != self._matrix.shape[1]:
+            return None
+
+        order = numerix.argsort(offsets)
+        sortedOffsets = offsets[order]
+        diagonals = numerix.searchsorted(sortedOffsets, cols - rows).clip(max=len(offsets) - 1)
+        if (sortedOffsets[diagonals] == cols - rows).all():
+            ## DIA data are indexed by column
+            return order[diagonals] * data.shape[1] + cols
+        else:
+            return None
+
+    def _hasSameDiagonals(self, other):
+        """Whether `self.matrix` and `other.matrix` are both DIA matrices
+        with the same diagonals, such that they can be combined directly in
+        their data arrays.
+        """
+        return (isinstance(other, _ScipyMatrix)
+                and self._matrix.format == "dia"
+                and other._matrix.format == "dia"
+                and self._matrix.data.shape == other._matrix.data.shape
+                and numerix.allequal(self._matrix.offsets, other._matrix.offsets))
+
+    def _hasPattern(self, other=None):
+        """Whether `self.matrix` (and `other.matrix`, if given) still has
+        the cached `_SparsityPattern` structure, such that values can be
+        combined directly in the CSR data arrays.
+        """
+        if self._pattern is None:
+            return False
+        elif self._matrix is not self._patternMatrix:
+            self._pattern = self._patternMatrix = None
+            return False
+        elif other is None:
+            return True
+        else:
+            return isinstance(other, _ScipyMatrix) and other._pattern is self._pattern and other._hasPattern()
 
     def copy(self):
         return _ScipyMatrix(matrix=self.matrix.copy())
@@ -89,13 +193,23 @@ class _ScipyMatrix(_SparseMatrix):
         return self._iadd(other)
 
     def _iadd(self, other, sign=1):
-        if hasattr(other, "matrix"):
+        if isinstance(other, _ScipyMatrix):
+            if self._hasPattern(other) or self._hasSameDiagonals(other):
+                self._matrix.data += sign * other._matrix.data
+            else:
+                coo = other._matrix.tocoo()
+                self._addCOO(sign * coo.data, coo.row, coo.col)
+            for values, rows, cols in other._cooBuffer:
+                self._addCOO(sign * values, rows, cols)
+        elif hasattr(other, "matrix"):
             self.matrix = self.matrix + (sign * other.matrix)
         elif type(other) in [float, int]:
-            fillVec = numerix.repeat(other, self.matrix.nnz)
+            ## a DIA matrix stores zeros, which `nonzero()` leaves out
+            nonzero = self.matrix.nonzero()
+            fillVec = numerix.repeat(other, len(nonzero[0]))
 
             self.matrix = self.matrix \
-                          + sp.csr_matrix((fillVec, self.matrix.nonzero()),
+                          + sp.csr_matrix((fillVec, nonzero),
                                           self.matrix.shape)
         else:
             self.matrix = self.matrix + (sign * other)
@@ -199,7 +313,7 @@ class _ScipyMatrix(_SparseMatrix):
 
     @property
     def _shape(self):
-        return self.matrix.shape
+        return self._matrix.shape
 
     @property
     def _range(self):
@@ -218,6 +332,18 @@ class _ScipyMatrix(_SparseMatrix):
         """
         assert(len(id1) == len(id2) == len(vector))
 
+        ## pending contributions must land before they are overwritten
+        matrix = self.matrix
+
+        if matrix.format == "dia":
+            matrix = self.matrix = matrix.tocsr()
+
+        if self._hasPattern():
+            positions = self._pattern._positions(id1, id2)
+            if positions is not None:
+                matrix.data[positions] = vector
+                return
+
         # done in such a way to vectorize everything
         tempVec = numerix.array(vector) - self.matrix[id1, id2].flat
         tempMat = sp.csr_matrix((tempVec, (id1, id2)), self.matrix.shape)
@@ -246,7 +372,17 @@ class _ScipyMatrix(_SparseMatrix):
         self.matrix.setdiag(vector)
 
     def take(self, id1, id2):
-        return self.matrix[id1, id2]
+        return self._indexable[id1, id2]
+
+    @property
+    def _indexable(self):
+        """`matrix`, converted to CSR if it is stored by diagonals, which
+        cannot be indexed.
+        """
+        matrix = self.matrix
+        if matrix.format == "dia":
+            matrix = matrix.tocsr()
+        return matrix
 
     def takeDiagonal(self):
         return self.matrix.diagonal()
@@ -262,12 +398,25 @@ class _ScipyMatrix(_SparseMatrix):
             12.300000  10.000000   3.000000  
                 ---     3.141593   2.960000  
              2.500000      ---     2.200000  
+
+        Contributions outside of a mesh's sparsity pattern are buffered
+        until the matrix is read
+
+            >>> L = _ScipyMatrixFromShape(size=3)
+            >>> L.addAt([1., 2.], [0, 1], [1, 2])
+            >>> L.addAt([3.], [0], [1])
+            >>> print len(L._cooBuffer)
+            2
+            >>> print numerix.allequal(L.numpyArray, [[0, 4, 0],
+            ...                                       [0, 0, 2],
+            ...                                       [0, 0, 0]])
+            True
+            >>> print len(L._cooBuffer)
+            0
         """
         assert(len(id1) == len(id2) == len(vector))
 
-        temp = sp.csr_matrix((vector, (id1, id2)), self.matrix.shape)
-
-        self.matrix = self.matrix + temp
+        self._addCOO(vector, id1, id2)
 
     def addAtDiagonal(self, vector):
         if type(vector) in [type(1), type(1.)]:
@@ -280,6 +429,22 @@ class _ScipyMatrix(_SparseMatrix):
     def numpyArray(self):
         return self.matrix.toarray()
 
+    @property
+    def _fingerprint(self):
+        """Cheap digest of the structure and values of the matrix, used
+        to decide whether a cached factorization can be reused.
+        """
+        matrix = self.matrix
+        if matrix.format == "dia":
+            # digest the diagonals as they are, rather than converting them
+            # for every solve
+            arrays = (matrix.data, matrix.offsets)
+        else:
+            matrix = matrix.asformat("csr")
+            arrays = (matrix.data, matrix.indices, matrix.indptr)
+        return (matrix.format, matrix.shape) + tuple(zlib.crc32(numerix.ascontiguousarray(arr))
+                                                     for arr in arrays)
+
     def matvec(self, x):
         """
         This method is required for scipy solvers.
@@ -287,7 +452,7 @@ class _ScipyMatrix(_SparseMatrix):
         return self * x
 
     def __getitem__(self, indices):
-        return self.matrix[indices]
+        return self._indexable[indices]
 
 class _ScipyMatrixFromShape(_ScipyMatrix):
 
@@ -324,8 +489,32 @@ class _ScipyMeshMatrix(_ScipyMatrixFromShape):
         self.numberOfVariables = numberOfVariables
         size = self.numberOfVariables * self.mesh.numberOfCells
         assert numberOfEquations == self.numberOfVariables
+
+        if (matrix is None and numberOfVariables == 1 and numberOfEquations == 1
+            and _getStencilOffsets(self.mesh) is not None):
+            ## the cells of a grid are numbered such that the matrix only
+            ## has the diagonals of the stencil, which can be stored and
+            ## multiplied without any index arrays
+            offsets = _getStencilOffsets(self.mesh)
+            matrix = sp.dia_matrix((numerix.zeros((len(offsets), size), 'd'), offsets),
+                                   shape=(size, size))
+        elif matrix is None:
+            pattern = _getSparsityPattern(mesh=self.mesh,
+                                          numberOfVariables=numberOfVariables,
+                                          numberOfEquations=numberOfEquations)
+            matrix = sp.csr_matrix((numerix.zeros((pattern.nnz,), 'd'), pattern.indices, pattern.indptr),
+                                   shape=pattern.shape)
+            ## let later matrices share scipy's own copy of the index arrays
+            pattern.indices, pattern.indptr = matrix.indices, matrix.indptr
+            self._pattern = pattern
+            self._patternMatrix = matrix
+
         _ScipyMatrixFromShape.__init__(self, size=size, matrix=matrix)
 
+    @classmethod
+    def getCoupledClass(cls):
+        return _CoupledScipyMeshMatrix
+
     def __mul__(self, other):
         if isinstance(other, _ScipyMeshMatrix):
             return _ScipyMeshMatrix(mesh=self.mesh,
@@ -394,9 +583,192 @@ class _ScipyMeshMatrix(_ScipyMatrixFromShape):
         >>> print numerix.allequal(numerix.array(m.matrix[nonZeroIdx]), numerix.array([1.0, 2.0]))
         True
 
+        Matrices built on the same mesh share their sparsity pattern and
+        are combined in place until an entry outside the pattern is
+        assembled
+
+        >>> from fipy import Grid1D, Tri2D
+        >>> from fipy.tools import serialComm
+        >>> mesh = Tri2D(nx=2, ny=1)
+        >>> L = _ScipyMeshMatrix(mesh=mesh)
+        >>> M = _ScipyMeshMatrix(mesh=mesh)
+        >>> L.addAt((1., 2., 3.), (0, 2, 1), (2, 0, 1))
+        >>> M.addAtDiagonal(1.)
+        >>> L += M
+        >>> print L._hasPattern(M)
+        True
+        >>> print numerix.allequal(L.numpyArray[:3, :3], [[1, 0, 1],
+        ...                                               [0, 4, 0],
+        ...                                               [2, 0, 1]])
+        True
+        >>> L.addAt((5.,), (0,), (1,))
+        >>> print numerix.allequal(L.numpyArray[:3, :3], [[1, 5, 1],
+        ...                                               [0, 4, 0],
+        ...                                               [2, 0, 1]])
+        True
+        >>> print L._hasPattern(M)
+        False
+
+        The matrices of a grid are stored by diagonals, which are likewise
+        combined in place
+
+        >>> mesh = Grid1D(nx=3, communicator=serialComm)
+        >>> L = _ScipyMeshMatrix(mesh=mesh)
+        >>> M = _ScipyMeshMatrix(mesh=mesh)
+        >>> L.addAt((1., 2., 3.), (0, 1, 2), (1, 0, 2))
+        >>> M.addAtDiagonal(1.)
+        >>> L += M
+        >>> print L.matrix.format, L._hasSameDiagonals(M)
+        dia True
+        >>> print numerix.allequal(L.numpyArray, [[1, 1, 0],
+        ...                                       [2, 1, 0],
+        ...                                       [0, 0, 4]])
+        True
+        >>> print numerix.allequal(L.take((0, 2), (1, 2)), [1, 4])
+        True
+        >>> L.addAt((5.,), (0,), (2,))
+        >>> print L.matrix.format
+        csr
+        >>> print numerix.allequal(L.numpyArray, [[1, 1, 5],
+        ...                                       [2, 1, 0],
+        ...                                       [0, 0, 4]])
+        True
+
+        Adding a scalar only touches the nonzero entries, even though the
+        diagonals also store zeros
+
+        >>> L = _ScipyMeshMatrix(mesh=mesh)
+        >>> L.addAt((1., 2.), (0, 1), (1, 0))
+        >>> L += 1
+        >>> print numerix.allequal(L.numpyArray, [[0, 2, 0],
+        ...                                       [3, 0, 0],
+        ...                                       [0, 0, 0]])
+        True
+
         """
         pass
 
+class _CoupledScipyMeshMatrix(_ScipyMeshMatrix):
+    """`_ScipyMeshMatrix` of coupled equations, made of
+    `numberOfEquations` x `numberOfVariables` blocks that each have the
+    size and sparsity pattern of a single variable on the mesh.
+
+    Each block is built as a scalar `_ScipyMeshMatrix` and added in place
+    into the coupled data array, through a map of its data onto the
+    coupled pattern that is computed once per mesh.
+
+        >>> from fipy import Grid1D
+        >>> from fipy.tools import serialComm
+        >>> mesh = Grid1D(nx=3, communicator=serialComm)
+        >>> L = _CoupledScipyMeshMatrix(mesh=mesh, numberOfVariables=2, numberOfEquations=2)
+        >>> block = _ScipyMeshMatrix(mesh=mesh)
+        >>> block.addAt((1., 2., 3.), (0, 1, 2), (1, 0, 2))
+        >>> L._addBlock(block, 1, 0)
+        >>> L._addBlock(block, 1, 0)
+        >>> L._addBlock(block, 0, 1)
+        >>> print L._hasPattern()
+        True
+        >>> print numerix.allequal(L.numpyArray, [[0, 0, 0, 0, 1, 0],
+        ...                                       [0, 0, 0, 2, 0, 0],
+        ...                                       [0, 0, 0, 0, 0, 3],
+        ...                                       [0, 2, 0, 0, 0, 0],
+        ...                                       [4, 0, 0, 0, 0, 0],
+        ...                                       [0, 0, 6, 0, 0, 0]])
+        True
+        >>> print numerix.allequal(L._block(1, 0).toarray(), [[0, 2, 0],
+        ...                                                   [4, 0, 0],
+        ...                                                   [0, 0, 6]])
+        True
+
+    Blocks with entries outside the pattern are added all the same
+
+        >>> block.addAt((5.,), (0,), (2,))
+        >>> L._addBlock(block, 0, 0)
+        >>> print numerix.allequal(L._block(0, 0).toarray(), [[0, 1, 5],
+        ...                                                   [2, 0, 0],
+        ...                                                   [0, 0, 3]])
+        True
+    """
+
+    def _addBlock(self, block, equationIndex, varIndex):
+        """Add the scalar matrix `block` into the (`equationIndex`,
+        `varIndex`) block of this matrix.
+        """
+        N = self.mesh.numberOfCells
+        rowOffset = equationIndex * N
+        colOffset = varIndex * N
+
+        positions = None
+        if self._hasPattern():
+            positions = self._blockPositions(block, equationIndex, varIndex)
+
+        if positions is not None:
+            positions, entries, (outside, rows, cols) = positions
+            data = block._matrix.data.ravel()
+            self._matrix.data[positions] += data[entries]
+            ## a DIA block can hold values that wrap around the mesh
+            values = data[outside]
+            nonzero = (values != 0)
+            if nonzero.any():
+                self._addCOO(values[nonzero], rows[nonzero] + rowOffset, cols[nonzero] + colOffset)
+        else:
+            coo = block._matrix.tocoo()
+            self._addCOO(coo.data, coo.row + rowOffset, coo.col + colOffset)
+
+        for values, rows, cols in block._cooBuffer:
+            self._addCOO(values, rows + rowOffset, cols + colOffset)
+
+    def _blockPositions(self, block, equationIndex, varIndex):
+        """Return the offsets into the coupled data array of the entries of
+        the data array of `block` that are part of the coupled pattern, the
+        indices of those entries, and the indices, rows and columns of the
+        entries that are not, or `None` if `block` has neither the
+        diagonals nor the sparsity pattern of a scalar matrix on the mesh.
+        """
+        if block._hasPattern():
+            kind = "csr"
+        elif (block._matrix.format == "dia"
+              and numerix.allequal(block._matrix.offsets, _getStencilOffsets(self.mesh))):
+            kind = "dia"
+        else:
+            return None
+
+        if not hasattr(self._pattern, "_blockPositions"):
+            self._pattern._blockPositions = {}
+
+        key = (kind, equationIndex, varIndex)
+        if key not in self._pattern._blockPositions:
+            N = self.mesh.numberOfCells
+            if kind == "csr":
+                rows = block._pattern._keys // N
+                cols = block._pattern._keys % N
+                entries = numerix.arange(len(rows))
+            else:
+                ## DIA data are indexed by column
+                offsets, cols = numerix.indices(block._matrix.data.shape)
+                rows = (cols - block._matrix.offsets[offsets]).ravel()
+                cols = cols.ravel()
+                entries = ((rows >= 0) & (rows < N)).nonzero()[0]
+                rows, cols = rows[entries], cols[entries]
+
+            keys = ((rows + equationIndex * N).astype('int64') * self._pattern.shape[1]
+                    + cols + varIndex * N)
+            positions = numerix.searchsorted(self._pattern._keys, keys).clip(max=self._pattern.nnz - 1)
+            inside = (self._pattern._keys[positions] == keys)
+            outside = ~inside
+            self._pattern._blockPositions[key] = (positions[inside], entries[inside],
+                                                  (entries[outside], rows[outside], cols[outside]))
+
+        return self._pattern._blockPositions[key]
+
+    def _block(self, equationIndex, varIndex):
+        """Return the (`equationIndex`, `varIndex`) block of the matrix, as
+        a scipy CSR matrix.
+        """
+        N = self.mesh.numberOfCells
+        return self.matrix.tocsr()[equationIndex * N:(equationIndex + 1) * N,
+                                   varIndex * N:(varIndex + 1) * N]
+
 class _ScipyIdentityMatrix(_ScipyMatrixFromShape):
     """
     Represents a sparse identity matrix for scipy.
@@ -74,6 +74,15 @@ class _SparseMatrix(object):
         else:
             return NotImplemented
 
+    @classmethod
+    def getCoupledClass(cls):
+        """Return the class of the matrices of coupled equations whose
+        (equation, variable) blocks are each built with this class, or
+        `None` if coupled equations must build every block at full size
+        with an `OffsetSparseMatrix`.
+        """
+        return None
+
     def copy(self):
         pass
 
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - a finite volume PDE solver in Python
+ #
+ #  FILE: "sparsityPattern.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed by employees of the National Institute
+ # of Standards and Technology, an agency of the Federal Government.
+ # Pursuant to title 17 section 105 of the United States Code,
+ # works of NIST employees are not subject to copyright
+ # protection, and this software is considered to be in the public domain.
+ # FiPy is an experimental system.  NIST assumes no responsibility whatsoever
+ # for its use by other parties, and makes no guarantees, expressed
+ # or implied, about its quality, reliability, or any other characteristic.
+ # We would appreciate acknowledgement if the document is used.
+ #
+ # To the extent that NIST may hold copyright in countries other than the
+ # United States, you are hereby granted the non-exclusive irrevocable and
+ # unconditional right to print, publish, prepare derivative works and
+ # distribute this software, in any medium, or authorize others to do so on
+ # your behalf, on a royalty-free basis throughout the world.
+ #
+ # You may improve, modify, and create derivative works of the software or
+ # any portion of the software, and you may copy and distribute such
+ # modifications or works.  Modified works should carry a notice stating
+ # that you changed the software and should note the date and nature of any
+ # such change.  Please explicitly acknowledge the National Institute of
+ # Standards and Technology as the original source.
+ #
+ # This software can be redistributed and/or modified freely provided that
+ # any derivative works bear some notice that they are derived from it, and
+ # any modified versions bear some notice that they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+__docformat__ = 'restructuredtext'
+
+__all__ = []
+
+from fipy.tools import numerix
+
+class _SparsityPattern(object):
+    """Symbolic (CSR) structure of the matrices assembled on a `Mesh`.
+
+    The pattern holds the diagonal and both pairings of the cells
+    adjacent to each interior face, repeated for every (equation,
+    variable) block. It depends only on the mesh topology, so it is
+    computed once per mesh and shared by every matrix built on that mesh.
+    Assembly then only needs to scatter values into a preallocated data
+    array.
+
+        >>> from fipy import Grid1D
+        >>> from fipy.tools import serialComm
+        >>> mesh = Grid1D(nx=3, communicator=serialComm)
+        >>> pattern = _getSparsityPattern(mesh=mesh)
+        >>> print pattern.indptr
+        [0 2 5 7]
+        >>> print pattern.indices
+        [0 1 0 1 2 1 2]
+        >>> print pattern._positions([1, 2, 0], [0, 1, 1])
+        [2 5 1]
+        >>> print pattern._positions([0, 0], [0, 2])
+        None
+        >>> _getSparsityPattern(mesh=mesh) is pattern
+        True
+
+    Coupled or vector equations fill every block.
+
+        >>> pattern = _getSparsityPattern(mesh=mesh, numberOfVariables=2, numberOfEquations=2)
+        >>> print pattern.shape
+        (6, 6)
+        >>> print pattern.nnz
+        28
+    """
+
+    def __init__(self, mesh, numberOfVariables=1, numberOfEquations=1):
+        N = mesh.numberOfCells
+        self.shape = (numberOfEquations * N, numberOfVariables * N)
+
+        id1, id2 = mesh._adjacentCellIDs
+        interiorFaces = mesh.interiorFaceIDs
+        id1 = numerix.take(id1, interiorFaces)
+        id2 = numerix.take(id2, interiorFaces)
+        ids = numerix.arange(N)
+
+        rows = numerix.concatenate((ids, id1, id2))
+        cols = numerix.concatenate((ids, id2, id1))
+
+        equations, variables = numerix.indices((numberOfEquations, numberOfVariables))
+        rows = (rows + N * equations.ravel()[..., numerix.newaxis]).ravel()
+        cols = (cols + N * variables.ravel()[..., numerix.newaxis]).ravel()
+
+        ## row-major keys of the unique entries are already in CSR order
+        self._keys = numerix.unique(rows.astype('int64') * self.shape[1] + cols)
+
+        if max(len(self._keys), self.shape[0], self.shape[1]) < 2**31:
+            indexType = 'int32'
+        else:
+            indexType = 'int64'
+
+        self.indices = (self._keys % self.shape[1]).astype(indexType)
+        rowCounts = numerix.bincount((self._keys // self.shape[1]).astype(indexType), minlength=self.shape[0])
+        self.indptr = numerix.concatenate(([0], numerix.cumsum(rowCounts))).astype(indexType)
+
+    @property
+    def nnz(self):
+        return len(self._keys)
+
+    def _positions(self, id1, id2):
+        """Return the offsets into the CSR data array of the entries
+        (`id1`, `id2`), or `None` if any of them is not part of the
+        pattern.
+        """
+        keys = numerix.asarray(id1).astype('int64') * self.shape[1] + numerix.asarray(id2)
+        if len(keys) == 0:
+            return numerix.zeros((0,), 'int64')
+        elif self.nnz == 0:
+            return None
+
+        positions = numerix.searchsorted(self._keys, keys).clip(max=self.nnz - 1)
+        if (self._keys[positions] == keys).all():
+            return positions
+        else:
+            return None
+
+def _getSparsityPattern(mesh, numberOfVariables=1, numberOfEquations=1):
+    """Return the `_SparsityPattern` of `mesh`, computing it on first use.
+    """
+    if not hasattr(mesh, '_sparsityPatterns'):
+        mesh._sparsityPatterns = {}
+
+    key = (numberOfVariables, numberOfEquations)
+    if key not in mesh._sparsityPatterns:
+        mesh._sparsityPatterns[key] = _SparsityPattern(mesh=mesh,
+                                                      numberOfVariables=numberOfVariables,
+                                                      numberOfEquations=numberOfEquations)
+
+    return mesh._sparsityPatterns[key]
+
+def _getStencilOffsets(mesh):
+    """Return the offsets of the diagonals of the matrices assembled on
+    `mesh`, or `None` if the cells are not numbered such that there are at
+    most the 3, 5 or 7 diagonals of the stencil of a 1D, 2D or 3D grid.
+    The offsets are computed on first use.
+
+        >>> from fipy import Grid2D, Tri2D
+        >>> from fipy.tools import serialComm
+        >>> print _getStencilOffsets(Grid2D(nx=3, ny=2, communicator=serialComm))
+        [ 0  1  3 -1 -3]
+        >>> print _getStencilOffsets(Tri2D(nx=3, ny=2))
+        None
+    """
+    if not hasattr(mesh, '_stencilOffsets'):
+        id1, id2 = mesh._adjacentCellIDs
+        interiorFaces = mesh.interiorFaceIDs
+        offsets = numerix.unique(abs(numerix.take(id2, interiorFaces)
+                                     - numerix.take(id1, interiorFaces)))
+        offsets = offsets[offsets != 0]
+        if len(offsets) <= mesh.dim:
+            mesh._stencilOffsets = numerix.concatenate(([0], offsets, -offsets))
+        else:
+            mesh._stencilOffsets = None
+
+    return mesh._stencilOffsets
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
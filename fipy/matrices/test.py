@@ -52,16 +52,18 @@ import fipy.tests.testProgram
 from fipy.solvers import solver
 
 if solver == 'trilinos':
-    docTestModuleNames = ('trilinosMatrix', 'pysparseMatrix')
+    docTestModuleNames = ('trilinosMatrix', 'pysparseMatrix', 'sparsityPattern')
 elif solver == 'no-pysparse':
-    docTestModuleNames = ('trilinosMatrix',)
+    docTestModuleNames = ('trilinosMatrix', 'sparsityPattern')
 elif solver == 'scipy' or solver == 'pyamg':
-    docTestModuleNames = ('scipyMatrix',)
+    docTestModuleNames = ('scipyMatrix', 'sparsityPattern')
 elif solver == 'pysparse':
-    docTestModuleNames = ('pysparseMatrix',)
+    docTestModuleNames = ('pysparseMatrix', 'sparsityPattern')
 else:
     raise ImportError, 'Unknown solver package %s' % solver
 
+docTestModuleNames += ('matrixFreeMatrix', 'diagonalMatrix')
+
 def _suite():
     return _LateImportDocTestSuite(docTestModuleNames=docTestModuleNames, base=__name__)
 
@@ -330,195 +330,19 @@ class AbstractMesh(object):
           A `dict` with 3 elements: the new mesh vertexCoords, faceVertexIDs, and cellFaceIDs.
         """
 
-        selfc = self._concatenableMesh
-        otherc = other._concatenableMesh
-
-        selfNumFaces = selfc.faceVertexIDs.shape[-1]
-        selfNumVertices = selfc.vertexCoords.shape[-1]
-        otherNumFaces = otherc.faceVertexIDs.shape[-1]
-        otherNumVertices = otherc.vertexCoords.shape[-1]
-        ## check dimensions
-        if(selfc.vertexCoords.shape[0] != otherc.vertexCoords.shape[0]):
-            raise MeshAdditionError, "Dimensions do not match"
-
-        ## compute vertex correlates
+        return _concatenatedMeshValues(meshes=(self, other),
+                                       resolution=resolution,
+                                       stacklevel=4)
 
+    def _concatenationFaces(self, concatenable):
+        """Mask of the faces of `concatenable`, the `_concatenableMesh` of
+        `self`, along which it is glued to other meshes.
         """
-        from fipy.tools.debug import PRINT
-        PRINT("selfNumFaces", selfNumFaces)
-        PRINT("otherNumFaces", otherNumVertices)
-        PRINT("selfNumVertices", selfNumVertices)
-        PRINT("otherNumVertices", otherNumVertices)
-
-        from fipy.tools.debug import PRINT
-        from fipy.tools.debug import PRINT
-        PRINT("otherExt", otherc.exteriorFaces.value)
-        raw_input()
-        PRINT("selfExt", selfc.exteriorFaces.value)
-
-        PRINT("self filled", selfc.faceVertexIDs.filled())
-        PRINT("othe filled", otherc.faceVertexIDs.filled())
-        raw_input()
-
-        PRINT("selfc.faceVertexIDs.filled()\n",selfc.faceVertexIDs.filled())
-        PRINT("flat\n",selfc.faceVertexIDs.filled()[...,
-            selfc.exteriorFaces.value].flatten())
-        PRINT("selfc.exteriorFaces.value\n",selfc.exteriorFaces.value)
-        PRINT("extfaces type", type(selfc.exteriorFaces))
-        PRINT("extfaces mesh", selfc.exteriorFaces.mesh)
-        """
-
         ## only try to match along the operation manifold
         if hasattr(self, "opManifold"):
-            self_faces = self.opManifold(selfc)
+            return self.opManifold(concatenable)
         else:
-            self_faces = selfc.exteriorFaces.value
-        if hasattr(other, "opManifold"):
-            other_faces = other.opManifold(otherc)
-        else:
-            other_faces = otherc.exteriorFaces.value
-
-        ## only try to match exterior (X) vertices
-        self_Xvertices = numerix.unique(selfc.faceVertexIDs.filled()[...,
-            self_faces].flatten())
-        other_Xvertices = numerix.unique(otherc.faceVertexIDs.filled()[...,
-            other_faces].flatten())
-
-        self_XvertexCoords = selfc.vertexCoords[..., self_Xvertices]
-        other_XvertexCoords = otherc.vertexCoords[..., other_Xvertices]
-
-        closest = numerix.nearest(self_XvertexCoords, other_XvertexCoords)
-
-        # just because they're closest, doesn't mean they're close
-        tmp = self_XvertexCoords[..., closest] - other_XvertexCoords
-        distance = numerix.sqrtDot(tmp, tmp)
-        # only want vertex pairs that are 100x closer than the smallest
-        # cell-to-cell distance
-        close = distance < resolution * min(selfc._cellToCellDistances.min(),
-                                            otherc._cellToCellDistances.min())
-        vertexCorrelates = numerix.array((self_Xvertices[closest[close]],
-                                          other_Xvertices[close]))
-
-        # warn if meshes don't touch, but allow it
-        if (selfc._numberOfVertices > 0
-            and otherc._numberOfVertices > 0
-            and vertexCorrelates.shape[-1] == 0):
-            import warnings
-            warnings.warn("Vertices are not aligned", UserWarning, stacklevel=4)
-
-        ## compute face correlates
-
-        # ensure that both sets of faceVertexIDs have the same maximum number of (masked) elements
-        self_faceVertexIDs = selfc.faceVertexIDs
-        other_faceVertexIDs = otherc.faceVertexIDs
-
-        diff = self_faceVertexIDs.shape[0] - other_faceVertexIDs.shape[0]
-        if diff > 0:
-            other_faceVertexIDs = numerix.append(other_faceVertexIDs,
-                                                 -1 * numerix.ones((diff,)
-                                                                   + other_faceVertexIDs.shape[1:], 'l'),
-                                                 axis=0)
-            other_faceVertexIDs = MA.masked_values(other_faceVertexIDs, -1)
-        elif diff < 0:
-            self_faceVertexIDs = numerix.append(self_faceVertexIDs,
-                                                -1 * numerix.ones((-diff,)
-                                                                  + self_faceVertexIDs.shape[1:], 'l'),
-                                                axis=0)
-            self_faceVertexIDs = MA.masked_values(self_faceVertexIDs, -1)
-
-        # want self's Faces for which all faceVertexIDs are in vertexCorrelates
-        self_matchingFaces = numerix.in1d(self_faceVertexIDs,
-                                          vertexCorrelates[0]).reshape(self_faceVertexIDs.shape).all(axis=0).nonzero()[0]
-
-        # want other's Faces for which all faceVertexIDs are in vertexCorrelates
-        other_matchingFaces = numerix.in1d(other_faceVertexIDs,
-                                           vertexCorrelates[1]).reshape(other_faceVertexIDs.shape).all(axis=0).nonzero()[0]
-
-        # map other's Vertex IDs to new Vertex IDs,
-        # accounting for overlaps with self's Vertex IDs
-        vertex_map = numerix.empty(otherNumVertices, dtype=numerix.INT_DTYPE)
-        verticesToAdd = numerix.delete(numerix.arange(otherNumVertices), vertexCorrelates[1])
-        vertex_map[verticesToAdd] = numerix.arange(otherNumVertices - len(vertexCorrelates[1])) + selfNumVertices
-        vertex_map[vertexCorrelates[1]] = vertexCorrelates[0]
-
-        # calculate hashes of faceVertexIDs for comparing Faces
-
-        if self_matchingFaces.shape[-1] == 0:
-            self_faceHash = numerix.empty(self_matchingFaces.shape[:-1] + (0,), dtype="str")
-        else:
-            # sort each of self's Face's vertexIDs for canonical comparison
-            self_faceHash = numerix.sort(self_faceVertexIDs[..., self_matchingFaces], axis=0)
-            # then hash the Faces for comparison (NumPy set operations are only for 1D arrays)
-            self_faceHash = numerix.apply_along_axis(str, axis=0, arr=self_faceHash)
-
-        face_sort = numerix.argsort(self_faceHash)
-        self_faceHash = self_faceHash[face_sort]
-        self_matchingFaces = self_matchingFaces[face_sort]
-
-        if other_matchingFaces.shape[-1] == 0:
-            other_faceHash = numerix.empty(other_matchingFaces.shape[:-1] + (0,), dtype="str")
-        else:
-            # convert each of other's Face's vertexIDs to new IDs
-            other_faceHash = vertex_map[other_faceVertexIDs[..., other_matchingFaces]]
-            # sort each of other's Face's vertexIDs for canonical comparison
-            other_faceHash = numerix.sort(other_faceHash, axis=0)
-            # then hash the Faces for comparison (NumPy set operations are only for 1D arrays)
-            other_faceHash = numerix.apply_along_axis(str, axis=0, arr=other_faceHash)
-
-        face_sort = numerix.argsort(other_faceHash)
-        other_faceHash = other_faceHash[face_sort]
-        other_matchingFaces = other_matchingFaces[face_sort]
-
-        self_matchingFaces = self_matchingFaces[numerix.in1d(self_faceHash,
-                                                             other_faceHash)]
-        other_matchingFaces = other_matchingFaces[numerix.in1d(other_faceHash,
-                                                               self_faceHash)]
-
-        faceCorrelates = numerix.array((self_matchingFaces,
-                                        other_matchingFaces))
-
-        # warn if meshes don't touch, but allow it
-        if (selfc.numberOfFaces > 0
-            and otherc.numberOfFaces > 0
-            and faceCorrelates.shape[-1] == 0):
-            import warnings
-            warnings.warn("Faces are not aligned", UserWarning, stacklevel=4)
-
-        # map other's Face IDs to new Face IDs,
-        # accounting for overlaps with self's Face IDs
-        face_map = numerix.empty(otherNumFaces, dtype=numerix.INT_DTYPE)
-        facesToAdd = numerix.delete(numerix.arange(otherNumFaces), faceCorrelates[1])
-        face_map[facesToAdd] = numerix.arange(otherNumFaces - len(faceCorrelates[1])) + selfNumFaces
-        face_map[faceCorrelates[1]] = faceCorrelates[0]
-
-        other_faceVertexIDs = vertex_map[otherc.faceVertexIDs[..., facesToAdd]]
-
-        # ensure that both sets of cellFaceIDs have the same maximum number of (masked) elements
-        self_cellFaceIDs = selfc.cellFaceIDs
-        other_cellFaceIDs = face_map[otherc.cellFaceIDs]
-        diff = self_cellFaceIDs.shape[0] - other_cellFaceIDs.shape[0]
-        if diff > 0:
-            other_cellFaceIDs = numerix.append(other_cellFaceIDs,
-                                               -1 * numerix.ones((diff,)
-                                                                 + other_cellFaceIDs.shape[1:], 'l'),
-                                               axis=0)
-            other_cellFaceIDs = MA.masked_values(other_cellFaceIDs, -1)
-        elif diff < 0:
-            self_cellFaceIDs = numerix.append(self_cellFaceIDs,
-                                              -1 * numerix.ones((-diff,)
-                                                                + self_cellFaceIDs.shape[1:], 'l'),
-                                              axis=0)
-            self_cellFaceIDs = MA.masked_values(self_cellFaceIDs, -1)
-
-        # concatenate everything and return
-        return {
-            'vertexCoords': numerix.concatenate((selfc.vertexCoords,
-                                                 otherc.vertexCoords[..., verticesToAdd]), axis=1),
-            'faceVertexIDs': numerix.concatenate((self_faceVertexIDs,
-                                                  other_faceVertexIDs), axis=1),
-            'cellFaceIDs': MA.concatenate((self_cellFaceIDs,
-                                           other_cellFaceIDs), axis=1)
-            }
+            return concatenable.exteriorFaces.value
 
     """
     Topology -- maybe should be elsewhere?
@@ -977,6 +801,97 @@ class AbstractMesh(object):
 
     __radd__ = __add__
 
+    def renumbered(self, ordering="rcm"):
+        """
+        Return a copy of the `Mesh` with its cells, and its faces, numbered
+        such that neighboring cells have nearby IDs.
+
+        Meshes read from Gmsh or concatenated from several pieces are
+        numbered in whatever order their cells were created, which gives
+        matrices with a large bandwidth, more fill-in for the incomplete
+        and direct factorizations, and scattered memory accesses when
+        gathering face values for each cell.
+
+        :Parameters:
+          - `ordering`: "rcm" for the reverse Cuthill-McKee ordering of the
+            cell connectivity, which minimizes the bandwidth, or "morton"
+            for a Z-order space-filling curve through the cell centers.
+
+        The faces are renumbered in the order of the cells they bound.
+        The cell and face at position `i` of the renumbered mesh are the
+        `originalCellIDs[i]` and `originalFaceIDs[i]` of the original mesh
+
+        >>> from fipy import *
+        >>> mesh = Grid1D(nx=2) + (Grid1D(nx=2) - ((2,),))
+        >>> print mesh.cellCenters
+        [[ 0.5  1.5 -1.5 -0.5]]
+        >>> renumbered = mesh.renumbered()
+        >>> print renumbered.originalCellIDs
+        [2 3 0 1]
+        >>> print renumbered.cellCenters
+        [[-1.5 -0.5  0.5  1.5]]
+        >>> print numerix.allequal(renumbered.cellCenters,
+        ...                        mesh.cellCenters[..., renumbered.originalCellIDs])
+        True
+        >>> print numerix.allequal(renumbered.faceCenters,
+        ...                        mesh.faceCenters[..., renumbered.originalFaceIDs])
+        True
+
+        so values are carried over from the original mesh with
+
+        >>> x = CellVariable(mesh=renumbered,
+        ...                  value=mesh.x.value[renumbered.originalCellIDs])
+
+        and back with
+
+        >>> print x.value[numerix.argsort(renumbered.originalCellIDs)]
+        [ 0.5  1.5 -1.5 -0.5]
+
+        A mesh numbered along a space-filling curve
+
+        >>> mesh = Grid2D(nx=4, ny=4)
+        >>> print mesh.renumbered(ordering="morton").originalCellIDs
+        [ 0  1  4  5  2  3  6  7  8  9 12 13 10 11 14 15]
+
+        Any other ordering is an error
+
+        >>> mesh.renumbered(ordering="hilbert")
+        Traceback (most recent call last):
+        ...
+        ValueError: unknown ordering: hilbert
+
+        As for concatenation, the renumbered mesh is not partitioned.
+        """
+        mesh = self._concatenableMesh
+
+        if ordering == "rcm":
+            cellIDs = _reverseCuthillMcKeeCellIDs(mesh)
+        elif ordering == "morton":
+            cellIDs = _mortonCellIDs(mesh)
+        else:
+            raise ValueError("unknown ordering: %s" % ordering)
+
+        newCellIDs = numerix.argsort(cellIDs)
+
+        ## sort the faces by the lower, then the higher, of the new IDs of
+        ## the cells on either side of them
+        faceCellIDs = numerix.take(newCellIDs, mesh._adjacentCellIDs)
+        faceIDs = numerix.lexsort((faceCellIDs.max(axis=0),
+                                   faceCellIDs.min(axis=0)))
+        newFaceIDs = numerix.argsort(faceIDs)
+
+        cellFaceIDs = MA.take(mesh.cellFaceIDs, cellIDs, axis=1)
+        cellFaceIDs = MA.array(numerix.take(newFaceIDs, MA.filled(cellFaceIDs, 0)),
+                               mask=MA.getmask(cellFaceIDs))
+
+        renumbered = self._concatenatedClass(vertexCoords=mesh.vertexCoords,
+                                             faceVertexIDs=MA.take(mesh.faceVertexIDs, faceIDs, axis=1),
+                                             cellFaceIDs=cellFaceIDs)
+        renumbered.originalCellIDs = cellIDs
+        renumbered.originalFaceIDs = faceIDs
+
+        return renumbered
+
     def __mul__(self, other):
         raise NotImplementedError
 
@@ -1176,6 +1091,198 @@ class AbstractMesh(object):
             return float((yCoords.max() - yCoords.min()) / (xCoords.max() - xCoords.min()))
 
 
+def _reverseCuthillMcKeeCellIDs(mesh):
+    from scipy import sparse
+    from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+    id1, id2 = mesh._adjacentCellIDs
+    ## exterior faces would count as neighbors in choosing where to start
+    interior = (id1 != id2)
+    connectivity = sparse.csr_matrix((numerix.ones(interior.sum(), 'b'),
+                                      (id1[interior], id2[interior])),
+                                     shape=(mesh.numberOfCells, mesh.numberOfCells))
+
+    return reverse_cuthill_mckee(connectivity, symmetric_mode=False).astype(numerix.INDEX_DTYPE)
+
+def _mortonCellIDs(mesh):
+    """Sort the cells along a Z-order curve, by interleaving the bits of
+    their center coordinates quantized to the bounding box of the mesh.
+    """
+    centers = numerix.array(mesh.cellCenters.numericValue, 'd')
+    if centers.shape[-1] == 0:
+        return numerix.arange(0, dtype=numerix.INDEX_DTYPE)
+
+    ## the quantized coordinates must be exact in double precision
+    bits = min(63 // mesh.dim, 52)
+    lower = centers.min(axis=-1)[..., numerix.newaxis]
+    extent = centers.max(axis=-1)[..., numerix.newaxis] - lower
+    extent[extent == 0] = 1.
+    quantized = ((centers - lower) / extent * (2**bits - 1)).astype('uint64')
+
+    keys = numerix.zeros(centers.shape[-1], 'uint64')
+    for bit in range(bits):
+        for axis in range(mesh.dim):
+            keys |= ((quantized[axis] >> numerix.uint64(bit)) & numerix.uint64(1)) << numerix.uint64(bit * mesh.dim + axis)
+
+    return numerix.argsort(keys, kind="mergesort").astype(numerix.INDEX_DTYPE)
+
+def _concatenatedMeshValues(meshes, resolution=1e-2, stacklevel=3):
+    """Calculate the parameters to define the concatenation of `meshes`
+
+    Vertices on the exterior of each mesh are merged with the first
+    coincident vertex of any of the preceding meshes, and then faces with
+    the same vertices as a face of a preceding mesh are merged with it.
+    The vertices, faces and cells of the first mesh keep their IDs and
+    those of each subsequent mesh are numbered after them.
+
+    :Parameters:
+      - `meshes`: The sequence of :class:`~fipy.meshes.Mesh` objects to concatenate
+      - `resolution`: How close vertices have to be (relative to the smallest
+        cell-to-cell distance in any of the meshes) to be considered the same
+
+    :Returns:
+      A `dict` with 3 elements: the new mesh vertexCoords, faceVertexIDs, and cellFaceIDs.
+    """
+    concatenable = [mesh._concatenableMesh for mesh in meshes]
+
+    ## check dimensions
+    if len(set(mesh.vertexCoords.shape[0] for mesh in concatenable)) > 1:
+        raise MeshAdditionError, "Dimensions do not match"
+
+    numberOfVertices = numerix.array([mesh.vertexCoords.shape[-1] for mesh in concatenable])
+    numberOfFaces = numerix.array([mesh.faceVertexIDs.shape[-1] for mesh in concatenable])
+    vertexOffsets = numerix.concatenate(([0], numberOfVertices.cumsum()))
+    faceOffsets = numerix.concatenate(([0], numberOfFaces.cumsum()))
+    vertexMeshes = numerix.repeat(numerix.arange(len(meshes)), numberOfVertices)
+    faceMeshes = numerix.repeat(numerix.arange(len(meshes)), numberOfFaces)
+
+    def stack(IDs, offsets):
+        ## shift each mesh's IDs by `offsets`, padding them all to the same
+        ## maximum number of (-1) elements
+        rows = max(ids.shape[0] for ids in IDs)
+        stacked = []
+        for ids, offset in zip(IDs, offsets):
+            ids = MA.filled(ids, -1)
+            ids = numerix.where(ids == -1, -1, ids + offset)
+            padding = -numerix.ones((rows - ids.shape[0],) + ids.shape[1:], 'l')
+            stacked.append(numerix.concatenate((ids, padding), axis=0))
+        return numerix.concatenate(stacked, axis=1)
+
+    vertexCoords = numerix.concatenate([mesh.vertexCoords for mesh in concatenable], axis=1)
+    faceVertexIDs = stack([mesh.faceVertexIDs for mesh in concatenable], vertexOffsets)
+    cellFaceIDs = stack([mesh.cellFaceIDs for mesh in concatenable], faceOffsets)
+
+    ## compute vertex correlates, only trying to match exterior (X) vertices
+    Xvertices = numerix.unique(numerix.concatenate(
+        [faceVertexIDs[..., offset:offset + N][..., mesh._concatenationFaces(meshc)].flatten()
+         for mesh, meshc, offset, N in zip(meshes, concatenable, faceOffsets, numberOfFaces)]))
+    Xvertices = Xvertices[Xvertices >= 0]
+
+    cellToCellDistances = [mesh._cellToCellDistances.min()
+                           for mesh in concatenable if mesh.numberOfCells > 0]
+    if len(cellToCellDistances) > 0:
+        tolerance = resolution * min(cellToCellDistances)
+    else:
+        tolerance = 0.
+
+    firstVertices = numerix.arange(vertexCoords.shape[-1])
+    firstVertices[Xvertices] = Xvertices[_coincidentVertexIDs(vertexCoords[..., Xvertices],
+                                                              groups=vertexMeshes[Xvertices],
+                                                              tolerance=tolerance)]
+    vertexIDs = _renumberCoincident(firstVertices)
+
+    ## compute face correlates among the faces of the renumbered vertices
+    faceVertexIDs = numerix.where(faceVertexIDs == -1, -1, vertexIDs[faceVertexIDs])
+    firstFaces = _firstOfEqualKeys(numerix.sort(faceVertexIDs, axis=0))
+    firstFaces = numerix.where(faceMeshes[firstFaces] < faceMeshes,
+                               firstFaces, numerix.arange(len(firstFaces)))
+    faceIDs = _renumberCoincident(firstFaces)
+
+    # warn if meshes don't touch, but allow it
+    import warnings
+    for k in range(1, len(meshes)):
+        for first, IDs, name in ((firstVertices, vertexOffsets, "Vertices"),
+                                 (firstFaces, faceOffsets, "Faces")):
+            if (IDs[k] > 0 and IDs[k + 1] > IDs[k]
+                and (first[IDs[k]:IDs[k + 1]] == numerix.arange(IDs[k], IDs[k + 1])).all()):
+                warnings.warn("%s are not aligned" % name, UserWarning, stacklevel=stacklevel)
+
+    # concatenate everything and return
+    return {
+        'vertexCoords': vertexCoords[..., firstVertices == numerix.arange(len(firstVertices))],
+        'faceVertexIDs': MA.masked_values(faceVertexIDs[..., firstFaces == numerix.arange(len(firstFaces))], -1),
+        'cellFaceIDs': MA.masked_values(numerix.where(cellFaceIDs == -1, -1, faceIDs[cellFaceIDs]), -1)
+        }
+
+def _firstOfEqualKeys(keys):
+    """Return, for each column of the (K, N) integer `keys`, the index of
+    the first column equal to it.
+
+        >>> print _firstOfEqualKeys(numerix.array([[1, 2, 1, 3, 2],
+        ...                                        [0, 0, 0, 1, 0]]))
+        [0 1 0 3 1]
+    """
+    N = keys.shape[-1]
+    if N == 0:
+        return numerix.arange(0)
+
+    ## lexsort is stable, so each run of equal keys starts with its first column
+    order = numerix.lexsort(keys[::-1])
+    sortedKeys = keys[..., order]
+    starts = numerix.concatenate(([True], (sortedKeys[..., 1:] != sortedKeys[..., :-1]).any(axis=0)))
+    first = numerix.empty(N, dtype=order.dtype)
+    first[order] = order[numerix.maximum.accumulate(numerix.where(starts, numerix.arange(N), 0))]
+
+    return first
+
+def _coincidentVertexIDs(coords, groups, tolerance):
+    """Return, for each of the (D, N) vertex `coords`, the index of the
+    first vertex of a preceding one of the ascending `groups` that lies
+    within `tolerance` of it, or its own index if there is none.
+
+    Rather than comparing all pairs of vertices, the coordinates are hashed
+    into bins twice the size of `tolerance`, on each of the `2**D` grids
+    offset by `tolerance` along some of the axes, so that any two
+    coincident vertices share a bin on at least one of them.
+
+        >>> coords = numerix.array([[0., 1., 1.001, 0.999, 2.],
+        ...                         [0., 0., 0.,    0.,    0.]])
+        >>> print _coincidentVertexIDs(coords, groups=numerix.array([0, 0, 1, 1, 1]),
+        ...                            tolerance=0.01)
+        [0 1 1 1 4]
+    """
+    D, N = coords.shape
+    IDs = numerix.arange(N)
+    if N == 0 or tolerance <= 0:
+        return IDs
+
+    first = IDs.copy()
+    scaled = (coords - coords.min(axis=-1)[..., numerix.newaxis]) / (2 * tolerance)
+    for grid in range(2**D):
+        offsets = numerix.array([(grid >> axis) & 1 for axis in range(D)]) * 0.5
+        candidates = _firstOfEqualKeys(numerix.floor(scaled + offsets[..., numerix.newaxis]).astype('int64'))
+        distances = numerix.sqrtDot(coords[..., candidates] - coords, coords[..., candidates] - coords)
+        coincident = (distances < tolerance) & (groups[candidates] < groups)
+        first = numerix.minimum(first, numerix.where(coincident, candidates, IDs))
+
+    ## follow chains of coincident vertices back to the first of them
+    while (first[first] != first).any():
+        first = first[first]
+
+    return first
+
+def _renumberCoincident(first):
+    """Return new IDs for elements that are merged with the `first` one
+    they coincide with, numbering the remaining elements in order.
+
+        >>> print _renumberCoincident(numerix.array([0, 1, 1, 3, 0]))
+        [0 1 1 2 0]
+    """
+    kept = (first == numerix.arange(len(first)))
+    IDs = numerix.cumsum(kept) - 1
+
+    return IDs[first]
+
 def _madmin(x):
     if len(x) == 0:
         return 0
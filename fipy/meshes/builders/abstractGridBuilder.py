@@ -59,7 +59,7 @@ class _AbstractGridBuilder(object):
     NumPtsCalcClass = None
 
     def buildGridData(self, ds, ns, overlap, communicator,
-                            cacheOccupiedNodes=False):
+                            cacheOccupiedNodes=False, processGrid=None):
         """
         Build and save any information relevant to the construction of a grid.
         Generalized to handle any dimension. Has side-effects.
@@ -81,6 +81,9 @@ class _AbstractGridBuilder(object):
             - `ds` - A list containing grid spacing information, e.g. [dx, dy]
             - `ns` - A list containing number of grid points, e.g. [nx, ny, nz]
             - `overlap`
+            - `processGrid` - The number of processes along each axis,
+              e.g. [px, py, pz], whose product must be the number of
+              processes. If `None`, chosen by `_calcProcessGrid`.
         """
 
         dim = len(ns)
@@ -109,6 +112,7 @@ class _AbstractGridBuilder(object):
 
         newNs = self._calcNs(ns, newDs)
 
+        globalNs = newNs
         globalNumCells = reduce(self._mult, newNs)
         globalNumFaces = self._calcGlobalNumFaces(newNs)
 
@@ -121,28 +125,51 @@ class _AbstractGridBuilder(object):
         procID = communicator.procID
         Nproc = communicator.Nproc
 
-        overlap = min(overlap, newNs[-1])
-        cellsPerNode = max(newNs[-1] // Nproc, overlap)
-        occupiedNodes = min(newNs[-1] // (cellsPerNode or 1), Nproc)
+        if processGrid is None:
+            processGrid = self._calcProcessGrid(newNs, overlap, Nproc)
+        elif len(processGrid) != dim or reduce(self._mult, processGrid) != Nproc:
+            raise ValueError("processGrid %s does not divide %d processes among %d dimensions"
+                             % (str(processGrid), Nproc, dim))
 
-        (firstOverlap,
-         secOverlap,
-         overlap) = self._buildOverlap(overlap, procID, occupiedNodes)
+        # position of this process in the process grid, x varying fastest
+        procIDs = []
+        for p in processGrid:
+            procIDs.append(procID % p)
+            procID //= p
 
-        offsetArg = min(procID, occupiedNodes-1) * cellsPerNode - firstOverlap
-        offset = self._packOffset(offsetArg)
+        firstOverlaps = []
+        secOverlaps = []
+        offsets = []
+        occupiedNodes = 1
 
-        """
-        local nx, [ny, [nz]] calculation
-        """
-        local_n = cellsPerNode * (procID < occupiedNodes)
+        for axis, (n, p, ID) in enumerate(zip(newNs, processGrid, procIDs)):
+            """
+            local nx, [ny, [nz]] calculation
+            """
+            axisOverlap = min(overlap, n)
+            cellsPerNode = max(n // p, axisOverlap)
+            axisOccupiedNodes = min(n // (cellsPerNode or 1), p)
+
+            (firstOverlap,
+             secOverlap) = self._buildOverlap(axisOverlap, ID, axisOccupiedNodes)
+
+            offsets.append(min(ID, axisOccupiedNodes - 1) * cellsPerNode - firstOverlap)
+
+            local_n = cellsPerNode * (ID < axisOccupiedNodes)
 
-        if procID == occupiedNodes - 1:
-            local_n += (newNs[-1] - cellsPerNode * occupiedNodes)
+            if ID == axisOccupiedNodes - 1:
+                local_n += (n - cellsPerNode * axisOccupiedNodes)
 
-        local_n += firstOverlap + secOverlap
+            newNs[axis] = local_n + firstOverlap + secOverlap
 
-        newNs = tuple(newNs[:-1] + [local_n])
+            firstOverlaps.append(firstOverlap)
+            secOverlaps.append(secOverlap)
+            occupiedNodes *= axisOccupiedNodes
+
+        overlap = self._packOverlap(firstOverlaps, secOverlaps)
+        offset = self._packOffset(offsets)
+
+        newNs = tuple(newNs)
 
         """
         post-parallel
@@ -172,6 +199,7 @@ class _AbstractGridBuilder(object):
         self.scale   = scale
 
         self.globalNumberOfCells = globalNumCells
+        self.globalNs = tuple(globalNs)
         self.globalNumberOfFaces = globalNumFaces
 
         self.offset = offset
@@ -238,7 +266,9 @@ class _AbstractGridBuilder(object):
         """
         Dimensionally independent face-number calculation.
 
-        >>> from fipy.meshes.builders import *
+        >>> from fipy.meshes.builders import (_Grid1DBuilder,
+        ...                                   _Grid2DBuilder,
+        ...                                   _Grid3DBuilder)
 
         >>> gb = _Grid1DBuilder()
         >>> gb._calcGlobalNumFaces([1])
@@ -282,21 +312,76 @@ class _AbstractGridBuilder(object):
     def _calcNs(self, ns, ds):
         return self.NumPtsCalcClass.calcNs(ns, ds)
 
-    def _buildOverlap(self, overlap, procID, occupiedNodes):
-        (first, sec) = (overlap * (procID > 0) * (procID < occupiedNodes),
-                        overlap * (procID < occupiedNodes - 1))
+    def _calcProcessGrid(self, ns, overlap, Nproc):
+        """
+        Choose the number of processes along each axis.
+
+        The decomposition that occupies the most processes is preferred
+        and, of those, the one that minimizes the number of cells adjacent
+        to partition boundaries. Ties are broken in favor of splitting the
+        last axis, which is the only one that used to be partitioned.
+
+        >>> from fipy.meshes.builders import _Grid2DBuilder, _Grid3DBuilder
+
+        >>> gb = _Grid2DBuilder()
+        >>> print gb._calcProcessGrid([10, 10], 2, 1)
+        (1, 1)
+        >>> print gb._calcProcessGrid([10, 10], 2, 2)
+        (1, 2)
+        >>> print gb._calcProcessGrid([10, 10], 2, 4)
+        (2, 2)
+        >>> print gb._calcProcessGrid([100, 10], 2, 4)
+        (4, 1)
+        >>> print gb._calcProcessGrid([1, 9], 2, 3)
+        (1, 3)
 
-        return first, sec, self._packOverlap(first, sec)
+        >>> gb3 = _Grid3DBuilder()
+        >>> print gb3._calcProcessGrid([40, 40, 40], 2, 8)
+        (2, 2, 2)
+        >>> print gb3._calcProcessGrid([40, 40, 40], 2, 6)
+        (1, 2, 3)
+        """
+        def factorizations(N, dim):
+            if dim == 1:
+                return [(N,)]
+            else:
+                return [(p,) + rest
+                        for p in range(1, N + 1) if N % p == 0
+                        for rest in factorizations(N // p, dim - 1)]
+
+        def occupied(n, p):
+            cellsPerNode = max(n // p, min(overlap, n))
+            return min(n // (cellsPerNode or 1), p)
+
+        def key(processGrid):
+            occupiedNodes = [occupied(n, p) for n, p in zip(ns, processGrid)]
+            boundaryCells = 0
+            for axis, p in enumerate(occupiedNodes):
+                others = ns[:axis] + ns[axis + 1:]
+                boundaryCells += (p - 1) * reduce(self._mult, others, 1)
+
+            return (-reduce(self._mult, occupiedNodes),
+                    boundaryCells,
+                    processGrid[:-1])
 
-    def _packOverlap(self, first, sec):
+        return min(factorizations(Nproc, len(ns)), key=key)
+
+    def _buildOverlap(self, overlap, procID, occupiedNodes):
+        return (overlap * (procID > 0) * (procID < occupiedNodes),
+                overlap * (procID < occupiedNodes - 1))
+
+    def _packOverlap(self, firsts, secs):
         raise NotImplementedError
 
-    def _packOffset(self, arg):
+    def _packOffset(self, args):
         raise NotImplementedError
 
     def _mult(self, x, y):
         return x*y
 
-if __name__ == '__main__':
-    import doctest
-    doctest.testmod()
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
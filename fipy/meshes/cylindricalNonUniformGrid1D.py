@@ -97,6 +97,8 @@ class CylindricalNonUniformGrid1D(NonUniformGrid1D):
                                                           *args,
                                                           **kwargs)
 
+        self._calcGeometry()
+
         self.vertexCoords += origin
         self.args['origin'] = origin
 
@@ -72,7 +72,8 @@ class CylindricalUniformGrid2D(UniformGrid2D):
         return CylindricalUniformGrid2D(dx = self.args['dx'], nx = self.args['nx'],
                                         dy = self.args['dy'], ny = self.args['ny'],
                                         origin=numerix.array(self.args['origin']) + vector,
-                                        overlap=self.args['overlap'])
+                                        overlap=self.args['overlap'],
+                                        processGrid=self.args['processGrid'])
 
     @property
     def _faceAreas(self):
@@ -53,7 +53,8 @@ __docformat__ = 'restructuredtext'
 from fipy.tools import parallelComm
 from fipy.tools import numerix
 
-__all__ = ["Grid3D", "Grid2D", "Grid1D", "CylindricalGrid2D", "CylindricalGrid1D"]
+__all__ = ["Grid3D", "Grid2D", "Grid1D", "CylindricalGrid2D", "CylindricalGrid1D",
+           "concatenateMeshes"]
 
 def _dnl(dx, nx, Lx):
     """
@@ -92,7 +93,7 @@ def _dnl(dx, nx, Lx):
 def Grid3D(dx=1., dy=1., dz=1.,
            nx=None, ny=None, nz=None,
            Lx=None, Ly=None, Lz=None,
-           overlap=2, communicator=parallelComm):
+           overlap=2, communicator=parallelComm, processGrid=None):
 
     r""" Factory function to select between UniformGrid3D and
     NonUniformGrid3D.  If `Lx` is specified the length of the domain
@@ -116,6 +117,9 @@ def Grid3D(dx=1., dy=1., dz=1.,
         `fipy.tools.serialComm`. Select `fipy.tools.serialComm` to create a
         serial mesh when running in parallel. Mostly used for test
         purposes.
+      - `processGrid`: the number of processes along each axis for
+        parallel simulations, e.g., `(2, 2, 4)` for 16 processes. By
+        default, chosen to minimize the number of overlapping cells.
 
     """
 
@@ -129,13 +133,16 @@ def Grid3D(dx=1., dy=1., dz=1.,
         from fipy.meshes.uniformGrid3D import UniformGrid3D
         return UniformGrid3D(dx = dx, dy = dy, dz = dz,
                              nx = nx or 1, ny = ny or 1, nz = nz or 1,
-                             overlap=overlap, communicator=communicator)
+                             overlap=overlap, communicator=communicator,
+                             processGrid=processGrid)
     else:
         from fipy.meshes.nonUniformGrid3D import NonUniformGrid3D
         return NonUniformGrid3D(dx = dx, dy = dy, dz = dz, nx = nx, ny = ny, nz = nz,
-                                overlap=overlap, communicator=communicator)
+                                overlap=overlap, communicator=communicator,
+                                processGrid=processGrid)
 
-def Grid2D(dx=1., dy=1., nx=None, ny=None, Lx=None, Ly=None, overlap=2, communicator=parallelComm):
+def Grid2D(dx=1., dy=1., nx=None, ny=None, Lx=None, Ly=None, overlap=2, communicator=parallelComm,
+           processGrid=None):
     r""" Factory function to select between UniformGrid2D and
     NonUniformGrid2D.  If `Lx` is specified the length of the domain
     is always `Lx` regardless of `dx`.
@@ -155,6 +162,9 @@ def Grid2D(dx=1., dy=1., nx=None, ny=None, Lx=None, Ly=None, overlap=2, communic
           `fipy.tools.serialComm`. Select `fipy.tools.serialComm` to create a
           serial mesh when running in parallel. Mostly used for test
           purposes.
+        - `processGrid`: the number of processes along each axis for
+          parallel simulations, e.g., `(2, 4)` for 8 processes. By
+          default, chosen to minimize the number of overlapping cells.
 
     >>> print Grid2D(Lx=3., nx=2).dx
     1.5
@@ -170,10 +180,12 @@ def Grid2D(dx=1., dy=1., nx=None, ny=None, Lx=None, Ly=None, overlap=2, communic
         return UniformGrid2D(dx=dx, dy=dy,
                              nx=nx, ny=ny,
                              overlap=overlap,
-                             communicator=communicator)
+                             communicator=communicator,
+                             processGrid=processGrid)
     else:
         from fipy.meshes.nonUniformGrid2D import NonUniformGrid2D
-        return NonUniformGrid2D(dx=dx, dy=dy, nx=nx, ny=ny, overlap=overlap, communicator=communicator)
+        return NonUniformGrid2D(dx=dx, dy=dy, nx=nx, ny=ny, overlap=overlap, communicator=communicator,
+                                processGrid=processGrid)
 
 def Grid1D(dx=1., nx=None, Lx=None, overlap=2, communicator=parallelComm):
     r""" Factory function to select between UniformGrid1D and
@@ -300,6 +312,37 @@ def CylindricalGrid1D(dr=None, nr=None, Lr=None,
         from fipy.meshes.cylindricalNonUniformGrid1D import CylindricalNonUniformGrid1D
         return CylindricalNonUniformGrid1D(dx=dx, nx=nx, origin=origin, overlap=overlap, communicator=parallelComm)
 
+def concatenateMeshes(meshes, resolution=1e-2):
+    r"""Concatenate a sequence of `Mesh` objects in one pass.
+
+    The result is the same as adding the `meshes` together one after
+    another, but coincident vertices and faces of all of them are found at
+    once, without building any of the intermediate meshes.
+
+    :Parameters:
+
+      - `meshes`: the sequence of `Mesh` objects to concatenate
+      - `resolution`: how close vertices have to be (relative to the
+        smallest cell-to-cell distance in any of the meshes) to be
+        considered the same
+
+    >>> blocks = [Grid2D(nx=2, ny=2) + ((2 * i,), (2 * j,))
+    ...           for j in range(3) for i in range(3)]
+    >>> mesh = concatenateMeshes(blocks)
+    >>> print mesh.numberOfCells, mesh.numberOfFaces, len(mesh.exteriorFaces.value.nonzero()[0])
+    36 84 24
+    >>> added = blocks[0]
+    >>> for block in blocks[1:]:
+    ...     added = added + block
+    >>> print numerix.allequal(mesh.faceVertexIDs, added.faceVertexIDs)
+    True
+
+    """
+    meshes = list(meshes)
+
+    from fipy.meshes.abstractMesh import _concatenatedMeshValues
+    return meshes[0]._concatenatedClass(**_concatenatedMeshValues(meshes, resolution=resolution))
+
 def _test():
     import fipy.tests.doctestPlus
     return fipy.tests.doctestPlus.testmod()
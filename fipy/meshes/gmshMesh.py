@@ -98,6 +98,86 @@ class GmshException(Exception):
 class MeshExportError(GmshException):
     pass
 
+_elementNodes = {1: 2, 2: 3, 3: 4, 4: 4, 5: 8, 6: 6, 7: 5, 8: 3, 9: 6, 10: 9,
+                 11: 10, 12: 27, 13: 18, 14: 14, 15: 1, 16: 8, 17: 20, 18: 15,
+                 19: 13, 20: 9, 21: 10, 22: 12, 23: 15, 24: 15, 25: 21, 26: 4,
+                 27: 5, 28: 6, 29: 20, 30: 35, 31: 56, 92: 64, 93: 125}
+
+def _nodesPerElement(elemType):
+    """Return the number of nodes of a Gmsh element type.
+    """
+    try:
+        return _elementNodes[elemType]
+    except KeyError:
+        raise GmshException("Unknown Gmsh element type %d" % elemType)
+
+# faces of each shape in terms of its corner nodes
+_triangleFaces = [[0, 1], [1, 2], [2, 0]]
+_quadrangleFaces = [[0, 1], [1, 2], [2, 3], [3, 0]]
+_tetrahedronFaces = [[0, 1, 2], [1, 2, 3], [2, 3, 0], [3, 0, 1]]
+_hexahedronFaces = [[0, 1, 2, 3], # ordering of vertices gleaned from
+                    [4, 5, 6, 7], # a one-cube Grid3D example
+                    [0, 1, 5, 4],
+                    [3, 2, 6, 7],
+                    [0, 3, 7, 4],
+                    [1, 2, 6, 5]]
+_prismFaces = [[0, 1, 2],
+               [5, 4, 3],
+               [3, 4, 1, 0],
+               [4, 5, 2, 1],
+               [5, 3, 0, 2]]
+_pyramidFaces = [[0, 1, 2, 3],
+                 [0, 1, 4],
+                 [1, 2, 4],
+                 [2, 3, 4],
+                 [3, 0, 4]]
+
+def _uniqueRows(rows):
+    """Find the distinct rows of a 2D array.
+
+    Returns the index of the first occurrence of each distinct row, in
+    order of appearance, and the index of every row among those.
+
+        >>> first, inverse = _uniqueRows([[1, 2], [3, 4], [1, 2], [0, 5], [3, 4]])
+        >>> print first
+        [0 1 3]
+        >>> print inverse
+        [0 1 0 2 1]
+    """
+    rows = nx.asarray(rows)
+    if len(rows) == 0:
+        return nx.zeros((0,), 'l'), nx.zeros((0,), 'l')
+
+    # pack as many columns as fit into each 64 bit sort key
+    offset = rows.min()
+    bits = max(1, int(rows.max() - offset).bit_length())
+    perKey = 63 // bits
+    keys = []
+    for start in range(0, rows.shape[1], perKey):
+        key = nx.zeros((len(rows),), 'int64')
+        for column in rows.swapaxes(0, 1)[start:start + perKey]:
+            key = (key << bits) | (column - offset)
+        keys.append(key)
+
+    # the sorts are stable, so the first of each run of equal rows is the
+    # first occurrence
+    if len(keys) == 1:
+        order = nx.argsort(keys[0], kind='mergesort')
+    else:
+        order = nx.lexsort(keys[::-1])
+    sortedRows = rows[order]
+    isNew = nx.concatenate(([True], (sortedRows[1:] != sortedRows[:-1]).any(axis=1)))
+    first = order[isNew]
+
+    appearance = nx.argsort(first)
+    renumber = nx.empty(appearance.shape, 'l')
+    renumber[appearance] = nx.arange(len(appearance))
+
+    inverse = nx.empty((len(rows),), 'l')
+    inverse[order] = renumber[nx.cumsum(isNew) - 1]
+
+    return first[appearance], inverse
+
 def gmshVersion(communicator=parallelComm):
     """Determine the version of Gmsh.
 
@@ -207,7 +287,11 @@ def openMSHFile(name, dimensions=None, coordDimensions=None, communicator=parall
                 else: # gmsh version is adequate for partitioning
                     gmshFlags += ["-part", "%d" % communicator.Nproc]
 
-            gmshFlags += ["-format", "msh"]
+            if version < StrictVersion("4.0"):
+                gmshFlags += ["-format", "msh"]
+            else:
+                # partitioned meshes can only be read from MSH 2 files
+                gmshFlags += ["-format", "msh2"]
 
             if background is not None:
                 if communicator.procID == 0:
@@ -279,6 +363,56 @@ def openPOSFile(name, communicator=parallelComm, mode='w'):
                    communicator=communicator,
                    mode=mode)
 
+def _makeMapVariables(mesh, dimensions, physicalNames,
+                      physicalCellMap, geometricalCellMap,
+                      physicalFaceMap, geometricalFaceMap):
+    """Make MeshVariables that define different domains in the mesh
+    """
+    from fipy.variables.cellVariable import CellVariable
+    from fipy.variables.faceVariable import FaceVariable
+
+    physicalCellMap = CellVariable(mesh=mesh, value=physicalCellMap)
+    geometricalCellMap = CellVariable(mesh=mesh, value=geometricalCellMap)
+    physicalFaceMap = FaceVariable(mesh=mesh, value=physicalFaceMap)
+    geometricalFaceMap = FaceVariable(mesh=mesh, value=geometricalFaceMap)
+
+    physicalCells = dict()
+    for name in physicalNames[dimensions].keys():
+        physicalCells[name] = (physicalCellMap == physicalNames[dimensions][name])
+
+    physicalFaces = dict()
+    for name in physicalNames[dimensions-1].keys():
+        physicalFaces[name] = (physicalFaceMap == physicalNames[dimensions-1][name])
+
+    return (physicalCellMap,
+            geometricalCellMap,
+            physicalCells,
+            physicalFaceMap,
+            geometricalFaceMap,
+            physicalFaces)
+
+def _renumberMapVariables(mesh, renumbered):
+    """Carry the MeshVariables that define the domains of `mesh` over to
+    `renumbered`, a copy of `mesh` with its cells and faces renumbered.
+    """
+    from fipy.variables.cellVariable import CellVariable
+    from fipy.variables.faceVariable import FaceVariable
+
+    def cellVariable(var):
+        return CellVariable(mesh=renumbered,
+                            value=nx.take(var.value, renumbered.originalCellIDs, axis=-1))
+
+    def faceVariable(var):
+        return FaceVariable(mesh=renumbered,
+                            value=nx.take(var.value, renumbered.originalFaceIDs, axis=-1))
+
+    return (cellVariable(mesh.physicalCellMap),
+            cellVariable(mesh.geometricalCellMap),
+            dict((name, cellVariable(var)) for name, var in mesh.physicalCells.items()),
+            faceVariable(mesh.physicalFaceMap),
+            faceVariable(mesh.geometricalFaceMap),
+            dict((name, faceVariable(var)) for name, var in mesh.physicalFaces.items()))
+
 class GmshFile:
     def __init__(self, filename, communicator, mode, fileIsTemporary=False):
         self.filename = filename
@@ -546,31 +680,6 @@ class MSHFile(GmshFile):
         self.fileobj.seek(0)
         return [float(x) for x in metaData]
 
-    def _isolateData(self, title):
-        """
-        Gets all data between $[title] and $End[title], writes
-        it out to its own file.
-        """
-        newF, newPath = tempfile.mkstemp(title, text=True)
-        newF = os.fdopen(newF, 'w')
-        try:
-            self._seekForHeader(title)
-        except Exception, e:
-            newF.close()
-            os.unlink(newPath)
-            raise
-
-        # extract the actual data within section
-        while True:
-            line = self.fileobj.readline()
-            if ("$End%s" % title) not in line:
-                newF.write(line)
-            else: break
-
-        self.fileobj.seek(0)
-        newF.close()
-        return newPath
-
     def _seekForHeader(self, title):
         """
         Iterate through a file until we end up at the section header
@@ -586,282 +695,527 @@ class MSHFile(GmshFile):
             else:
                 break # found header
 
+    def _readSections(self):
+        """
+        Read the whole file and locate its sections.
+
+        Returns the contents of the file and a dictionary giving the
+        offsets of the start and end of the body of each section.
+        """
+        self.fileobj.seek(0)
+        data = self.fileobj.read()
+        self.fileobj.seek(0)
+
+        sections = {}
+        pos = 0
+        while True:
+            start = data.find("$", pos)
+            if start < 0:
+                break
+            bodyStart = data.find("\n", start) + 1
+            title = data[start + 1:bodyStart].strip()
+            bodyEnd = data.find("$End%s" % title, bodyStart)
+            if bodyStart == 0 or bodyEnd < 0:
+                raise EOFError("No `$End%s' footer found!" % title)
+            sections.setdefault(title, (bodyStart, bodyEnd))
+            pos = bodyEnd + len("$End%s" % title)
+
+        return data, sections
+
+    def _section(self, data, sections, title, dtype=float):
+        """
+        Return an `_MSHSection` positioned at the start of the body of
+        section `title`. ASCII sections are split into numbers of type
+        `dtype`.
+        """
+        if title not in sections:
+            raise EOFError("No `%s' header found!" % title)
+        start, end = sections[title]
+        if self.fileType == 1:
+            return _MSHSection(data, start=start, byteorder=self.byteorder, sizeType="u%d" % self.dataSize)
+        else:
+            return _MSHSection(nx.fromstring(data[start:end], dtype=dtype, sep=" "))
+
+    def _readByteOrder(self, data, sections):
+        """
+        Binary files follow the format line with the integer 1 written in
+        the byte order of the machine that wrote the file.
+        """
+        start, end = sections["MeshFormat"]
+        one = data.find("\n", start) + 1
+        if nx.frombuffer(data, dtype="<i4", count=1, offset=one)[0] == 1:
+            return "<"
+        else:
+            return ">"
+
+    def _readNodes(self, data, sections):
+        """
+        Return the Gmsh IDs of the nodes and their coordinates as a
+        `(numNodes, 3)` array.
+        """
+        section = self._section(data, sections, "Nodes")
+        if self.version >= 4:
+            numBlocks, numNodes = [int(n) for n in section.read(section.sizeType, 2)]
+            section.read(section.sizeType, 2)
+            nodeTags = nx.empty((numNodes,), dtype=nx.INT_DTYPE)
+            nodeCoords = nx.empty((numNodes, 3))
+            start = 0
+            for block in range(numBlocks):
+                entityDim, entityTag, parametric = section.read("i4", 3)
+                count = section.readCount()
+                nodeTags[start:start + count] = section.read(section.sizeType, count)
+                width = 3 + (entityDim if parametric else 0)
+                coords = section.read("f8", count * width).reshape((count, width))
+                nodeCoords[start:start + count] = coords[:, :3]
+                start += count
+        elif self.fileType == 1:
+            numNodes = int(data[sections["Nodes"][0]:data.find("\n", sections["Nodes"][0])])
+            section.pos = data.find("\n", section.pos) + 1
+            nodes = section.read([("tag", "i4"), ("coords", "f8", (3,))], numNodes)
+            nodeTags = nodes["tag"].astype(nx.INT_DTYPE)
+            nodeCoords = nodes["coords"]
+        else:
+            numNodes = int(section.read(float)[0])
+            nodes = section.read(float, 4 * numNodes).reshape((numNodes, 4))
+            nodeTags = nodes[:, 0].astype(nx.INT_DTYPE)
+            nodeCoords = nodes[:, 1:]
+
+        return nodeTags, nodeCoords
+
+    def _readEntities(self, data, sections):
+        """
+        Return a dictionary of the first physical entity of each
+        `(dimension, tag)` geometrical entity of an MSH 4 file.
+        """
+        physicalEntities = {}
+        if "Entities" in sections:
+            section = self._section(data, sections, "Entities")
+            counts = [int(n) for n in section.read(section.sizeType, 4)]
+            for dim, count in enumerate(counts):
+                for entity in range(count):
+                    tag = section.read("i4")[0]
+                    section.read("f8", 3 if dim == 0 else 6)
+                    numPhysicals = section.readCount()
+                    physicals = section.read("i4", numPhysicals)
+                    if len(physicals) > 0:
+                        physicalEntities[(dim, tag)] = physicals[0]
+                    if dim > 0:
+                        numBounding = section.readCount()
+                        section.read("i4", numBounding)
+
+        return physicalEntities
+
+    def _readElements(self, data, sections):
+        """
+        Return the elements of the file as an `_ElementData`.
+        """
+        section = self._section(data, sections, "Elements", dtype=nx.INT_DTYPE)
+        blocks = []
+        if self.version >= 4:
+            physicalEntities = self._readEntities(data, sections)
+            numBlocks = section.readCount()
+            section.read(section.sizeType, 3)
+            for block in range(numBlocks):
+                entityDim, entityTag, elemType = section.read("i4", 3)
+                count = section.readCount()
+                width = 1 + _nodesPerElement(elemType)
+                records = section.read(section.sizeType, count * width).reshape((count, width)).astype(nx.INT_DTYPE)
+                blocks.append(_ElementData(shapes=nx.repeat(elemType, count),
+                                           tags=records[:, 0],
+                                           physicalEntities=nx.repeat(physicalEntities.get((entityDim, entityTag), 0), count),
+                                           geometricalEntities=nx.repeat(entityTag, count),
+                                           nodes=records[:, 1:]))
+        elif self.fileType == 1:
+            count = int(data[sections["Elements"][0]:data.find("\n", sections["Elements"][0])])
+            section.pos = data.find("\n", section.pos) + 1
+            runs = []
+            while count > 0:
+                elemType, following, numTags = [int(n) for n in section.read("i4", 3)]
+                width = 1 + numTags + _nodesPerElement(elemType)
+                records = section.read("i4", following * width).reshape((following, width))
+                if len(runs) > 0 and runs[-1][:2] == (elemType, numTags):
+                    runs[-1][2].append(records)
+                else:
+                    runs.append((elemType, numTags, [records]))
+                count -= following
+            for elemType, numTags, records in runs:
+                blocks.append(self._elementBlock(elemType, nx.concatenate(records).astype(nx.INT_DTYPE), numTags))
+        else:
+            count = section.readCount()
+            ints = section.read(nx.INT_DTYPE, len(section.data) - 1)
+            start = 0
+            while count > 0:
+                # gmsh writes runs of elements of the same type with the
+                # same number of tags, so we look for the end of the run
+                # through windows of doubling length
+                elemType, numTags = ints[start + 1:start + 3]
+                width = 3 + numTags + _nodesPerElement(elemType)
+                following = 1
+                while following < count:
+                    window = min(2 * following, count, (len(ints) - start) // width)
+                    records = ints[start:start + window * width].reshape((window, width))
+                    same = (records[:, 1] == elemType) & (records[:, 2] == numTags)
+                    if not same.all():
+                        following = same.argmin()
+                        break
+                    elif window == following:
+                        break
+                    following = window
+                records = ints[start:start + following * width].reshape((following, width))
+                blocks.append(self._elementBlock(elemType, nx.delete(records, [1, 2], axis=1), numTags))
+                start += following * width
+                count -= following
+
+        return _ElementData.concatenate(blocks)
+
+    def _elementBlock(self, elemType, records, numTags):
+        """
+        Return an `_ElementData` for MSH 2 element `records` of
+        `elemType`, each holding the element ID, `numTags` tags and the
+        nodes.
+        """
+        count = len(records)
+        tags = records[:, 1:1 + numTags]
+        if numTags >= 2:
+            physicalEntities = tags[:, 0]
+            geometricalEntities = tags[:, 1]
+        else:
+            physicalEntities = geometricalEntities = -nx.ones((count,), dtype=nx.INT_DTYPE)
+
+        # the partition tags for don't seem to always be present
+        # and don't always make much sense when they are
+        if numTags > 2:
+            # next item is a count
+            mismatch = tags[:, 2] != numTags - 3
+            if mismatch.any():
+                warnings.warn("Partition count %d does not agree with number of remaining tags %d." % (tags[mismatch][0, 2], numTags - 3),
+                              SyntaxWarning, stacklevel=2)
+            partitions = tags[:, 3:]
+        else:
+            partitions = None
+
+        return _ElementData(shapes=nx.repeat(elemType, count),
+                            tags=records[:, 0],
+                            physicalEntities=physicalEntities,
+                            geometricalEntities=geometricalEntities,
+                            nodes=records[:, 1 + numTags:],
+                            partitions=partitions)
+
+    def _readPhysicalNames(self, data, sections):
+        physicalNames = {
+            0: dict(),
+            1: dict(),
+            2: dict(),
+            3: dict()
+        }
+        if "PhysicalNames" in sections:
+            start, end = sections["PhysicalNames"]
+            lines = data[start:end].splitlines()
+
+            for nm in lines[1:]:
+                nm = nm.split()
+                if len(nm) == 0:
+                    continue
+                if self.version > 2.0:
+                    dim = [int(nm.pop(0))]
+                else:
+                    # Gmsh format prior to 2.1 did not unambiguously tie
+                    # physical names to physical entities of different dimensions
+                    # http://article.gmane.org/gmane.comp.cad.gmsh.general/1601
+                    dim = [0, 1, 2, 3]
+                num = int(nm.pop(0))
+                name = " ".join(nm)[1:-1]
+                for d in dim:
+                    physicalNames[d][name] = int(num)
+
+        return physicalNames
+
     def _deriveCellsAndFaces(self, cellsToVertIDs, shapeTypes, numCells):
         """
-        Uses element information obtained from `_parseElementFile` to deliver
+        Uses element information obtained from `_sortElements` to deliver
         `facesToVertices` and `cellsToFaces`.
-        """
 
-        allShapes  = nx.unique(shapeTypes).tolist()
-        maxFaces   = max([self.numFacesPerCell[x] for x in allShapes])
+        Faces are numbered in order of their first appearance in the
+        cells, and duplicates are found by comparing the sorted vertex IDs
+        of each face.
+        """
+        allShapes = nx.unique(shapeTypes)
+        orderings = [self.cellFaceOrderings[shape] for shape in allShapes]
+        maxFaces = max([len(ordering) for ordering in orderings])
+        maxFaceLen = max([len(face) for ordering in orderings for face in ordering])
+
+        # short faces are padded with -1 at the start
+        faces = -nx.ones((numCells, maxFaces, maxFaceLen), dtype=nx.INT_DTYPE)
+        present = nx.zeros((numCells, maxFaces), dtype=bool)
+        for shape, ordering in zip(allShapes, orderings):
+            cells = nx.nonzero(shapeTypes == shape)[0]
+            vertices = cellsToVertIDs[cells]
+            for faceIdx, face in enumerate(ordering):
+                faces[cells, faceIdx, maxFaceLen - len(face):] = vertices[:, face]
+            present[cells, :len(ordering)] = True
+
+        faces = faces[present]
+        faceKeys = nx.sort(faces, axis=1)
+        first, inverse = _uniqueRows(faceKeys)
 
         # `cellsToFaces` must be padded with -1; see mesh.py
-        currNumFaces = 0
-        cellsToFaces = nx.ones((numCells, maxFaces), 'l') * -1
-        facesDict    = {}
-        uniqueFaces  = []
-
-        # we now build `cellsToFaces` and `uniqueFaces`,
-        # the latter will result in `facesToVertices`.
-        for cellIdx in range(numCells):
-            shapeType = shapeTypes[cellIdx]
-            cell = cellsToVertIDs[cellIdx]
-
-            if shapeType in [5, 12, 17]: # hexahedron
-                faces = self._extractOrderedFaces(cell=cell,
-                                                  faceOrderings=[[0, 1, 2, 3], # ordering of vertices gleaned from
-                                                                 [4, 5, 6, 7], # a one-cube Grid3D example
-                                                                 [0, 1, 5, 4],
-                                                                 [3, 2, 6, 7],
-                                                                 [0, 3, 7, 4],
-                                                                 [1, 2, 6, 5]])
-            elif shapeType in [6, 13, 18]: # prism
-                faces = self._extractOrderedFaces(cell=cell,
-                                                  faceOrderings=[[0, 1, 2],
-                                                                 [5, 4, 3],
-                                                                 [3, 4, 1, 0],
-                                                                 [4, 5, 2, 1],
-                                                                 [5, 3, 0, 2]])
-            elif shapeType in [7, 14, 19]: # pyramid
-                faces = self._extractOrderedFaces(cell=cell,
-                                                  faceOrderings=[[0, 1, 2, 3],
-                                                                 [0, 1, 4],
-                                                                 [1, 2, 4],
-                                                                 [2, 3, 4],
-                                                                 [3, 0, 4]])
-            else:
-                if shapeType in [2, 9, 20, 21, 22, 23, 24, 25]:
-                    faceLength = 2 # triangle
-                elif shapeType in [3, 10, 16]:
-                    faceLength = 2 # quadrangle
-                elif shapeType in [4, 11, 29, 30, 31]:
-                    faceLength = 3 # tetrahedron
-
-                faces = self._extractRegularFaces(cell=cell,
-                                                  faceLength=faceLength,
-                                                  facesPerCell=self.numFacesPerCell[shapeType])
-
-            for faceIdx in range(len(faces)):
-                # NB: currFace is sorted for the key to spot duplicates
-                currFace = faces[faceIdx]
-                keyStr   = ' '.join([str(x) for x in sorted(currFace)])
-
-                if keyStr in facesDict:
-                    cellsToFaces[cellIdx][faceIdx] = facesDict[keyStr]
-                else: # new face
-                    facesDict[keyStr] = currNumFaces
-                    cellsToFaces[cellIdx][faceIdx] = currNumFaces
-                    uniqueFaces.append(currFace)
-                    currNumFaces += 1
-
-        # pad short faces with -1
-        maxFaceLen = max([len(f) for f in uniqueFaces])
-        uniqueFaces = [[-1] * (maxFaceLen - len(f)) + f for f in uniqueFaces]
-
-        facesToVertices = nx.array(uniqueFaces, dtype=nx.INT_DTYPE)
-
-        return facesToVertices.swapaxes(0,1)[::-1], cellsToFaces.swapaxes(0,1).copy('C'), facesDict
+        cellsToFaces = -nx.ones((numCells, maxFaces), 'l')
+        cellsToFaces[present] = inverse
+
+        facesToVertices = faces[first]
+
+        return facesToVertices.swapaxes(0,1)[::-1], cellsToFaces.swapaxes(0,1).copy('C'), faceKeys[first]
 
     def _translateNodesToVertices(self, entitiesNodes, vertexMap):
         """Translates entitiesNodes from Gmsh node IDs to `vertexCoords` indices.
-        """
-        entitiesVertices = []
 
-        for entity in entitiesNodes:
-            try:
-                vertIndices = vertexMap[nx.array(entity)]
-            except IndexError:
-                vertIndices = nx.ones((len(entity),), 'l') * -1
-            entitiesVertices.append(vertIndices)
+        Nodes that are not vertices of any cell become -1.
+        """
+        entitiesNodes = nx.asarray(entitiesNodes)
+        known = (entitiesNodes >= 0) & (entitiesNodes < len(vertexMap))
+        entitiesVertices = -nx.ones(entitiesNodes.shape, 'l')
+        entitiesVertices[known] = vertexMap[entitiesNodes[known]]
 
         return entitiesVertices
 
-    def _extractRegularFaces(self, cell, faceLength, facesPerCell):
-        """Return faces for a regular poly(gon|hedron)
-
-        Given `cell`, defined by node IDs, returns an array of
-        `facesPerCell` faces of length `faceLength` in terms of nodes.
+    def _sortElements(self, elements):
         """
-        faces = []
-        for i in range(facesPerCell):
-            aFace = []
-            for j in range(faceLength):
-                aVertex = (i + j) % len(cell) # we may wrap
-                aFace.append(int(cell[aVertex]))
-            faces.append(aFace)
-        return faces
-
-    def _extractOrderedFaces(self, cell, faceOrderings):
-        """Return faces for a 8-node hexahedron cell.
+        Return three `_ElementData` objects, the first for non-ghost cells,
+        the second for ghost cells, and the third for faces.
+
+        All nastiness concerning ghost cell
+        calculation is consolidated here: if we were ever to need to CALCULATE
+        GHOST CELLS OURSELVES, the only code we'd have to change is in here.
         """
-        def orderingToFace(vertList):
-            aFace = []
-            for i in vertList:
-                aFace.append(int(cell[i]))
-            return aFace
+        cells = elements.take(nx.nonzero(nx.in1d(elements.shapes, self.cellFaceOrderings.keys()))[0])
+        facesData = elements.take(nx.nonzero(nx.in1d(elements.shapes, self.numVertsPerFace.keys()))[0])
+
+        if self.communicator.Nproc > 1:
+            if self.version >= 4:
+                raise GmshException("Partitioned meshes can only be read from MSH 2 files.")
+            pid = self.communicator.procID + 1
+            # el is in this processor's partition
+            cellsData = cells.take(nx.nonzero((cells.partitions == pid).any(axis=1))[0])
+            # if we're collecting ghost cells and this is our ghost cell
+            ghostsData = cells.take(nx.nonzero((cells.partitions == -pid).any(axis=1))[0])
+        else:
+            # we collect all cells
+            cellsData = cells
+            ghostsData = cells.take([])
 
-        return [orderingToFace(o) for o in faceOrderings]
+        # this will be subtracted from gmsh ID to obtain global ID
+        if len(cells) > 0:
+            cellOffset = cells.tags[0]
+        else:
+            cellOffset = 0
+        cellsData.idmap = (cellsData.tags - cellOffset).tolist()
+        ghostsData.idmap = (ghostsData.tags - cellOffset).tolist()
+
+        return cellsData, ghostsData, facesData
 
     def read(self):
         """
-        0. Build cellsToVertices
+        0. Read the $Nodes and $Elements sections into arrays
         1. Recover needed vertexCoords and mapping from file using
            cellsToVertices
         2. Build cellsToVertIDs proper from vertexCoords and vertex map
         3. Build faces
         4. Build cellsToFaces
 
-        Isolate relevant data into three files, store in
-        `self.nodesPath` for $Nodes,
-        `self.elemsPath` for $Elements.
-        `self.namesFile` for $PhysicalNames.
+        Reads ASCII and binary files in the MSH 2 and MSH 4.1 formats.
+        Partitioned meshes must be in the MSH 2 format.
 
         Returns vertexCoords, facesToVertexID, cellsToFaceID,
-                cellGlobalIDMap, ghostCellGlobalIDMap.
-        """
-        self.version, self.fileType, self.dataSize = self._getMetaData()
-        self.nodesPath = self._isolateData("Nodes")
-        self.elemsPath = self._isolateData("Elements")
-        try:
-            self.namesPath = self._isolateData("PhysicalNames")
-        except EOFError, e:
-            self.namesPath = None
+                cellGlobalIDMap, ghostCellGlobalIDMap, cellsToVertIDs.
 
-        try:
-            if self.dimensions is None:
-                nodesFile = open(self.nodesPath, 'r')
-                nodesFile.readline() # skip number of nodes
+        We read a triangle and a square that share an edge from an ASCII
+        MSH 4.1 file
 
-                # We assume we have a 2D file unless we find a node
-                # with a non-zero Z coordinate
-                self.dimensions = 2
-                for node in nodesFile:
-                    line   = node.split()
-
-                    newVert = [float(x) for x in line]
-
-                    if newVert[2] != 0.0:
-                        self.dimensions = 3
-                        break
+        >>> import tempfile
+        >>> from fipy.tools import serialComm
+        >>> (f, mshFile) = tempfile.mkstemp('.msh')
+        >>> os.close(f)
+        >>> f = open(mshFile, 'w')
+        >>> f.write('''$MeshFormat
+        ... 4.1 0 8
+        ... $EndMeshFormat
+        ... $Nodes
+        ... 1 5 1 5
+        ... 2 1 0 5
+        ... 1
+        ... 2
+        ... 3
+        ... 4
+        ... 5
+        ... 0 0 0
+        ... 1 0 0
+        ... 1 1 0
+        ... 2 0 0
+        ... 2 1 0
+        ... $EndNodes
+        ... $Elements
+        ... 2 2 1 2
+        ... 2 1 2 1
+        ... 1 1 2 3
+        ... 2 1 3 1
+        ... 2 2 4 5 3
+        ... $EndElements
+        ... ''')
+        >>> f.close()
+        >>> (vertexCoords, facesToV, cellsToF,
+        ...  cellIDs, ghostIDs, cellsToV) = MSHFile(mshFile, dimensions=2, communicator=serialComm).read()
+        >>> print vertexCoords
+        [[ 0.  1.  1.  2.  2.]
+         [ 0.  0.  1.  0.  1.]]
+        >>> print facesToV
+        [[1 2 0 3 4 2]
+         [0 1 2 1 3 4]]
+        >>> print cellsToF
+        [[ 0  3]
+         [ 1  4]
+         [ 2  5]
+         [-1  1]]
+        >>> print cellIDs
+        [0, 1]
+
+        The same mesh can be read from a binary MSH 2.2 file
+
+        >>> import struct
+        >>> f = open(mshFile, 'wb')
+        >>> f.write("$MeshFormat\\n2.2 1 8\\n" + struct.pack('<i', 1) + "\\n$EndMeshFormat\\n")
+        >>> f.write("$Nodes\\n5\\n")
+        >>> for node, (x, y) in enumerate(vertexCoords.swapaxes(0, 1)):
+        ...     f.write(struct.pack('<i3d', node + 1, x, y, 0.))
+        >>> f.write("\\n$EndNodes\\n$Elements\\n2\\n")
+        >>> f.write(struct.pack('<3i6i', 2, 1, 2, 1, 0, 1, 1, 2, 3))
+        >>> f.write(struct.pack('<3i7i', 3, 1, 2, 2, 0, 1, 2, 4, 5, 3))
+        >>> f.write("\\n$EndElements\\n")
+        >>> f.close()
+        >>> binary = MSHFile(mshFile, dimensions=2, communicator=serialComm).read()
+        >>> print [nx.allclose(a, b) for a, b in zip(binary[:3],
+        ...                                                (vertexCoords, facesToV, cellsToF))]
+        [True, True, True]
 
-                nodesFile.close()
-
-            self.coordDimensions = self.coordDimensions or self.dimensions
-
-            # we need a conditional here so we don't pick up 2D shapes in 3D
-            if self.dimensions == 2:
-                self.numVertsPerFace = {1: 2, # 2-node line
-                                        8: 2} # 3-node line
-                self.numFacesPerCell = { 2: 3, # 3-node triangle (3 faces)
-                                         9: 3, # 6-node triangle (we only read 1st 3)
-                                        20: 3, # 9-node triangle (we only read 1st 3)
-                                        21: 3, # 10-node triangle (we only read 1st 3)
-                                        22: 3, # 12-node triangle (we only read 1st 3)
-                                        23: 3, # 15-node triangle (we only read 1st 3)
-                                        24: 3, # 15-node triangle (we only read 1st 3)
-                                        25: 3, # 21-node triangle (we only read 1st 3)
-                                         3: 4, # 4-node quadrangle (4 faces)
-                                        10: 4, # 9-node quadrangle (we only read 1st 4)
-                                        16: 4} # 8-node quadrangle (we only read 1st 4)
-            elif self.dimensions == 3:
-                self.numVertsPerFace = { 2: 3, # 3-node triangle (3 vertices)
-                                         9: 3, # 6-node triangle (we only read 1st 3)
-                                        20: 3, # 9-node triangle (we only read 1st 3)
-                                        21: 3, # 10-node triangle (we only read 1st 3)
-                                        22: 3, # 12-node triangle (we only read 1st 3)
-                                        23: 3, # 15-node triangle (we only read 1st 3)
-                                        24: 3, # 15-node triangle (we only read 1st 3)
-                                        25: 3, # 21-node triangle (we only read 1st 3)
-                                         3: 4, # 4-node quadrangle (4 vertices)
-                                        10: 4, # 9-node quadrangle (we only read 1st 4)
-                                        16: 4} # 8-node quadrangle (we only read 1st 4)
-                self.numFacesPerCell = { 4: 4, # 4-node tetrahedron (4 faces)
-                                        11: 4, # 10-node tetrahedron (we only read 1st 4)
-                                        29: 4, # 20-node tetrahedron (we only read 1st 4)
-                                        30: 4, # 35-node tetrahedron (we only read 1st 4)
-                                        31: 4, # 56-node tetrahedron (we only read 1st 4)
-                                         5: 6, # 8-node hexahedron (6 faces)
-                                        12: 6, # 27-node tetrahedron (we only read 1st 6)
-                                        17: 6, # 20-node tetrahedron (we only read 1st 6)
-                                         6: 5, # 6-node prism (5 faces)
-                                        13: 5, # 18-node prism (we only read 1st 6)
-                                        18: 5, # 15-node prism (we only read 1st 6)
-                                         7: 5, # 5-node pyramid (5 faces)
-                                        14: 5, # 14-node pyramid (we only read 1st 5)
-                                        19: 5} # 13-node pyramid (we only read 1st 5)
+        >>> os.remove(mshFile)
+        """
+        self.version, self.fileType, self.dataSize = self._getMetaData()
+        if self.fileType == 1 and 'b' not in self.mode:
+            self.fileobj.close()
+            self.fileobj = open(self.filename, 'rb')
+        if self.version >= 4 and self.version < 4.1:
+            raise GmshException("Gmsh MSH file format version %s is not supported" % self.version)
+
+        parprint("Reading sections.")
+        data, sections = self._readSections()
+        if self.fileType == 1:
+            self.byteorder = self._readByteOrder(data, sections)
+
+        nodeTags, nodeCoords = self._readNodes(data, sections)
+
+        if self.dimensions is None:
+            # We assume we have a 2D file unless we find a node
+            # with a non-zero Z coordinate
+            if (nodeCoords[:, 2] != 0.0).any():
+                self.dimensions = 3
             else:
-                raise GmshException("Mesh has fewer than 2 or more than 3 dimensions")
-
-            parprint("Parsing elements.")
-            (cellsData,
-             ghostsData,
-             facesData) = self._parseElementFile()
-
-            cellsToGmshVerts = cellsData.nodes + ghostsData.nodes
-            numCellsTotal    = len(cellsData.nodes) + len(ghostsData.nodes)
-            allShapeTypes    = cellsData.shapes + ghostsData.shapes
-            allShapeTypes    = nx.array(allShapeTypes)
-            allShapeTypes    = nx.delete(allShapeTypes, nx.s_[numCellsTotal:])
-            self.physicalCellMap = nx.array(cellsData.physicalEntities
-                                            + ghostsData.physicalEntities)
-            self.geometricalCellMap = nx.array(cellsData.geometricalEntities
-                                               + ghostsData.geometricalEntities)
-
-            if numCellsTotal < 1:
-                errStr = "Gmsh hasn't produced any cells! Check your Gmsh code."
-                errStr += "\n\nGmsh output:\n%s" % "".join(self.gmshOutput).rstrip()
-                raise GmshException(errStr)
-
-            parprint("Recovering coords.")
-            parprint("numcells %d" % numCellsTotal)
-            vertexCoords, vertIDtoIdx = self._vertexCoordsAndMap(cellsToGmshVerts)
-
-            # translate Gmsh IDs to `vertexCoord` indices
-            cellsToVertIDs = self._translateNodesToVertices(cellsToGmshVerts,
-                                                            vertIDtoIdx)
-
-            parprint("Building cells and faces.")
-            (facesToV,
-             cellsToF,
-             facesDict) = self._deriveCellsAndFaces(cellsToVertIDs,
-                                                    allShapeTypes,
-                                                    numCellsTotal)
-
-            # cell entities were easy to record on parsing
-            # but we don't use Gmsh faces, so we need to correlate the nodes
-            # that make up the Gmsh faces with the vertex IDs of the FiPy faces
-            # so that we can check if any are named
-            faceEntitiesDict = dict()
-
-            # translate Gmsh IDs to `vertexCoord` indices
-            facesToVertIDs = self._translateNodesToVertices(facesData.nodes,
-                                                            vertIDtoIdx)
-
-            for face, physicalEntity, geometricalEntity in zip(facesToVertIDs,
-                                                               facesData.physicalEntities,
-                                                               facesData.geometricalEntities):
-                faceEntitiesDict[' '.join([str(x) for x in sorted(face)])] = (physicalEntity, geometricalEntity)
-
-            self.physicalFaceMap = nx.zeros(facesToV.shape[-1:], 'l')
-            self.geometricalFaceMap = nx.zeros(facesToV.shape[-1:], 'l')
-            for face in facesDict.keys():
-                # not all faces are necessarily tagged
-                if face in faceEntitiesDict:
-                    self.physicalFaceMap[facesDict[face]] = faceEntitiesDict[face][0]
-                    self.geometricalFaceMap[facesDict[face]] = faceEntitiesDict[face][1]
-
-            self.physicalNames = self._parseNamesFile()
-
-        finally:
-            os.unlink(self.nodesPath)
-            os.unlink(self.elemsPath)
-            if self.namesPath is not None:
-                os.unlink(self.namesPath)
+                self.dimensions = 2
+
+        self.coordDimensions = self.coordDimensions or self.dimensions
+
+        # we need a conditional here so we don't pick up 2D shapes in 3D
+        if self.dimensions == 2:
+            self.numVertsPerFace = {1: 2, # 2-node line
+                                    8: 2} # 3-node line (we only read 1st 2)
+            self.cellFaceOrderings = dict([(shape, _triangleFaces)
+                                           for shape in [2, 9, 20, 21, 22, 23, 24, 25]]
+                                          + [(shape, _quadrangleFaces)
+                                             for shape in [3, 10, 16]])
+        elif self.dimensions == 3:
+            self.numVertsPerFace = { 2: 3, # 3-node triangle (3 vertices)
+                                     9: 3, # 6-node triangle (we only read 1st 3)
+                                    20: 3, # 9-node triangle (we only read 1st 3)
+                                    21: 3, # 10-node triangle (we only read 1st 3)
+                                    22: 3, # 12-node triangle (we only read 1st 3)
+                                    23: 3, # 15-node triangle (we only read 1st 3)
+                                    24: 3, # 15-node triangle (we only read 1st 3)
+                                    25: 3, # 21-node triangle (we only read 1st 3)
+                                     3: 4, # 4-node quadrangle (4 vertices)
+                                    10: 4, # 9-node quadrangle (we only read 1st 4)
+                                    16: 4} # 8-node quadrangle (we only read 1st 4)
+            self.cellFaceOrderings = dict([(shape, _tetrahedronFaces)
+                                           for shape in [4, 11, 29, 30, 31]]
+                                          + [(shape, _hexahedronFaces)
+                                             for shape in [5, 12, 17]]
+                                          + [(shape, _prismFaces)
+                                             for shape in [6, 13, 18]]
+                                          + [(shape, _pyramidFaces)
+                                             for shape in [7, 14, 19]])
+        else:
+            raise GmshException("Mesh has fewer than 2 or more than 3 dimensions")
+
+        parprint("Parsing elements.")
+        (cellsData,
+         ghostsData,
+         facesData) = self._sortElements(self._readElements(data, sections))
+
+        allCells = _ElementData.concatenate([cellsData, ghostsData])
+        numCellsTotal = len(allCells)
+        self.physicalCellMap = allCells.physicalEntities
+        self.geometricalCellMap = allCells.geometricalEntities
+
+        if numCellsTotal < 1:
+            errStr = "Gmsh hasn't produced any cells! Check your Gmsh code."
+            errStr += "\n\nGmsh output:\n%s" % "".join(self.gmshOutput).rstrip()
+            raise GmshException(errStr)
+
+        parprint("Recovering coords.")
+        parprint("numcells %d" % numCellsTotal)
+        vertexCoords, vertIDtoIdx = self._vertexCoordsAndMap(allCells.nodes, nodeTags, nodeCoords)
+
+        # translate Gmsh IDs to `vertexCoord` indices
+        cellsToVertIDs = self._translateNodesToVertices(allCells.nodes,
+                                                        vertIDtoIdx)
+
+        parprint("Building cells and faces.")
+        (facesToV,
+         cellsToF,
+         faceKeys) = self._deriveCellsAndFaces(cellsToVertIDs,
+                                               allCells.shapes,
+                                               numCellsTotal)
+
+        # cell entities were easy to record on parsing
+        # but we don't use Gmsh faces, so we need to correlate the nodes
+        # that make up the Gmsh faces with the vertex IDs of the FiPy faces
+        # so that we can check if any are named
+        self.physicalFaceMap = nx.zeros(facesToV.shape[-1:], 'l')
+        self.geometricalFaceMap = nx.zeros(facesToV.shape[-1:], 'l')
+
+        maxFaceLen = faceKeys.shape[-1]
+        facesToVertIDs = -nx.ones((len(facesData), maxFaceLen), 'l')
+        usable = nx.zeros((len(facesData),), dtype=bool)
+        for shape in nx.unique(facesData.shapes):
+            faces = nx.nonzero(facesData.shapes == shape)[0]
+            numVerts = self.numVertsPerFace[shape]
+            if numVerts <= maxFaceLen:
+                # translate Gmsh IDs to `vertexCoord` indices
+                vertices = self._translateNodesToVertices(facesData.nodes[faces, :numVerts],
+                                                          vertIDtoIdx)
+                facesToVertIDs[faces, maxFaceLen - numVerts:] = vertices
+                usable[faces] = (vertices >= 0).all(axis=1)
+
+        # FiPy faces are distinct, so they are the first `len(faceKeys)`
+        # rows found, and any later row that is not new matches one of them
+        first, inverse = _uniqueRows(nx.concatenate((faceKeys,
+                                                     nx.sort(facesToVertIDs[usable], axis=1))))
+        matched = inverse[len(faceKeys):]
+        named = matched < len(faceKeys)
+        # not all faces are necessarily tagged
+        self.physicalFaceMap[matched[named]] = facesData.physicalEntities[usable][named]
+        self.geometricalFaceMap[matched[named]] = facesData.geometricalEntities[usable][named]
+
+        self.physicalNames = self._readPhysicalNames(data, sections)
 
         # convert lists of cell vertices to a properly oriented masked array
-        maxVerts = max([len(v) for v in cellsToVertIDs])
-        # ticket:539 - NumPy 1.7 casts to array before concatenation and empty array defaults to float
-        cellsToVertIDs = [nx.concatenate((v, nx.array([-1] * (maxVerts-len(v)), dtype=nx.INT_DTYPE))) for v in cellsToVertIDs]
         cellsToVertIDs = nx.MA.masked_equal(cellsToVertIDs, value=-1).swapaxes(0,1)
 
         parprint("Done with cells and faces.")
@@ -996,194 +1350,45 @@ class MSHFile(GmshFile):
 
         self.fileobj.write("$EndElementData\n")
 
-    def _vertexCoordsAndMap(self, cellsToGmshVerts):
+    def _vertexCoordsAndMap(self, cellsToGmshVerts, nodeTags, nodeCoords):
         """
         Returns `vertexCoords` and mapping from Gmsh ID to `vertexCoords`
         indices (same as in MSHFile).
 
-        Unlike parent, doesn't use genfromtxt
-        because we want to avoid loading the entire msh file into memory.
+        Only the nodes that are vertices of cells are kept.
         """
-        allVerts     = [v for c in cellsToGmshVerts for v in c] # flatten
-        allVerts     = nx.unique(nx.array(allVerts, dtype=nx.INT_DTYPE)) # remove dups
-        allVerts     = nx.sort(allVerts)
+        allVerts     = nx.unique(cellsToGmshVerts[cellsToGmshVerts >= 0]) # sorted, without dups
         maxVertIdx   = allVerts[-1] + 1 # add one to offset zero
         vertGIDtoIdx = nx.ones(maxVertIdx, 'l') * -1 # gmsh ID -> vertexCoords idx
-        vertexCoords = nx.empty((len(allVerts), self.coordDimensions))
-        nodeCount    = 0
 
         # establish map. This works because allVerts is a sorted set.
         vertGIDtoIdx[allVerts] = nx.arange(len(allVerts))
 
-        nodesFile = open(self.nodesPath, 'r')
-        nodesFile.readline() # skip number of nodes
-
-        # now we walk through node file with a sorted unique list of vertices
-        # in hand. When we encounter 0th element in `allVerts`, save it
-        # to `vertexCoords` then pop its ID off `allVerts`.
-        for node in nodesFile:
-            line   = node.split()
-            nodeID = int(line[0])
-
-            if nodeID == allVerts[nodeCount]:
-                newVert = [float(x) for x in line[1:self.coordDimensions+1]]
-                vertexCoords[nodeCount,:] = nx.array(newVert)
-                nodeCount += 1
-
-            if len(allVerts) == nodeCount:
-                break
-
-        nodesFile.close()
+        sorter = nx.argsort(nodeTags)
+        rows = nx.searchsorted(nodeTags, allVerts, sorter=sorter)
+        rows = sorter[rows.clip(0, len(nodeTags) - 1)]
+        if (nodeTags[rows] != allVerts).any():
+            raise GmshException("Elements refer to nodes missing from the $Nodes section")
 
         # transpose for FiPy
-        transCoords = vertexCoords.swapaxes(0,1)
+        transCoords = nodeCoords[rows, :self.coordDimensions].swapaxes(0,1)
         return transCoords, vertGIDtoIdx
 
-    def _parseElementFile(self):
-        """
-        Return three objects, the first for non-ghost cells, the second for
-        ghost cells, and the third for faces.
-
-        All nastiness concerning ghost cell
-        calculation is consolidated here: if we were ever to need to CALCULATE
-        GHOST CELLS OURSELVES, the only code we'd have to change is in here.
-        """
-
-        def _parseTags(offset, currLineInts):
-            if offset == -1:
-                # if first valid shape
-                offset = currLineInts[0]
-
-            numTags = currLineInts[2]
-            tags    = currLineInts[3:(3+numTags)]
-
-            # the partition tags for don't seem to always be present
-            # and don't always make much sense when they are
-
-            if len(tags) >= 2:
-                physicalEntity = tags.pop(0)
-                geometricalEntity = tags.pop(0)
-            else:
-                physicalEntity = geometricalEntity = -1
-
-            return offset, tags, physicalEntity, geometricalEntity
-
-
-        cellsData = _ElementData()
-        ghostsData = _ElementData()
-        facesData = _ElementData()
-
-        cellOffset = -1 # this will be subtracted from gmsh ID to obtain global ID
-        faceOffset = -1 # this will be subtracted from gmsh ID to obtain global ID
-        pid = self.communicator.procID + 1
-
-        elemsFile = open(self.elemsPath, 'r')
-
-        elemsFile.readline() # skip number of elements
-        for el in elemsFile:
-            currLineInts = [int(x) for x in el.split()]
-            elemType     = currLineInts[1]
-
-            if elemType in self.numFacesPerCell.keys():
-                # element is a cell
-
-                (cellOffset,
-                 tags,
-                 physicalEntity,
-                 geometricalEntity) = _parseTags(offset=cellOffset,
-                                                 currLineInts=currLineInts)
-                currLineInts[0] -= cellOffset
-
-                if len(tags) > 0:
-                    # next item is a count
-                    if tags[0] != len(tags) - 1:
-                        warnings.warn("Partition count %d does not agree with number of remaining tags %d." % (tags[0], len(tags) - 1),
-                                      SyntaxWarning, stacklevel=2)
-                    tags = tags[1:]
-
-                if self.communicator.Nproc > 1:
-                    for tag in tags:
-                        if -tag == pid:
-                            # if we're collecting ghost cells and this is our ghost cell
-                            ghostsData.add(currLine=currLineInts, elType=elemType,
-                                           physicalEntity=physicalEntity,
-                                           geometricalEntity=geometricalEntity)
-                        elif tag == pid:
-                            # el is in this processor's partition or we collect all cells
-                            cellsData.add(currLine=currLineInts, elType=elemType,
-                                          physicalEntity=physicalEntity,
-                                          geometricalEntity=geometricalEntity)
-                else:
-                    # we collect all cells
-                    cellsData.add(currLine=currLineInts, elType=elemType,
-                                  physicalEntity=physicalEntity,
-                                  geometricalEntity=geometricalEntity)
-            elif elemType in self.numVertsPerFace.keys():
-                # element is a face
-
-                (faceOffset,
-                 tags,
-                 physicalEntity,
-                 geometricalEntity) = _parseTags(offset=faceOffset,
-                                                 currLineInts=currLineInts)
-                currLineInts[0] -= faceOffset
-
-                facesData.add(currLine=currLineInts, elType=elemType,
-                              physicalEntity=physicalEntity,
-                              geometricalEntity=geometricalEntity)
-
-        elemsFile.close()
-
-        return cellsData, ghostsData, facesData
-
-
-    def _parseNamesFile(self):
-        physicalNames = {
-            0: dict(),
-            1: dict(),
-            2: dict(),
-            3: dict()
-        }
-        if self.namesPath is not None:
-            namesFile = open(self.namesPath, 'r')
-
-            namesFile.readline() # skip number of elements
-            for nm in namesFile:
-                nm = nm.split()
-                if self.version > 2.0:
-                    dim = [int(nm.pop(0))]
-                else:
-                    # Gmsh format prior to 2.1 did not unambiguously tie
-                    # physical names to physical entities of different dimensions
-                    # http://article.gmane.org/gmane.comp.cad.gmsh.general/1601
-                    dim = [0, 1, 2, 3]
-                num = int(nm.pop(0))
-                name = " ".join(nm)[1:-1]
-                for d in dim:
-                    physicalNames[d][name] = int(num)
-
-            namesFile.close()
-
-        return physicalNames
-
     def makeMapVariables(self, mesh):
         """Utility function to make MeshVariables that define different domains in the mesh
         """
-        from fipy.variables.cellVariable import CellVariable
-        from fipy.variables.faceVariable import FaceVariable
-
-        self.physicalCellMap = CellVariable(mesh=mesh, value=self.physicalCellMap)
-        self.geometricalCellMap = CellVariable(mesh=mesh, value=self.geometricalCellMap)
-        self.physicalFaceMap = FaceVariable(mesh=mesh, value=self.physicalFaceMap)
-        self.geometricalFaceMap = FaceVariable(mesh=mesh, value=self.geometricalFaceMap)
-
-        physicalCells = dict()
-        for name in self.physicalNames[self.dimensions].keys():
-            physicalCells[name] = (self.physicalCellMap == self.physicalNames[self.dimensions][name])
-
-        physicalFaces = dict()
-        for name in self.physicalNames[self.dimensions-1].keys():
-            physicalFaces[name] = (self.physicalFaceMap == self.physicalNames[self.dimensions-1][name])
+        (self.physicalCellMap,
+         self.geometricalCellMap,
+         physicalCells,
+         self.physicalFaceMap,
+         self.geometricalFaceMap,
+         physicalFaces) = _makeMapVariables(mesh,
+                                            dimensions=self.dimensions,
+                                            physicalNames=self.physicalNames,
+                                            physicalCellMap=self.physicalCellMap,
+                                            geometricalCellMap=self.geometricalCellMap,
+                                            physicalFaceMap=self.physicalFaceMap,
+                                            geometricalFaceMap=self.geometricalFaceMap)
 
         return (self.physicalCellMap,
                 self.geometricalCellMap,
@@ -1270,31 +1475,258 @@ class MSHFile(GmshFile):
 
 class _ElementData(object):
     """
-    Bookkeeping for cells. Declared as own class for generality.
+    Bookkeeping for elements. Declared as own class for generality.
 
-    "nodes": A Python list of the vertices that make up this element
-    "shapes": A shapeTypes Python list
+    "nodes": An array of the Gmsh nodes that make up each element, padded with -1
+    "shapes": An array of the Gmsh element type of each element
+    "tags": An array of the Gmsh ID of each element
     "idmap": A Python list which maps vertexCoords idx -> global ID
-    "physicalEntities": A Python list of the Gmsh physical entities each element is in
-    "geometricalEntities": A Python list of the Gmsh geometrical entities each element is in
+    "physicalEntities": An array of the Gmsh physical entity each element is in
+    "geometricalEntities": An array of the Gmsh geometrical entity each element is in
+    "partitions": An array of the partitions each element is in, padded
+                  with 0. Partitions where the element is a ghost are negative.
     """
-    def __init__(self):
-        self.nodes = []
-        self.shapes = []
+    def __init__(self, shapes, tags, physicalEntities, geometricalEntities, nodes, partitions=None):
+        self.shapes = nx.asarray(shapes, dtype=nx.INT_DTYPE)
+        self.tags = nx.asarray(tags, dtype=nx.INT_DTYPE)
+        self.physicalEntities = nx.asarray(physicalEntities, dtype=nx.INT_DTYPE)
+        self.geometricalEntities = nx.asarray(geometricalEntities, dtype=nx.INT_DTYPE)
+        self.nodes = nx.asarray(nodes, dtype=nx.INT_DTYPE)
+        if partitions is None:
+            partitions = nx.zeros((len(self.shapes), 0), dtype=nx.INT_DTYPE)
+        self.partitions = nx.asarray(partitions, dtype=nx.INT_DTYPE)
         self.idmap = [] # vertexCoords idx -> gmsh ID (global ID)
-        self.physicalEntities = []
-        self.geometricalEntities = []
 
-    def add(self, currLine, elType, physicalEntity, geometricalEntity):
-        numTags = currLine[2]
-        self.nodes.append(currLine[(numTags+3):])
-        self.shapes.append(elType)
-        self.idmap.append(currLine[0])
-        self.physicalEntities.append(physicalEntity)
-        self.geometricalEntities.append(geometricalEntity)
+    def __len__(self):
+        return len(self.shapes)
+
+    def take(self, ids):
+        ids = nx.asarray(ids, dtype=nx.INT_DTYPE)
+        return _ElementData(shapes=self.shapes[ids],
+                            tags=self.tags[ids],
+                            physicalEntities=self.physicalEntities[ids],
+                            geometricalEntities=self.geometricalEntities[ids],
+                            nodes=self.nodes[ids],
+                            partitions=self.partitions[ids])
+
+    @staticmethod
+    def concatenate(elements):
+        """
+        Join a sequence of `_ElementData`, padding their `nodes` with -1
+        and their `partitions` with 0.
+        """
+        def pad(arrays, value):
+            width = max([a.shape[1] for a in arrays])
+            return nx.concatenate([nx.concatenate((a, value * nx.ones((len(a), width - a.shape[1]), dtype=a.dtype)), axis=1)
+                                   for a in arrays])
+
+        if len(elements) == 0:
+            return _ElementData(shapes=[], tags=[], physicalEntities=[], geometricalEntities=[],
+                                nodes=nx.zeros((0, 0)))
+
+        return _ElementData(shapes=nx.concatenate([e.shapes for e in elements]),
+                            tags=nx.concatenate([e.tags for e in elements]),
+                            physicalEntities=nx.concatenate([e.physicalEntities for e in elements]),
+                            geometricalEntities=nx.concatenate([e.geometricalEntities for e in elements]),
+                            nodes=pad([e.nodes for e in elements], -1),
+                            partitions=pad([e.partitions for e in elements], 0))
+
+class _MSHSection(object):
+    """
+    Cursor over the body of a section of a MSH file, either the numbers of
+    an ASCII section or the bytes of a binary one.
+    """
+    def __init__(self, data, start=0, byteorder=None, sizeType="u8"):
+        self.data = data
+        self.pos = start
+        self.byteorder = byteorder
+        self.sizeType = sizeType
+
+    def read(self, dtype, count=1):
+        if self.byteorder is None:
+            values = self.data[self.pos:self.pos + count].astype(dtype)
+            self.pos += count
+        else:
+            dtype = nx.dtype(dtype).newbyteorder(self.byteorder)
+            values = nx.frombuffer(self.data, dtype=dtype, count=count, offset=self.pos)
+            self.pos += values.nbytes
+        return values
+
+    def readCount(self):
+        return int(self.read(self.sizeType)[0])
+
+class _GmshCache(object):
+    """
+    On-disk cache of the meshes built from Gmsh, enabled by setting the
+    :envvar:`FIPY_GMSH_CACHE` environment variable to a directory.
+
+    Entries are keyed on the text of the geometry (or of the MSH file),
+    the versions of Gmsh and FiPy, the dimensions, the order and the
+    number of partitions, and hold the topology and geometry arrays of
+    each partition. Large arrays are mapped from the file, copy-on-write,
+    rather than read. Files included by a geometry are not part of the key.
+
+        >>> import shutil
+        >>> directory = tempfile.mkdtemp()
+        >>> os.environ["FIPY_GMSH_CACHE"] = directory
+        >>> geo = '''
+        ...     cellSize = 0.2;
+        ...     Point(1) = {0, 0, 0, cellSize};
+        ...     Point(2) = {1, 0, 0, cellSize};
+        ...     Point(3) = {1, 1, 0, cellSize};
+        ...     Point(4) = {0, 1, 0, cellSize};
+        ...     Line(5) = {1, 2};
+        ...     Line(6) = {2, 3};
+        ...     Line(7) = {3, 4};
+        ...     Line(8) = {4, 1};
+        ...     Line Loop(9) = {5, 6, 7, 8};
+        ...     Plane Surface(10) = {9};
+        ...     Physical Line("bottom") = {5};
+        ...     Physical Surface("square") = {10};
+        ...     '''
+        >>> cold = Gmsh2D(geo) # doctest: +GMSH
+        >>> print len(os.listdir(directory)) # doctest: +GMSH
+        1
+        >>> warm = Gmsh2D(geo) # doctest: +GMSH
+        >>> print nx.allclose(warm.cellCenters, cold.cellCenters) # doctest: +GMSH
+        True
+        >>> print nx.allclose(warm._cellToCellDistances, cold._cellToCellDistances) # doctest: +GMSH
+        True
+        >>> print warm.physicalFaces["bottom"].sum() == cold.physicalFaces["bottom"].sum() # doctest: +GMSH
+        True
+
+        >>> del os.environ["FIPY_GMSH_CACHE"]
+        >>> shutil.rmtree(directory)
+    """
+
+    # attributes that are not arrays or are rebuilt from the cached ones
+    _rebuilt = ("communicator", "representation", "topology", "mshFile",
+                "_interiorFaces", "_exteriorFaces",
+                "physicalCellMap", "geometricalCellMap", "physicalCells",
+                "physicalFaceMap", "geometricalFaceMap", "physicalFaces")
+
+    def __init__(self, arg, dimensions, coordDimensions, communicator, order, background):
+        self.communicator = communicator
+        self.path = None
+
+        directory = os.environ.get("FIPY_GMSH_CACHE")
+        if directory is None or background is not None:
+            return
+
+        if os.path.exists(arg):
+            f = open(arg, 'rb')
+            text = f.read()
+            f.close()
+        else:
+            text = arg
+
+        import hashlib
+        from fipy import __version__
+        key = hashlib.sha1()
+        for item in (text, gmshVersion(communicator), __version__,
+                     dimensions, coordDimensions, order, communicator.Nproc,
+                     nx.dtype(nx.INDEX_DTYPE).name):
+            key.update(repr(item))
+
+        self.directory = directory
+        self.path = os.path.join(directory, "%s-%d.msh.dump" % (key.hexdigest(), communicator.procID))
+
+    def load(self, mesh, dimensions):
+        """
+        Populate `mesh` from the cache and return `True`, or return `False`
+        if any partition is missing from the cache.
+        """
+        if self.path is None:
+            return False
+
+        from fipy.tools import dump
+        try:
+            state = dump.read(self.path, communicator=serialComm)
+        except Exception:
+            state = None
+        if not self.communicator.all(nx.array(state is not None)):
+            return False
+
+        from fipy.meshes.abstractMesh import AbstractMesh
+        from fipy.meshes.representations.meshRepresentation import _MeshRepresentation
+
+        AbstractMesh.__init__(mesh, communicator=self.communicator,
+                              _RepresentationClass=_MeshRepresentation,
+                              _TopologyClass=_GmshTopology)
+
+        attributes = state["attributes"]
+        for name, (mask, fill_value) in state["masks"].items():
+            attributes[name] = nx.MA.array(attributes[name], mask=mask, fill_value=fill_value)
+        for name in state["lists"]:
+            attributes[name] = attributes[name].tolist()
+        mesh.__dict__.update(attributes)
+
+        (mesh._interiorFaces,
+         mesh._exteriorFaces) = mesh._calcInteriorAndExteriorFaceIDs()
+
+        (mesh.physicalCellMap,
+         mesh.geometricalCellMap,
+         mesh.physicalCells,
+         mesh.physicalFaceMap,
+         mesh.geometricalFaceMap,
+         mesh.physicalFaces) = _makeMapVariables(mesh, dimensions=dimensions,
+                                                 physicalNames=state["physicalNames"],
+                                                 **state["maps"])
+
+        return True
+
+    def save(self, mesh, mshFile):
+        """
+        Store the arrays of `mesh`, and the named entities of the
+        `mshFile` it was read from, in the cache.
+        """
+        if self.path is None:
+            return
+
+        attributes = {}
+        masks = {}
+        lists = []
+        for name, value in mesh.__dict__.items():
+            if name in self._rebuilt:
+                continue
+            elif isinstance(value, nx.MA.MaskedArray):
+                attributes[name] = value.data
+                masks[name] = (nx.MA.getmaskarray(value), value.fill_value)
+            elif isinstance(value, list):
+                # such as the global IDs of the cells
+                attributes[name] = nx.array(value)
+                lists.append(name)
+            else:
+                attributes[name] = value
+
+        maps = dict((name, nx.asarray(getattr(mesh, name)))
+                    for name in ("physicalCellMap", "geometricalCellMap",
+                                 "physicalFaceMap", "geometricalFaceMap"))
+
+        from fipy.tools import dump
+        if not os.path.exists(self.directory):
+            try:
+                os.makedirs(self.directory)
+            except OSError:
+                # another process made it
+                pass
+
+        # other processes may be reading the same entry, which `dump.write()`
+        # replaces in one step
+        dump.write(dict(attributes=attributes, masks=masks, lists=lists, maps=maps,
+                        physicalNames=mshFile.physicalNames),
+                   filename=self.path, communicator=serialComm, compress=False)
 
 class _GmshTopology(_MeshTopology):
 
+    @property
+    def _concatenatedClass(self):
+        if self.mesh.dim == 2:
+            from fipy.meshes.mesh2D import Mesh2D
+            return Mesh2D
+        else:
+            return super(_GmshTopology, self)._concatenatedClass
+
     @property
     def _globalNonOverlappingCellIDs(self):
         """
@@ -1491,6 +1923,17 @@ class Gmsh2D(Mesh2D):
     >>> print (NW == squaredCircle.physicalFaces["NW"]).all() # doctest: +GMSH
     True
 
+    The cells and faces can be renumbered for locality, which carries the
+    labeled domains and boundaries over to the renumbered mesh
+
+    >>> renumbered = squaredCircle.renumbered() # doctest: +GMSH
+    >>> print (renumbered.physicalCells["Middle"].value
+    ...        == middle[renumbered.originalCellIDs]).all() # doctest: +GMSH
+    True
+    >>> print (renumbered.physicalFaces["NW"].value
+    ...        == NW[renumbered.originalFaceIDs]).all() # doctest: +GMSH
+    True
+
     It is possible to direct Gmsh to give the mesh different densities in
     different locations
 
@@ -1573,6 +2016,15 @@ class Gmsh2D(Mesh2D):
                  order=1,
                  background=None):
 
+        cache = _GmshCache(arg,
+                           dimensions=2,
+                           coordDimensions=coordDimensions,
+                           communicator=communicator,
+                           order=order,
+                           background=background)
+        if cache.load(self, dimensions=2):
+            return
+
         self.mshFile = openMSHFile(arg,
                                    dimensions=2,
                                    coordDimensions=coordDimensions,
@@ -1608,10 +2060,24 @@ class Gmsh2D(Mesh2D):
          self.geometricalFaceMap,
          self.physicalFaces) = self.mshFile.makeMapVariables(mesh=self)
 
+        cache.save(self, self.mshFile)
+
         del self.mshFile
 
         parprint("Exiting Gmsh2D")
 
+    def renumbered(self, ordering="rcm"):
+        renumbered = super(Gmsh2D, self).renumbered(ordering=ordering)
+
+        (renumbered.physicalCellMap,
+         renumbered.geometricalCellMap,
+         renumbered.physicalCells,
+         renumbered.physicalFaceMap,
+         renumbered.geometricalFaceMap,
+         renumbered.physicalFaces) = _renumberMapVariables(self, renumbered)
+
+        return renumbered
+
     def __setstate__(self, state):
         super(Gmsh2D, self).__setstate__(state)
         self.cellGlobalIDs = list(nx.arange(self.cellFaceIDs.shape[-1]))
@@ -1934,6 +2400,15 @@ class Gmsh3D(Mesh):
         lengths of the mesh cells
     """
     def __init__(self, arg, communicator=parallelComm, order=1, background=None):
+        cache = _GmshCache(arg,
+                           dimensions=3,
+                           coordDimensions=None,
+                           communicator=communicator,
+                           order=order,
+                           background=background)
+        if cache.load(self, dimensions=3):
+            return
+
         self.mshFile  = openMSHFile(arg,
                                     dimensions=3,
                                     communicator=communicator,
@@ -1966,8 +2441,22 @@ class Gmsh3D(Mesh):
          self.geometricalFaceMap,
          self.physicalFaces) = self.mshFile.makeMapVariables(mesh=self)
 
+        cache.save(self, self.mshFile)
+
         del self.mshFile
 
+    def renumbered(self, ordering="rcm"):
+        renumbered = super(Gmsh3D, self).renumbered(ordering=ordering)
+
+        (renumbered.physicalCellMap,
+         renumbered.geometricalCellMap,
+         renumbered.physicalCells,
+         renumbered.physicalFaceMap,
+         renumbered.geometricalFaceMap,
+         renumbered.physicalFaces) = _renumberMapVariables(self, renumbered)
+
+        return renumbered
+
     def __setstate__(self, state):
         super(Gmsh3D, self).__setstate__(state)
         self.cellGlobalIDs = list(nx.arange(self.cellFaceIDs.shape[-1]))
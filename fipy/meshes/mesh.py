@@ -64,6 +64,33 @@ __all__ = ["MeshAdditionError", "Mesh"]
 class MeshAdditionError(Exception):
     pass
 
+class _CachedGeometry(object):
+    """
+    A geometric quantity of a `Mesh` that is only calculated when it is
+    first needed.
+
+    The value is obtained from the method of the mesh named `calc` and is
+    stored in the mesh's `__dict__`, where it hides this descriptor until
+    it is discarded. When `calc` returns several quantities at once, their
+    `names` are given in order and all of them are stored.
+    """
+    def __init__(self, name, calc, names=None):
+        self.name = name
+        self.calc = calc
+        self.names = names or (name,)
+
+    def __get__(self, mesh, cls):
+        if mesh is None:
+            return self
+
+        values = getattr(mesh, self.calc)()
+        if len(self.names) == 1:
+            values = (values,)
+        for name, value in zip(self.names, values):
+            mesh.__dict__.setdefault(name, value)
+
+        return mesh.__dict__[self.name]
+
 class Mesh(AbstractMesh):
     """Generic mesh class using numerix to do the calculations
 
@@ -80,8 +107,8 @@ class Mesh(AbstractMesh):
         """faceVertexIds and cellFacesIds must be padded with minus ones."""
 
         self.vertexCoords = vertexCoords
-        self.faceVertexIDs = MA.masked_values(faceVertexIDs, -1)
-        self.cellFaceIDs = MA.masked_values(cellFaceIDs, -1)
+        self.faceVertexIDs = self._asIndices(faceVertexIDs)
+        self.cellFaceIDs = self._asIndices(cellFaceIDs)
 
         self.dim = self.vertexCoords.shape[0]
 
@@ -99,6 +126,21 @@ class Mesh(AbstractMesh):
         self._setTopology()
         self._setGeometry(scaleLength = 1.)
 
+    @staticmethod
+    def _asIndices(ids):
+        """
+        Mask the padding of `ids` and store them as `numerix.INDEX_DTYPE`.
+
+            >>> ids = Mesh._asIndices([[0, 1, 2], [3, -1, 4]])
+            >>> print ids
+            [[0 1 2]
+             [3 -- 4]]
+            >>> print ids.dtype == numerix.INDEX_DTYPE
+            True
+        """
+        ids = MA.filled(ids, -1)
+        return MA.masked_values(numerix.asarray(ids).astype(numerix.INDEX_DTYPE), -1)
+
     """
     Topology set and calc
     """
@@ -157,7 +199,7 @@ class Mesh(AbstractMesh):
     def _calcCellToCellIDsFilled(self):
         N = self.numberOfCells
         M = self._maxFacesPerCell
-        cellIDs = numerix.repeat(numerix.arange(N)[numerix.newaxis, ...], M, axis=0)
+        cellIDs = numerix.repeat(numerix.arange(N, dtype=numerix.INDEX_DTYPE)[numerix.newaxis, ...], M, axis=0)
         return MA.where(MA.getmaskarray(self._cellToCellIDs), cellIDs,
                         self._cellToCellIDs)
 
@@ -165,26 +207,119 @@ class Mesh(AbstractMesh):
     Geometry set and calc
     """
 
+    _faceCenters = _CachedGeometry("_faceCenters", "_calcFaceCenters")
+    _faceAreas = _CachedGeometry("_faceAreas", "_calcFaceAreas")
+    _cellCenters = _CachedGeometry("_cellCenters", "_calcCellCenters")
+    _internalFaceToCellDistances = _CachedGeometry("_internalFaceToCellDistances",
+                                                   "_calcFaceToCellDistAndVec",
+                                                   ("_internalFaceToCellDistances",
+                                                    "_cellToFaceDistanceVectors"))
+    _cellToFaceDistanceVectors = _CachedGeometry("_cellToFaceDistanceVectors",
+                                                 "_calcFaceToCellDistAndVec",
+                                                 ("_internalFaceToCellDistances",
+                                                  "_cellToFaceDistanceVectors"))
+    _internalCellDistances = _CachedGeometry("_internalCellDistances",
+                                             "_calcCellDistAndVec",
+                                             ("_internalCellDistances",
+                                              "_cellDistanceVectors"))
+    _cellDistanceVectors = _CachedGeometry("_cellDistanceVectors",
+                                           "_calcCellDistAndVec",
+                                           ("_internalCellDistances",
+                                            "_cellDistanceVectors"))
+    faceNormals = _CachedGeometry("faceNormals", "_calcFaceNormals")
+    _orientedFaceNormals = _CachedGeometry("_orientedFaceNormals", "_calcOrientedFaceNormals")
+    _cellVolumes = _CachedGeometry("_cellVolumes", "_calcCellVolumes")
+    _faceCellToCellNormals = _CachedGeometry("_faceCellToCellNormals", "_calcFaceCellToCellNormals")
+    _faceTangents1 = _CachedGeometry("_faceTangents1", "_calcFaceTangents",
+                                     ("_faceTangents1", "_faceTangents2"))
+    _faceTangents2 = _CachedGeometry("_faceTangents2", "_calcFaceTangents",
+                                     ("_faceTangents1", "_faceTangents2"))
+    _cellToCellDistances = _CachedGeometry("_cellToCellDistances", "_calcCellToCellDist")
+    _cellAreas = _CachedGeometry("_cellAreas", "_calcCellAreas")
+    _cellNormals = _CachedGeometry("_cellNormals", "_calcCellNormals")
+
+    _scaledFaceAreas = _CachedGeometry("_scaledFaceAreas", "_calcScaledFaceAreas")
+    _scaledCellVolumes = _CachedGeometry("_scaledCellVolumes", "_calcScaledCellVolumes")
+    _scaledCellCenters = _CachedGeometry("_scaledCellCenters", "_calcScaledCellCenters")
+    _scaledFaceToCellDistances = _CachedGeometry("_scaledFaceToCellDistances",
+                                                 "_calcScaledFaceToCellDistances")
+    _scaledCellDistances = _CachedGeometry("_scaledCellDistances", "_calcScaledCellDistances")
+
+    _scaledCellToCellDistances = _CachedGeometry("_scaledCellToCellDistances",
+                                                 "_calcScaledCellToCellDistances")
+    _areaProjections = _CachedGeometry("_areaProjections", "_calcAreaProjections")
+    _orientedAreaProjections = _CachedGeometry("_orientedAreaProjections",
+                                               "_calcOrientedAreaProjections")
+    _faceToCellDistanceRatio = _CachedGeometry("_faceToCellDistanceRatio",
+                                               "_calcFaceToCellDistanceRatio")
+    _faceAspectRatios = _CachedGeometry("_faceAspectRatios", "_calcFaceAspectRatios")
+
+    _faceDependentScaledGeometry = ("_scaledCellToCellDistances", "_areaProjections",
+                                    "_orientedAreaProjections", "_faceToCellDistanceRatio",
+                                    "_faceAspectRatios")
+    _scaledGeometry = ("_scaledFaceAreas", "_scaledCellVolumes", "_scaledCellCenters",
+                       "_scaledFaceToCellDistances",
+                       "_scaledCellDistances") + _faceDependentScaledGeometry
+    _geometry = ("_faceCenters", "_faceAreas", "_cellCenters",
+                 "_internalFaceToCellDistances", "_cellToFaceDistanceVectors",
+                 "_internalCellDistances", "_cellDistanceVectors",
+                 "faceNormals", "_orientedFaceNormals", "_cellVolumes",
+                 "_faceCellToCellNormals", "_faceTangents1", "_faceTangents2",
+                 "_cellToCellDistances", "_cellAreas", "_cellNormals") + _scaledGeometry
+
+    _geometryIsModified = False
+
     def _setGeometry(self, scaleLength = 1.):
-        self._faceCenters = self._calcFaceCenters()
-        self._faceAreas = self._calcFaceAreas()
-        self._cellCenters = self._calcCellCenters()
-        (self._internalFaceToCellDistances,
-         self._cellToFaceDistanceVectors) = self._calcFaceToCellDistAndVec()
-        (self._internalCellDistances,
-         self._cellDistanceVectors) = self._calcCellDistAndVec()
-        self.faceNormals = self._calcFaceNormals()
-        self._orientedFaceNormals = self._calcOrientedFaceNormals()
-        self._cellVolumes = self._calcCellVolumes()
-        self._faceCellToCellNormals = self._calcFaceCellToCellNormals()
-        (self._faceTangents1,
-         self._faceTangents2) = self._calcFaceTangents()
-        self._cellToCellDistances = self._calcCellToCellDist()
+        """
+        Each geometric quantity is calculated when it is first needed.
+        """
+        self._discardGeometry(self._geometry)
+        self._geometryIsModified = False
 
         self._setScaledGeometry(self.scale['length'])
 
-        self._cellAreas = self._calcCellAreas()
-        self._cellNormals = self._calcCellNormals()
+    def _discardGeometry(self, names):
+        for name in names:
+            self.__dict__.pop(name, None)
+
+    def _calcGeometry(self):
+        """
+        Calculate all the geometric quantities that have not been already,
+        before they are altered in place.
+        """
+        for name in self._geometry:
+            getattr(self, name)
+        self._geometryIsModified = True
+
+    def _releaseGeometry(self, *names):
+        """
+        Discard the named geometric quantities, or all of them, to save
+        memory. They will be recalculated if they are needed again.
+
+            >>> from fipy import *
+            >>> mesh = Tri2D(nx=2, ny=2)
+            >>> print "_faceTangents1" in mesh.__dict__
+            False
+            >>> tangents = mesh._faceTangents1
+            >>> print "_faceTangents1" in mesh.__dict__
+            True
+            >>> mesh._releaseGeometry("_faceTangents1", "_faceTangents2")
+            >>> print "_faceTangents1" in mesh.__dict__
+            False
+            >>> print numerix.allclose(mesh._faceTangents1, tangents)
+            True
+
+        Geometry that has been altered since it was calculated, such as
+        that of a periodic mesh, is not released
+
+            >>> mesh = PeriodicGrid2D(nx=2, ny=2)
+            >>> mesh._releaseGeometry()
+            >>> print "_faceTangents1" in mesh.__dict__
+            True
+
+        """
+        if not self._geometryIsModified:
+            self._discardGeometry(names or self._geometry)
 
     def _calcFaceAreas(self):
         faceVertexIDs = MA.filled(self.faceVertexIDs, -1)
@@ -370,19 +505,29 @@ class Mesh(AbstractMesh):
         self._setScaledValues()
 
     def _setScaledValues(self):
-        self._scaledFaceAreas = self._scale['area'] * self._faceAreas
-        self._scaledCellVolumes = self._scale['volume'] * self._cellVolumes
-        self._scaledCellCenters = self._scale['length'] * self._cellCenters
-        self._scaledFaceToCellDistances = self._scale['length'] * self._faceToCellDistances
-        self._scaledCellDistances = self._scale['length'] * self._cellDistances
-        self._setFaceDependentScaledValues()
+        self._discardGeometry(self._scaledGeometry)
+        self._cellCenterTreeCache = None
 
     def _setFaceDependentScaledValues(self):
-        self._scaledCellToCellDistances = self._scale['length'] * self._cellToCellDistances
-        self._areaProjections = self._calcAreaProjections()
-        self._orientedAreaProjections = self._calcOrientedAreaProjections()
-        self._faceToCellDistanceRatio = self._calcFaceToCellDistanceRatio()
-        self._faceAspectRatios = self._calcFaceAspectRatios()
+        self._discardGeometry(self._faceDependentScaledGeometry)
+
+    def _calcScaledFaceAreas(self):
+        return self._scale['area'] * self._faceAreas
+
+    def _calcScaledCellVolumes(self):
+        return self._scale['volume'] * self._cellVolumes
+
+    def _calcScaledCellCenters(self):
+        return self._scale['length'] * self._cellCenters
+
+    def _calcScaledFaceToCellDistances(self):
+        return self._scale['length'] * self._faceToCellDistances
+
+    def _calcScaledCellDistances(self):
+        return self._scale['length'] * self._cellDistances
+
+    def _calcScaledCellToCellDistances(self):
+        return self._scale['length'] * self._cellToCellDistances
 
     def _calcAreaScale(self):
         return self.scale['length']**2
@@ -454,6 +599,10 @@ class Mesh(AbstractMesh):
         newmesh = Mesh(newCoords, numerix.array(self.faceVertexIDs), numerix.array(self.cellFaceIDs))
         return newmesh
 
+    def _connectFaces(self, faces0, faces1):
+        self._calcGeometry()
+        super(Mesh, self)._connectFaces(faces0, faces1)
+
     def _handleFaceConnection(self):
         """
         The _faceCellToCellNormals were added to ensure faceNormals == _faceCellToCellNormals for periodic grids.
@@ -471,9 +620,9 @@ class Mesh(AbstractMesh):
     """calc Topology methods"""
 
     def _calcFaceCellIDs(self):
-        array = MA.array(MA.indices(self.cellFaceIDs.shape, 'l')[1],
+        array = MA.array(MA.indices(self.cellFaceIDs.shape, numerix.INDEX_DTYPE)[1],
                          mask=MA.getmask(self.cellFaceIDs))
-        faceCellIDs = MA.zeros((2, self.numberOfFaces), 'l')
+        faceCellIDs = MA.zeros((2, self.numberOfFaces), numerix.INDEX_DTYPE)
 
         ## Nasty bug: MA.put(arr, ids, values) fills its ids and
         ## values arguments when masked!  This was not the behavior
@@ -589,8 +738,30 @@ class Mesh(AbstractMesh):
            >>> print m0._getNearestCellID(m1.cellCenters.globalValue)
            [4 5 7 8]
 
+        The spatial index of the cell centers is built on first use and
+        discarded when the mesh is rescaled
+
+           >>> m2 = Grid2D(dx=(1., 1., 1.), dy=(1., 1., 1.)) + ((10,), (10,))
+           >>> print m2._getNearestCellID(((11.4, 12.9), (11.6, 10.1)))
+           [4 2]
+           >>> tree = m2._cellCenterTree
+           >>> print m2._cellCenterTree is tree # doctest: +SCIPY
+           True
+           >>> m2._setScaledGeometry(1.)
+           >>> print m2._cellCenterTree is tree # doctest: +SCIPY
+           False
+
         """
-        return numerix.nearest(data=self.cellCenters.globalValue, points=points)
+        return numerix.nearest(data=self.cellCenters.globalValue, points=points,
+                               tree=self._cellCenterTree)
+
+    _cellCenterTreeCache = None
+
+    @property
+    def _cellCenterTree(self):
+        if self._cellCenterTreeCache is None:
+            self._cellCenterTreeCache = numerix._nearestTree(self.cellCenters.globalValue)
+        return self._cellCenterTreeCache
 
     def _test(self):
         """
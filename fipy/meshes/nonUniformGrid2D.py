@@ -66,6 +66,7 @@ class NonUniformGrid2D(Mesh2D):
     first and then vertical faces.
     """
     def __init__(self, dx=1., dy=1., nx=None, ny=None, overlap=2, communicator=parallelComm,
+                 processGrid=None,
                  _RepresentationClass=_Grid2DRepresentation, _TopologyClass=_Grid2DTopology):
 
         builder = _NonuniformGrid2DBuilder()
@@ -75,10 +76,12 @@ class NonUniformGrid2D(Mesh2D):
             'dy': dy, 
             'nx': nx, 
             'ny': ny, 
-            'overlap': overlap
+            'overlap': overlap,
+            'processGrid': processGrid
         }
 
-        builder.buildGridData([dx, dy], [nx, ny], overlap, communicator)
+        builder.buildGridData([dx, dy], [nx, ny], overlap, communicator,
+                              processGrid=processGrid)
 
         ([self.dx, self.dy],
          [self.nx, self.ny],
@@ -97,6 +100,7 @@ class NonUniformGrid2D(Mesh2D):
          self.numberOfHorizontalRows,
          self.numberOfVerticalColumns,
          self.numberOfHorizontalFaces,
+         self._globalShape,
          vertices,
          faces,
          cells,
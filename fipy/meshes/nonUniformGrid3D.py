@@ -75,6 +75,7 @@ class NonUniformGrid3D(Mesh):
     Faces: XY faces numbered first, then XZ faces, then YZ faces. Within each subcategory, it is numbered in the usual way.
     """
     def __init__(self, dx = 1., dy = 1., dz = 1., nx = None, ny = None, nz = None, overlap=2, communicator=parallelComm,
+                 processGrid=None,
                  _RepresentationClass=_Grid3DRepresentation, _TopologyClass=_Grid3DTopology):
 
         builder = _NonuniformGrid3DBuilder()
@@ -87,10 +88,11 @@ class NonUniformGrid3D(Mesh):
             'ny': ny,
             'nz': nz,
             'overlap': overlap,
+            'processGrid': processGrid,
         }
 
         builder.buildGridData([dx, dy, dz], [nx, ny, nz], overlap,
-                              communicator)
+                              communicator, processGrid=processGrid)
 
         ([self.dx, self.dy, self.dz],
          [self.nx, self.ny, self.nz],
@@ -112,6 +114,7 @@ class NonUniformGrid3D(Mesh):
          self.numberOfHorizontalRows,
          self.numberOfVerticalColumns,
          self.numberOfLayersDeep,
+         self._globalShape,
          vertices,
          faces,
          cells,
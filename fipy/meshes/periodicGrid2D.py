@@ -57,8 +57,17 @@ from fipy.meshes.nonUniformGrid2D import NonUniformGrid2D
 __all__ = ["PeriodicGrid2D", "PeriodicGrid2DLeftRight", "PeriodicGrid2DTopBottom"]
 
 class _BasePeriodicGrid2D(NonUniformGrid2D):
-    def __init__(self, dx = 1., dy = 1., nx = None, ny = None, overlap=2, communicator=parallelComm, *args, **kwargs):
-        super(_BasePeriodicGrid2D, self).__init__(dx = dx, dy = dy, nx = nx, ny = ny, overlap=overlap, communicator=communicator, *args, **kwargs)
+    def __init__(self, dx = 1., dy = 1., nx = None, ny = None, overlap=2, communicator=parallelComm,
+                 processGrid=None, *args, **kwargs):
+        # faces can only be connected within a partition, so, by default,
+        # only partition along the last axis, as before
+        if processGrid is None:
+            localProcessGrid = (1, communicator.Nproc)
+        else:
+            localProcessGrid = processGrid
+        super(_BasePeriodicGrid2D, self).__init__(dx = dx, dy = dy, nx = nx, ny = ny, overlap=overlap, communicator=communicator,
+                                                  processGrid=localProcessGrid, *args, **kwargs)
+        self.args['processGrid'] = processGrid
         self._nonPeriodicCellVertexIDs = super(_BasePeriodicGrid2D, self)._cellVertexIDs
         self._orderedCellVertexIDs_data = super(_BasePeriodicGrid2D, self)._orderedCellVertexIDs
         self._nonPeriodicCellFaceIDs = numerix.array(super(_BasePeriodicGrid2D, self).cellFaceIDs)
@@ -73,6 +73,9 @@ def _suite():
         'fipy.meshes.cylindricalNonUniformGrid2D',
         'fipy.meshes.factoryMeshes',
         'fipy.meshes.abstractMesh',
+        'fipy.meshes.builders.abstractGridBuilder',
+        'fipy.meshes.topologies.abstractTopology',
+        'fipy.meshes.topologies.gridTopology',
         'fipy.meshes.representations.gridRepresentation'))
 
 if __name__ == '__main__':
@@ -52,6 +52,65 @@ from fipy.tools import numerix
 
 __all__ = []
 
+class _RaggedConnectivity(object):
+    """Compressed sparse row form of a padded, masked connectivity array.
+
+    The items attached to element `i` are
+    ``indices[offsets[i]:offsets[i+1]]`` and `elementIDs` holds the element
+    of each entry of `indices`. Arrays `aligned` with the padded one are
+    compressed the same way and stored as attributes.
+
+        >>> padded = numerix.MA.masked_values([[0, 1, 2],
+        ...                                    [3, -1, 4],
+        ...                                    [5, -1, -1]], -1)
+        >>> connectivity = _RaggedConnectivity(padded,
+        ...                                    orientations=[[1, -1, 1],
+        ...                                                  [1, 1, -1],
+        ...                                                  [-1, 1, 1]])
+        >>> print connectivity.indices
+        [0 3 5 1 2 4]
+        >>> print connectivity.offsets
+        [0 3 4 6]
+        >>> print connectivity.elementIDs
+        [0 0 0 1 2 2]
+        >>> print connectivity.orientations
+        [ 1  1 -1 -1  1 -1]
+
+    Values of the items are summed over each element with `sum()`
+
+        >>> print connectivity.sum(numerix.array([[10., 20., 30., 40., 50., 60.],
+        ...                                       [1., 2., 3., 4., 5., 6.]]),
+        ...                        weights=connectivity.orientations)
+        [[  0. -40. -10.]
+         [  0.  -4.  -1.]]
+    """
+    def __init__(self, padded, **aligned):
+        padded = numerix.MA.array(padded)
+        present = ~numerix.MA.getmaskarray(padded).swapaxes(0, 1)
+
+        self.indices = numerix.MA.filled(padded, 0).swapaxes(0, 1)[present]
+        counts = present.sum(axis=1)
+        self.offsets = numerix.concatenate(([0], numerix.cumsum(counts))).astype(self.indices.dtype)
+        self.elementIDs = numerix.repeat(numerix.arange(len(counts), dtype=self.indices.dtype), counts)
+
+        for name, values in aligned.items():
+            setattr(self, name, numerix.MA.filled(values, 0).swapaxes(0, 1)[present])
+
+    @property
+    def numberOfElements(self):
+        return len(self.offsets) - 1
+
+    def sum(self, values, weights=1):
+        """Sum `values` of each entry, optionally multiplied by `weights`,
+        over the entries of each element.
+        """
+        from fipy.tools.vector import _putAdd
+
+        values = numerix.asarray(values)
+        total = numerix.zeros(values.shape[:-1] + (self.numberOfElements,), 'd')
+        _putAdd(total, self.elementIDs, values * weights)
+        return total
+
 class _AbstractTopology(object):
     _concatenatedClass = None
 
@@ -241,3 +300,33 @@ class _AbstractTopology(object):
     def _cellTopology(self):
         """return a map of the topology of each cell of grid"""
         raise NotImplementedError
+
+    @property
+    def _cellFaceConnectivity(self):
+        """The faces of each cell and their orientations, as a
+        `_RaggedConnectivity`, in place of the padded `cellFaceIDs` and
+        `_cellToFaceOrientations`.
+
+            >>> from fipy import Grid2D, Tri2D
+            >>> mesh = Grid2D(nx=2, ny=1) + (Tri2D(nx=1, ny=1) + ((2,), (0,)))
+            >>> connectivity = mesh.topology._cellFaceConnectivity
+            >>> print connectivity.offsets
+            [ 0  4  8 11 14 17 20]
+            >>> print mesh._facesPerCell
+            [4 4 3 3 3 3]
+            >>> faceValue = mesh._faceAreas * mesh.faceNormals
+            >>> print numerix.allclose(connectivity.sum(faceValue[..., connectivity.indices],
+            ...                                         weights=connectivity.orientations), 0)
+            True
+        """
+        if not hasattr(self, "_cellFaceConnectivityCache"):
+            self._cellFaceConnectivityCache = _RaggedConnectivity(self.mesh.cellFaceIDs,
+                                                                  orientations=self.mesh._cellToFaceOrientations)
+        return self._cellFaceConnectivityCache
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
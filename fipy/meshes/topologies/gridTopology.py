@@ -58,6 +58,28 @@ from fipy.meshes.mesh import Mesh
 
 from fipy.meshes.topologies.abstractTopology import _AbstractTopology
 
+def _blockCellIDs(ranges, shape, offset=None):
+    """
+    Return the IDs, numbered with x varying fastest, of the cells of a grid
+    of `shape` that lie in the block spanned by the (start, stop) `ranges`
+    along each axis, shifted by `offset`.
+
+    >>> print _blockCellIDs(((1, 3), (0, 2)), (4, 3), offset=(1, 1))
+    [ 6  7 10 11]
+    >>> print _blockCellIDs(((0, 2), (1, 2)), (2, 2))
+    [2 3]
+    """
+    if offset is None:
+        offset = (0,) * len(shape)
+
+    IDs = numerix.zeros((), 'l')
+    stride = 1
+    for (start, stop), n, o in zip(ranges, shape, offset):
+        IDs = numerix.add.outer((numerix.arange(start, stop) + o) * stride, IDs)
+        stride *= n
+
+    return IDs.ravel()
+
 class _GridTopology(_AbstractTopology):
 
     @property
@@ -221,6 +243,19 @@ class _Grid2DTopology(_GridTopology):
 
     _concatenatedClass = Mesh2D
 
+    def _cellIDs(self, nonOverlapping, inGlobal):
+        mesh = self.mesh
+        if nonOverlapping:
+            ranges = ((mesh.overlap['left'], mesh.nx - mesh.overlap['right']),
+                      (mesh.overlap['bottom'], mesh.ny - mesh.overlap['top']))
+        else:
+            ranges = ((0, mesh.nx), (0, mesh.ny))
+
+        if inGlobal:
+            return _blockCellIDs(ranges, mesh._globalShape, mesh.offset)
+        else:
+            return _blockCellIDs(ranges, mesh.shape)
+
     @property
     def _globalNonOverlappingCellIDs(self):
         """Return the IDs of the local mesh in the context of the global parallel mesh.
@@ -237,10 +272,18 @@ class _Grid2DTopology(_GridTopology):
         | 0 | 1 |  A
         ---------
 
+        or [0, 1, 4, 5] for mesh A
+
+            A        B
+        ------------------
+        | 4 | 5 || 6 | 7 |
+        ------------------
+        | 0 | 1 || 2 | 3 |
+        ------------------
+
         .. note:: Trivial except for parallel meshes
         """
-        return numerix.arange((self.mesh.offset[1] + self.mesh.overlap['bottom']) * self.mesh.nx,
-                              (self.mesh.offset[1] + self.mesh.ny - self.mesh.overlap['top']) * self.mesh.nx)
+        return self._cellIDs(nonOverlapping=True, inGlobal=True)
 
     @property
     def _globalOverlappingCellIDs(self):
@@ -258,9 +301,18 @@ class _Grid2DTopology(_GridTopology):
         | 0 | 1 |  A
         ---------
 
+        or [0, 1, 2, 4, 5, 6] for mesh A
+
+            A        B
+        ------------------
+        | 4 | 5 || 6 | 7 |
+        ------------------
+        | 0 | 1 || 2 | 3 |
+        ------------------
+
         .. note:: Trivial except for parallel meshes
         """
-        return numerix.arange(self.mesh.offset[1] * self.mesh.nx, (self.mesh.offset[1] + self.mesh.ny) * self.mesh.nx)
+        return self._cellIDs(nonOverlapping=False, inGlobal=True)
 
     @property
     def _localNonOverlappingCellIDs(self):
@@ -278,10 +330,18 @@ class _Grid2DTopology(_GridTopology):
         | 0 | 1 |  A
         ---------
 
+        or [0, 1, 3, 4] for mesh A
+
+            A        B
+        ------------------
+        | 3 | 4 || 4 | 5 |
+        ------------------
+        | 0 | 1 || 1 | 2 |
+        ------------------
+
         .. note:: Trivial except for parallel meshes
         """
-        return numerix.arange(self.mesh.overlap['bottom'] * self.mesh.nx,
-                              (self.mesh.ny - self.mesh.overlap['top']) * self.mesh.nx)
+        return self._cellIDs(nonOverlapping=True, inGlobal=False)
 
     @property
     def _localOverlappingCellIDs(self):
@@ -316,6 +376,20 @@ class _Grid3DTopology(_GridTopology):
 
     _concatenatedClass = Mesh
 
+    def _cellIDs(self, nonOverlapping, inGlobal):
+        mesh = self.mesh
+        if nonOverlapping:
+            ranges = ((mesh.overlap['left'], mesh.nx - mesh.overlap['right']),
+                      (mesh.overlap['bottom'], mesh.ny - mesh.overlap['top']),
+                      (mesh.overlap['front'], mesh.nz - mesh.overlap['back']))
+        else:
+            ranges = ((0, mesh.nx), (0, mesh.ny), (0, mesh.nz))
+
+        if inGlobal:
+            return _blockCellIDs(ranges, mesh._globalShape, mesh.offset)
+        else:
+            return _blockCellIDs(ranges, mesh.shape)
+
     @property
     def _globalNonOverlappingCellIDs(self):
         """
@@ -324,8 +398,7 @@ class _Grid3DTopology(_GridTopology):
 
         .. note:: Trivial except for parallel meshes
         """
-        return numerix.arange((self.mesh.offset[2] + self.mesh.overlap['front']) * self.mesh.nx * self.mesh.ny,
-                              (self.mesh.offset[2] + self.mesh.nz - self.mesh.overlap['back']) * self.mesh.nx * self.mesh.ny)
+        return self._cellIDs(nonOverlapping=True, inGlobal=True)
 
     @property
     def _globalOverlappingCellIDs(self):
@@ -335,9 +408,7 @@ class _Grid3DTopology(_GridTopology):
 
         .. note:: Trivial except for parallel meshes
         """
-
-        return numerix.arange(self.mesh.offset[2] * self.mesh.nx * self.mesh.ny,
-                              (self.mesh.offset[2] + self.mesh.nz) * self.mesh.nx * self.mesh.ny)
+        return self._cellIDs(nonOverlapping=False, inGlobal=True)
 
     @property
     def _localNonOverlappingCellIDs(self):
@@ -347,8 +418,7 @@ class _Grid3DTopology(_GridTopology):
 
         .. note:: Trivial except for parallel meshes
         """
-        return numerix.arange(self.mesh.overlap['front'] * self.mesh.nx * self.mesh.ny,
-                              (self.mesh.nz - self.mesh.overlap['back']) * self.mesh.nx * self.mesh.ny)
+        return self._cellIDs(nonOverlapping=True, inGlobal=False)
 
     @property
     def _localOverlappingCellIDs(self):
@@ -373,3 +443,10 @@ class _PeriodicGrid1DTopology(_Grid1DTopology):
     @property
     def _globalOverlappingCellIDs(self):
         return super(_PeriodicGrid1DTopology, self)._globalOverlappingCellIDs % self.mesh.args['nx']
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -71,6 +71,7 @@ class UniformGrid2D(UniformGrid):
     """
     def __init__(self, dx=1., dy=1., nx=1, ny=1, origin=((0,),(0,)),
                        overlap=2, communicator=parallelComm,
+                       processGrid=None,
                        _RepresentationClass=_Grid2DRepresentation,
                        _TopologyClass=_Grid2DTopology):
 
@@ -87,11 +88,12 @@ class UniformGrid2D(UniformGrid):
             'nx': nx,
             'ny': ny,
             'origin': origin,
-            'overlap': overlap
+            'overlap': overlap,
+            'processGrid': processGrid
         }
 
         builder.buildGridData([dx, dy], [nx, ny], overlap, communicator,
-                              origin)
+                              origin, processGrid=processGrid)
 
         ([self.dx, self.dy],
          [self.nx, self.ny],
@@ -110,6 +112,7 @@ class UniformGrid2D(UniformGrid):
          self.numberOfHorizontalRows,
          self.numberOfVerticalColumns,
          self.numberOfHorizontalFaces,
+         self._globalShape,
          self.numberOfVerticalFaces,
          self.origin) = builder.gridData
 
@@ -466,7 +469,8 @@ class UniformGrid2D(UniformGrid):
     def _translate(self, vector):
         return self.__class__(dx = self.args['dx'], nx = self.args['nx'],
                               dy = self.args['dy'], ny = self.args['ny'],
-                             origin = numerix.array(self.args['origin']) + vector, overlap=self.args['overlap'])
+                             origin = numerix.array(self.args['origin']) + vector, overlap=self.args['overlap'],
+                             processGrid=self.args['processGrid'])
 
     def __mul__(self, factor):
         if numerix.shape(factor) is ():
@@ -474,7 +478,8 @@ class UniformGrid2D(UniformGrid):
 
         return UniformGrid2D(dx=self.args['dx'] * numerix.array(factor[0]), nx=self.args['nx'],
                              dy=self.args['dy'] * numerix.array(factor[1]), ny=self.args['ny'],
-                             origin=numerix.array(self.args['origin']) * factor, overlap=self.args['overlap'])
+                             origin=numerix.array(self.args['origin']) * factor, overlap=self.args['overlap'],
+                             processGrid=self.args['processGrid'])
 
     @property
     def _concatenableMesh(self):
@@ -483,6 +488,7 @@ class UniformGrid2D(UniformGrid):
         origin = args['origin']
         from fipy.tools import serialComm
         args['communicator'] = serialComm
+        args['processGrid'] = None
         del args['origin']
         return NonUniformGrid2D(**args) + origin
 
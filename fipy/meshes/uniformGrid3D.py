@@ -78,6 +78,7 @@ class UniformGrid3D(UniformGrid):
     """
     def __init__(self, dx = 1., dy = 1., dz = 1., nx = 1, ny = 1, nz = 1,
                  origin = [[0], [0], [0]], overlap=2, communicator=parallelComm,
+                 processGrid=None,
                  _RepresentationClass=_Grid3DRepresentation,
                  _TopologyClass=_Grid3DTopology):
 
@@ -95,11 +96,12 @@ class UniformGrid3D(UniformGrid):
             'ny': ny,
             'nz': nz,
             'origin': origin,
-            'overlap': overlap
+            'overlap': overlap,
+            'processGrid': processGrid
         }
 
         builder.buildGridData([dx, dy, dz], [nx, ny, nz], overlap,
-                              communicator, origin)
+                              communicator, origin, processGrid=processGrid)
 
         ([self.dx, self.dy, self.dz],
          [self.nx, self.ny, self.nz],
@@ -121,6 +123,7 @@ class UniformGrid3D(UniformGrid):
          self.numberOfHorizontalRows,
          self.numberOfVerticalColumns,
          self.numberOfLayers,
+         self._globalShape,
          self.origin) = builder.gridData
 
     """
@@ -423,13 +426,17 @@ class UniformGrid3D(UniformGrid):
         return self.__class__(dx = self.args['dx'], nx = self.args['nx'],
                               dy = self.args['dy'], ny = self.args['ny'],
                               dz = self.args['dz'], nz = self.args['nz'],
-                             origin = numerix.array(self.args['origin']) + vector, overlap=self.args['overlap'])
+                             origin = numerix.array(self.args['origin']) + vector, overlap=self.args['overlap'],
+                             processGrid=self.args['processGrid'])
 
     def __mul__(self, factor):
-        return UniformGrid3D(dx = self.dx * factor, nx = self.nx,
-                             dy = self.dy * factor, ny = self.ny,
-                             dz = self.dz * factor, nz = self.nz,
-                             origin = self.origin * factor)
+        factor = numerix.reshape(numerix.resize(factor, (3,)), (3, 1))
+
+        return UniformGrid3D(dx=self.args['dx'] * numerix.array(factor[0]), nx=self.args['nx'],
+                             dy=self.args['dy'] * numerix.array(factor[1]), ny=self.args['ny'],
+                             dz=self.args['dz'] * numerix.array(factor[2]), nz=self.args['nz'],
+                             origin=numerix.array(self.args['origin']) * factor, overlap=self.args['overlap'],
+                             processGrid=self.args['processGrid'])
 
     @property
     def _concatenableMesh(self):
@@ -438,6 +445,7 @@ class UniformGrid3D(UniformGrid):
         origin = args['origin']
         from fipy.tools import serialComm
         args['communicator'] = serialComm
+        args['processGrid'] = None
         del args['origin']
         return NonUniformGrid3D(**args) + origin
 
@@ -963,6 +971,20 @@ class UniformGrid3D(UniformGrid):
             True
 
             Oh, how boring. We'll assume the 3x2x1 permutations are good enough for everything else until proven otherwise.
+
+            A scaled grid keeps the partitioning of the original
+
+            >>> mesh = UniformGrid3D(nx=2, ny=3, nz=4, processGrid=(1, 1, 1))
+            >>> scaled = mesh * 2
+            >>> print scaled.args['processGrid'], scaled.args['nz']
+            (1, 1, 1) 4
+            >>> print numerix.allclose(scaled.cellCenters, mesh.cellCenters * 2)
+            True
+            >>> stretched = (mesh + ((1.,), (1.,), (1.,))) * (1, 2, 3)
+            >>> print numerix.allclose(stretched.cellVolumes, 6 * mesh.cellVolumes)
+            True
+            >>> print stretched.origin.ravel()
+            [ 1.  2.  3.]
         """
 
 def _test():
@@ -4,6 +4,9 @@ from fipy.tools  import parallelComm as _parallelComm
 from fipy.solvers.solver import *
 __all__ = list(solver.__all__)
 
+from fipy.solvers.newtonKrylovSolver import *
+__all__.extend(newtonKrylovSolver.__all__)
+
 solver = _parseSolver()
 
 def _envSolver(solver):
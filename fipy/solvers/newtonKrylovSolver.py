@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+
+##
+ # -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "newtonKrylovSolver.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # of Standards and Technology, an agency of the Federal Government.
+ # Pursuant to title 17 section 105 of the United States Code,
+ # United States Code this software is not subject to copyright
+ # protection, and this software is considered to be in the public domain.
+ # FiPy is an experimental system.
+ # NIST assumes no responsibility whatsoever for its use by whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # To the extent that NIST may hold copyright in countries other than the
+ # United States, you are hereby granted the non-exclusive irrevocable and
+ # unconditional right to print, publish, prepare derivative works and
+ # distribute this software, in any medium, or authorize others to do so on
+ # your behalf, on a royalty-free basis throughout the world.
+ #
+ # You may improve, modify, and create derivative works of the software or
+ # any portion of the software, and you may copy and distribute such
+ # modifications or works.  Modified works should carry a notice stating
+ # that you changed the software and should note the date and nature of any
+ # such change.  Please explicitly acknowledge the National Institute of
+ # Standards and Technology as the original source.
+ #
+ # This software can be redistributed and/or modified freely provided that
+ # any derivative works bear some notice that they are derived from it, and
+ # any modified versions bear some notice that they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+## `scipy` is otherwise `fipy.solvers.scipy`
+from __future__ import absolute_import
+
+__docformat__ = 'restructuredtext'
+
+import os
+
+from fipy.solvers.solver import MaximumIterationWarning, StagnatedSolverWarning
+from fipy.tools import numerix
+
+__all__ = ["NewtonKrylovSolver"]
+
+class NewtonKrylovSolver(object):
+    r"""
+    Solves a nonlinear equation by Newton's method, without forming its
+    Jacobian.
+
+    The residual :math:`\vec{F}(\vec{x}) = \mathsf{L}(\vec{x}) \vec{x} -
+    \vec{b}(\vec{x})` of the equation is obtained from
+    `Term.justResidualVector()`, with whichever solver package is in use.
+    Each Newton step :math:`\mathsf{J} \vec{s} = -\vec{F}` is solved by
+    the GMRES of SciPy, with the Jacobian-vector products approximated by
+    finite differences of the residual
+
+    .. math::
+
+       \mathsf{J} \vec{v} \approx \frac{\vec{F}(\vec{x} + h \vec{v}) - \vec{F}(\vec{x})}{h}
+
+    to the inexact tolerance of Eisenstat and Walker, and the step is
+    shortened by a backtracking line search until the residual decreases.
+
+    Unlike the linear solvers, which solve the linear system that a
+    `Term` builds once, a `NewtonKrylovSolver` drives its `equation` to
+    convergence itself, so it is not passed to `Term.solve()`.
+
+    A steady nonlinear diffusion problem
+
+        >>> from fipy import *
+        >>> mesh = Grid1D(nx=50, dx=0.02)
+        >>> phi = CellVariable(mesh=mesh)
+        >>> phi.constrain(0., mesh.facesLeft)
+        >>> phi.constrain(1., mesh.facesRight)
+        >>> eq = DiffusionTerm(coeff=1. + phi**2)
+
+    converges in a few Newton steps, the last of which reduce the residual
+    by orders of magnitude
+
+        >>> newton = NewtonKrylovSolver(eq, tolerance=1e-10)
+        >>> print newton.solve(phi) < 1e-10 * newton.residuals[0]
+        True
+        >>> residuals = newton.residuals
+        >>> print len(residuals) < 12
+        True
+        >>> print residuals[-1] / residuals[-2] < 1e-3, residuals[-2] / residuals[-3] < 1e-2
+        True True
+
+    to the same solution as repeated sweeps
+
+        >>> expected = phi.copy()
+        >>> phi.value = 0.
+        >>> for sweep in range(100):
+        ...     res = eq.sweep(var=phi)
+        >>> print numerix.allclose(phi, expected, atol=1e-8)
+        True
+
+    which, for this problem, satisfies :math:`\phi + \phi^3 / 3 = 4 x / 3`
+
+        >>> print numerix.allclose(phi + phi**3 / 3, 4 * mesh.x / 3, atol=1e-3)
+        True
+
+    """
+
+    def __init__(self, equation, tolerance=1e-8, iterations=50, linearIterations=100,
+                 precon=None, lineSearch=True, solver=None):
+        """
+        :Parameters:
+          - `equation`: The `Term` to solve.
+          - `tolerance`: The required reduction of the norm of the residual.
+          - `iterations`: The maximum number of Newton steps to take.
+          - `linearIterations`: The maximum number of GMRES iterations for
+            each Newton step.
+          - `precon`: Preconditioner, from the SciPy or pyAMG solvers,
+            built from the matrix of the linear system of `equation` at
+            the current iterate.
+          - `lineSearch`: Whether to shorten steps that do not decrease
+            the residual.
+          - `solver`: The linear solver that `equation` builds its
+            residual and, for `precon`, its matrix with. Its policy for
+            recycling the preconditioner between Newton steps, set with
+            `Solver.setPreconditionerReuse()`, applies. Defaults to the
+            default solver of `equation`.
+        """
+        self.equation = equation
+        self.tolerance = tolerance
+        self.iterations = iterations
+        self.linearIterations = linearIterations
+        self.preconditioner = precon
+        self.lineSearch = lineSearch
+        self.solver = solver
+        self.residuals = []
+
+    def solve(self, var=None, boundaryConditions=(), dt=None):
+        """
+        Solve `equation` for `var`, starting from its current value.
+
+        :Parameters:
+          - `var`: The variable to be solved for.
+          - `boundaryConditions`: A tuple of boundaryConditions.
+          - `dt`: The time step size.
+
+        Returns the norm of the final residual. The norms of the residual
+        at each accepted Newton step are kept in `residuals`.
+        """
+        from scipy.sparse.linalg import gmres, LinearOperator
+
+        solutionVar = self.equation._verifyVar(var)
+        if solutionVar.mesh.communicator.Nproc > 1:
+            raise Exception("NewtonKrylovSolver cannot be used with multiple processors")
+
+        solver = self.equation.getDefaultSolver(solutionVar, self.solver)
+
+        def residual(x):
+            solutionVar[:] = numerix.reshape(x, solutionVar.shape)
+            return numerix.array(self.equation.justResidualVector(var=var, solver=solver,
+                                                                  boundaryConditions=boundaryConditions,
+                                                                  dt=dt)).flatten()
+
+        x = numerix.array(solutionVar).flatten()
+        F = residual(x)
+        norm = numerix.L2norm(F)
+        self.residuals = [norm]
+
+        eta, etaMax = 0.5, 0.9
+        for iteration in range(self.iterations):
+            if norm <= self.tolerance * self.residuals[0] or norm == 0:
+                break
+
+            if self.preconditioner is None:
+                M = None
+            else:
+                def build():
+                    self.equation._prepareLinearSystem(var=var, solver=solver,
+                                                       boundaryConditions=boundaryConditions, dt=dt)
+                    return self.preconditioner._applyToMeshMatrix(solver.matrix)
+                M = solver._getPreconditioner((len(x), len(x)), build)
+
+            xNorm = numerix.L2norm(x)
+            products = [0]
+
+            def jacobianTimes(v):
+                products[0] += 1
+                v = v.ravel()
+                vNorm = numerix.L2norm(v)
+                if vNorm == 0:
+                    return numerix.zeros(v.shape, dtype=float)
+                h = numerix.sqrt(numerix.finfo(float).eps) * (1 + xNorm) / vNorm
+                return (residual(x + h * v) - F) / h
+
+            J = LinearOperator((len(x), len(x)), matvec=jacobianTimes, dtype=float)
+
+            ## don't solve the last step more accurately than needed
+            eta = max(eta, 0.5 * self.tolerance * self.residuals[0] / norm)
+
+            ## the step is found for a right-hand side of unit norm, for
+            ## which the relative tolerance of SciPy before 1.1 is also an
+            ## absolute one
+            if _gmresTakesAtol():
+                kwargs = dict(atol=eta)
+            else:
+                kwargs = dict()
+            step, info = gmres(J, -F / norm, tol=eta, restart=min(20, self.linearIterations),
+                               maxiter=self.linearIterations, M=M, **kwargs)
+            step *= norm
+            solver._recordIterations(products[0])
+
+            xNew, FNew, normNew = self._lineSearch(x, step, F, norm, residual)
+
+            if normNew >= norm:
+                ## finite differences can't resolve a smaller residual
+                import warnings
+                warnings.warn(StagnatedSolverWarning(self, iteration, norm / self.residuals[0]),
+                              stacklevel=2)
+                break
+
+            ## Eisenstat-Walker choice 2, with its safeguard
+            etaNew = 0.9 * (normNew / norm)**2
+            if 0.9 * eta**2 > 0.1:
+                etaNew = max(etaNew, 0.9 * eta**2)
+            eta = min(etaNew, etaMax)
+
+            x, F, norm = xNew, FNew, normNew
+            self.residuals.append(norm)
+        else:
+            if norm > self.tolerance * self.residuals[0]:
+                import warnings
+                warnings.warn(MaximumIterationWarning(self, self.iterations, norm / self.residuals[0]),
+                              stacklevel=2)
+
+        ## leave `var` at the accepted iterate
+        solutionVar[:] = numerix.reshape(x, solutionVar.shape)
+
+        if 'FIPY_VERBOSE_SOLVER' in os.environ:
+            from fipy.tools.debug import PRINT
+            PRINT('iterations: %d / %d' % (len(self.residuals) - 1, self.iterations))
+            PRINT('residual:', norm)
+
+        return norm
+
+    def _lineSearch(self, x, step, F, norm, residual):
+        """
+        Backtrack along `step` until the residual satisfies the Armijo
+        condition, fitting a quadratic to the norm of the residual.
+        """
+        lam = 1.
+        for backtrack in range(10):
+            xNew = x + lam * step
+            FNew = residual(xNew)
+            normNew = numerix.L2norm(FNew)
+            if not self.lineSearch or normNew <= (1 - 1e-4 * lam) * norm:
+                break
+            ## minimum of the quadratic through the norms at 0 and lam,
+            ## with the slope of the Newton direction at 0
+            lamNew = lam**2 * norm**2 / (normNew**2 + (2 * lam - 1) * norm**2)
+            lam = min(max(lamNew, 0.1 * lam), 0.5 * lam)
+
+        return xNew, FNew, normNew
+
+    def __repr__(self):
+        return '%s(tolerance=%g, iterations=%g)' \
+            % (self.__class__.__name__, self.tolerance, self.iterations)
+
+def _gmresTakesAtol():
+    """
+    Whether the GMRES of SciPy takes an absolute tolerance, which it does
+    from version 1.1.
+    """
+    import scipy
+    from distutils.version import LooseVersion
+    return LooseVersion(scipy.__version__) >= LooseVersion("1.1")
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
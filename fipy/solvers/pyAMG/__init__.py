@@ -1,3 +1,5 @@
+from fipy.solvers.pyAMG.preconditioners import *
+
 from fipy.solvers.pyAMG.linearGMRESSolver import *
 from fipy.solvers.pyAMG.linearCGSSolver import *
 from fipy.solvers.pyAMG.linearPCGSolver import *
@@ -14,6 +16,7 @@ __all__ = ["DefaultSolver",
            "DefaultAsymmetricSolver",
            "GeneralSolver"]
 
+__all__.extend(preconditioners.__all__)
 __all__.extend(linearGMRESSolver.__all__)
 __all__.extend(linearCGSSolver.__all__)
 __all__.extend(linearPCGSolver.__all__)
@@ -65,4 +65,6 @@ class LinearGeneralSolver(_ScipySolver):
         else:
             verbosity = False
 
-        return solve(L.matrix, b, verb=verbosity, tol=self.tolerance)
+        # pyamg only takes CSR or BSR matrices, but grids are stored by
+        # diagonals
+        return solve(L.matrix.tocsr(), b, verb=verbosity, tol=self.tolerance)
@@ -1 +1,6 @@
-from fipy.solvers.pyAMG.preconditioners.smoothedAggregationPreconditioner import SmoothedAggregationPreconditioner
+from fipy.solvers.pyAMG.preconditioners.smoothedAggregationPreconditioner import *
+from fipy.solvers.pyAMG.preconditioners.fieldSplitPreconditioner import *
+
+__all__ = []
+__all__.extend(smoothedAggregationPreconditioner.__all__)
+__all__.extend(fieldSplitPreconditioner.__all__)
@@ -48,11 +48,15 @@
 
 from pyamg import smoothed_aggregation_solver
 
+from fipy.solvers.scipy.preconditioners.preconditioner import Preconditioner
+
 __all__ = ["SmoothedAggregationPreconditioner"]
 
-class SmoothedAggregationPreconditioner():
+class SmoothedAggregationPreconditioner(Preconditioner):
     def __init__(self):
         pass
 
     def _applyToMatrix(self, A):
-        return smoothed_aggregation_solver(A).aspreconditioner(cycle='V')
+        # pyamg only takes CSR or BSR matrices, but grids are stored by
+        # diagonals
+        return smoothed_aggregation_solver(A.tocsr()).aspreconditioner(cycle='V')
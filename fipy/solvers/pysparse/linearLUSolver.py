@@ -66,7 +66,9 @@ class LinearLUSolver(PysparseSolver):
     non-symmetric coefficient matrix using partial pivoting.
 
     The `LinearLUSolver` is a wrapper class for the the PySparse_
-    `superlu.factorize()` method.
+    `superlu.factorize()` method. The factorization is kept and reused for
+    as long as the matrix does not change. Call `invalidateFactorization()`
+    to discard it.
 
     .. _PySparse: http://pysparse.sourceforge.net
 
@@ -97,7 +99,8 @@ class LinearLUSolver(PysparseSolver):
         L = L * (1 / maxdiag)
         b = b * (1 / maxdiag)
 
-        LU = superlu.factorize(L.matrix.to_csr())
+        LU = self._getFactorization(L._fingerprint,
+                                    lambda: superlu.factorize(L.matrix.to_csr()))
 
         if DEBUG:
             import sys
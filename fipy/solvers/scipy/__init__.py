@@ -1,3 +1,5 @@
+from fipy.solvers.scipy.preconditioners import *
+
 from fipy.solvers.scipy.linearCGSSolver import *
 from fipy.solvers.scipy.linearGMRESSolver import *
 from fipy.solvers.scipy.linearBicgstabSolver import *
@@ -14,6 +16,7 @@ __all__ = ["DefaultSolver",
            "DefaultAsymmetricSolver",
            "GeneralSolver"]
 
+__all__.extend(preconditioners.__all__)
 __all__.extend(linearCGSSolver.__all__)
 __all__.extend(linearGMRESSolver.__all__)
 __all__.extend(linearBicgstabSolver.__all__)
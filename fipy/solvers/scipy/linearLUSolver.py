@@ -61,6 +61,9 @@ class LinearLUSolver(_ScipySolver):
     The `LinearLUSolver` solves a linear system of equations using
     LU-factorisation.  The `LinearLUSolver` is a wrapper class for the
     the Scipy `scipy.sparse.linalg.splu` moduleq.
+
+    The factorization is kept and reused for as long as the matrix does not
+    change. Call `invalidateFactorization()` to discard it.
     """
 
     def _solve_(self, L, x, b):
@@ -70,10 +73,11 @@ class LinearLUSolver(_ScipySolver):
         L = L * (1 / maxdiag)
         b = b * (1 / maxdiag)
 
-        LU = splu(L.matrix.asformat("csc"), diag_pivot_thresh=1.,
-                                            relax=1,
-                                            panel_size=10,
-                                            permc_spec=3)
+        LU = self._getFactorization(L._fingerprint,
+                                    lambda: splu(L.matrix.asformat("csc"), diag_pivot_thresh=1.,
+                                                                           relax=1,
+                                                                           panel_size=10,
+                                                                           permc_spec=3))
 
         error0 = numerix.sqrt(numerix.sum((L * x - b)**2))
 
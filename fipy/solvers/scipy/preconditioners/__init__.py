@@ -0,0 +1,6 @@
+from fipy.solvers.scipy.preconditioners.iluPreconditioner import *
+from fipy.solvers.scipy.preconditioners.fieldSplitPreconditioner import *
+
+__all__ = []
+__all__.extend(iluPreconditioner.__all__)
+__all__.extend(fieldSplitPreconditioner.__all__)
@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "fieldSplitPreconditioner.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # of Standards and Technology, an agency of the Federal Government.
+ # Pursuant to title 17 section 105 of the United States Code,
+ # United States Code this software is not subject to copyright
+ # protection, and this software is considered to be in the public domain.
+ # FiPy is an experimental system.
+ # NIST assumes no responsibility whatsoever for its use by whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # To the extent that NIST may hold copyright in countries other than the
+ # United States, you are hereby granted the non-exclusive irrevocable and
+ # unconditional right to print, publish, prepare derivative works and
+ # distribute this software, in any medium, or authorize others to do so on
+ # your behalf, on a royalty-free basis throughout the world.
+ #
+ # You may improve, modify, and create derivative works of the software or
+ # any portion of the software, and you may copy and distribute such
+ # modifications or works.  Modified works should carry a notice stating
+ # that you changed the software and should note the date and nature of any
+ # such change.  Please explicitly acknowledge the National Institute of
+ # Standards and Technology as the original source.
+ #
+ # This software can be redistributed and/or modified freely provided that
+ # any derivative works bear some notice that they are derived from it, and
+ # any modified versions bear some notice that they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+
+__docformat__ = 'restructuredtext'
+
+from scipy.sparse import diags
+from scipy.sparse.linalg import LinearOperator
+
+from fipy.solvers.scipy.preconditioners.preconditioner import Preconditioner
+from fipy.solvers.scipy.preconditioners.iluPreconditioner import ILUPreconditioner
+from fipy.tools import numerix
+
+__all__ = ["FieldSplitPreconditioner"]
+
+class FieldSplitPreconditioner(Preconditioner):
+    r"""
+    Block preconditioner for coupled equations.
+
+    The matrix of a coupled system, or of a vector variable, is made of
+    one block per pair of equation and variable, each the size of the
+    mesh. Rather than precondition the whole matrix at once, the
+    `FieldSplitPreconditioner` preconditions each diagonal block, for a
+    single field, with `blockPreconditioner` and couples the fields with
+    one of
+
+    `"jacobi"`
+        the diagonal blocks alone, ignoring the coupling.
+
+    `"gauss-seidel"`
+        a forward sweep over the fields, with the lower triangle of blocks.
+
+    `"schur"`
+        a block LDU factorization, splitting the first field from the
+        rest, with the Schur complement approximated by
+        :math:`A_{11} - A_{10} \mathrm{diag}(A_{00})^{-1} A_{01}`. If
+        :math:`A_{00}` has zeros on its diagonal, the approximation does
+        not exist and `"gauss-seidel"` is used instead, with a warning.
+
+    Fields that are only weakly coupled, like
+
+        >>> from fipy import *
+        >>> from fipy.solvers.scipy import LinearGMRESSolver, LinearLUSolver
+        >>> from fipy.solvers.scipy.preconditioners import *
+        >>> mesh = Grid2D(nx=20, ny=20)
+        >>> u = CellVariable(mesh=mesh)
+        >>> v = CellVariable(mesh=mesh)
+        >>> u.constrain(1., mesh.facesLeft)
+        >>> v.constrain(1., mesh.facesRight)
+        >>> eq = ((TransientTerm(var=u) == DiffusionTerm(coeff=10., var=u)
+        ...        + ImplicitSourceTerm(coeff=0.1, var=v) - ImplicitSourceTerm(coeff=0.1, var=u))
+        ...       & (TransientTerm(var=v) == DiffusionTerm(coeff=1., var=v)
+        ...          + ImplicitSourceTerm(coeff=0.1, var=u) - ImplicitSourceTerm(coeff=0.1, var=v)))
+        >>> eq.solve(dt=1., solver=LinearLUSolver())
+        >>> expected = numerix.concatenate((u.value, v.value))
+
+    are well served by `"jacobi"` or `"gauss-seidel"`, which take far
+    fewer iterations than no preconditioner at all
+
+        >>> u.value = v.value = 0.
+        >>> plain = LinearGMRESSolver(tolerance=1e-10)
+        >>> eq.solve(dt=1., solver=plain)
+        >>> for coupling in ("jacobi", "gauss-seidel"):
+        ...     u.value = v.value = 0.
+        ...     solver = LinearGMRESSolver(tolerance=1e-10,
+        ...                                precon=FieldSplitPreconditioner(coupling=coupling))
+        ...     eq.solve(dt=1., solver=solver)
+        ...     print coupling, plain.numberOfIterations > 5 * solver.numberOfIterations,
+        ...     print numerix.allclose(numerix.concatenate((u, v)), expected, atol=1e-8)
+        jacobi True True
+        gauss-seidel True True
+
+    but strongly coupled fields with a singular diagonal block, like those
+    of the Cahn-Hilliard equation, need the Schur complement
+
+        >>> phi = CellVariable(mesh=mesh, value=0.5 + 0.1 * numerix.sin(mesh.x))
+        >>> psi = CellVariable(mesh=mesh)
+        >>> d2fdphi2 = 1 - 6 * phi * (1 - phi)
+        >>> eq = ((TransientTerm(var=phi) == DiffusionTerm(var=psi))
+        ...       & (ImplicitSourceTerm(coeff=1., var=psi)
+        ...          == ImplicitSourceTerm(coeff=d2fdphi2, var=phi)
+        ...          - DiffusionTerm(var=phi)))
+        >>> eq.solve(dt=1., solver=LinearLUSolver())
+        >>> expected = numerix.concatenate((phi.value, psi.value))
+        >>> phi.value = 0.5 + 0.1 * numerix.sin(mesh.x)
+        >>> solver = LinearGMRESSolver(tolerance=1e-10, precon=FieldSplitPreconditioner())
+        >>> eq.solve(dt=1., solver=solver)
+        >>> print solver.numberOfIterations < 10
+        True
+        >>> print numerix.allclose(numerix.concatenate((phi, psi)), expected, atol=1e-8)
+        True
+
+    A first field with zeros on its diagonal has no Schur complement
+    approximation
+
+        >>> from scipy.sparse import csr_matrix
+        >>> A = csr_matrix([[0., 1., 1., 0.],
+        ...                 [1., 1., 0., 1.],
+        ...                 [1., 0., 2., 0.],
+        ...                 [0., 1., 0., 2.]])
+        >>> import warnings
+        >>> savedFilters = list(warnings.filters)
+        >>> warnings.resetwarnings()
+        >>> warnings.simplefilter("error", UserWarning, append=True)
+        >>> M = FieldSplitPreconditioner()._applyToMatrix(A, fields=2)
+        Traceback (most recent call last):
+          ...
+        UserWarning: The first field has zeros on its diagonal, so its Schur complement can't be approximated. Using gauss-seidel coupling instead.
+
+    so it is coupled to the rest by a forward sweep
+
+        >>> warnings.simplefilter("ignore", UserWarning)
+        >>> M = FieldSplitPreconditioner()._applyToMatrix(A, fields=2)
+        >>> warnings.filters = savedFilters
+        >>> print numerix.allclose(M.matvec(numerix.ones(4)), [0., 1., 0.5, 0.])
+        True
+
+    """
+
+    def __init__(self, blockPreconditioner=None, coupling="schur"):
+        """
+        :Parameters:
+          - `blockPreconditioner`: Preconditioner to apply to the block of
+            each field. Defaults to an `ILUPreconditioner`.
+          - `coupling`: One of `"jacobi"`, `"gauss-seidel"`, or `"schur"`,
+            the default.
+        """
+        if coupling not in ("jacobi", "gauss-seidel", "schur"):
+            raise ValueError, "unknown coupling '%s'" % coupling
+
+        if blockPreconditioner is None:
+            blockPreconditioner = ILUPreconditioner()
+
+        self.blockPreconditioner = blockPreconditioner
+        self.coupling = coupling
+
+    def _applyToMeshMatrix(self, L):
+        return self._applyToMatrix(L.matrix, fields=getattr(L, "numberOfVariables", 1))
+
+    def _applyToMatrix(self, A, fields=1):
+        A = A.tocsr()
+        N = A.shape[0] // fields
+        slices = [slice(i * N, (i + 1) * N) for i in range(fields)]
+
+        if self.coupling == "schur" and fields > 1:
+            diagonal = A[:N, :N].diagonal()
+            if (diagonal != 0).all():
+                return self._schur(A, N, diagonal)
+
+            import warnings
+            warnings.warn("The first field has zeros on its diagonal, so its Schur complement "
+                          "can't be approximated. Using gauss-seidel coupling instead.",
+                          UserWarning, stacklevel=2)
+
+        diagonal = [self.blockPreconditioner._applyToMatrix(A[s, s]) for s in slices]
+
+        if self.coupling == "jacobi":
+            def matvec(r):
+                r = r.ravel()
+                return numerix.concatenate([M.matvec(r[s]) for M, s in zip(diagonal, slices)])
+        else:
+            ## each row of blocks to the left of the diagonal
+            lower = [A[s, :s.start] for s in slices]
+
+            def matvec(r):
+                r = r.ravel()
+                x = numerix.zeros(r.shape, dtype=r.dtype)
+                for M, lo, s in zip(diagonal, lower, slices):
+                    x[s] = M.matvec(r[s] - lo * x[:s.start])
+                return x
+
+        return LinearOperator(A.shape, matvec=matvec, dtype=A.dtype)
+
+    def _schur(self, A, N, diagonal):
+        A00, A01 = A[:N, :N], A[:N, N:]
+        A10, A11 = A[N:, :N], A[N:, N:]
+
+        S = A11 - A10 * diags(1. / diagonal) * A01
+        M00 = self.blockPreconditioner._applyToMatrix(A00)
+        MS = self.blockPreconditioner._applyToMatrix(S.tocsr())
+
+        def matvec(r):
+            r = r.ravel()
+            y0 = M00.matvec(r[:N])
+            y1 = MS.matvec(r[N:] - A10 * y0)
+            return numerix.concatenate((y0 - M00.matvec(A01 * y1), y1))
+
+        return LinearOperator(A.shape, matvec=matvec, dtype=A.dtype)
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
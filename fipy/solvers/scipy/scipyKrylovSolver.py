@@ -67,14 +67,24 @@ class _ScipyKrylovSolver(_ScipySolver):
         if self.preconditioner is None:
             M = None
         else:
-            M = self.preconditioner._applyToMatrix(A)
+            M = self._getPreconditioner(A.shape,
+                                        lambda: self.preconditioner._applyToMeshMatrix(L))
+
+        iterations = [0]
+        def callback(xk):
+            iterations[0] += 1
 
         x, info = self.solveFnc(A, b, x,
                                 tol=self.tolerance,
                                 maxiter=self.iterations,
-                                M=M)
+                                M=M,
+                                callback=callback)
+
+        self._recordIterations(iterations[0])
 
         if 'FIPY_VERBOSE_SOLVER' in os.environ:
+            from fipy.tools.debug import PRINT
+            PRINT('iterations: %d / %d' % (iterations[0], self.iterations))
             if info < 0:
                 PRINT('failure', self._warningList[info].__class__.__name__)
 
@@ -108,9 +108,14 @@ class Solver(object):
     """
     The base `LinearXSolver` class.
 
+    After a solve, `numberOfIterations` holds the number of iterations it
+    took, for those solvers that report it, and is `None` otherwise.
+
     .. attention:: This class is abstract. Always create one of its subclasses.
     """
 
+    numberOfIterations = None
+
     def __init__(self, tolerance=1e-10, iterations=1000, precon=None):
         """
         Create a `Solver` object.
@@ -129,6 +134,150 @@ class Solver(object):
 
         self.preconditioner = precon
 
+    _factorization = None
+    _factorizationKey = None
+
+    def invalidateFactorization(self):
+        """
+        Discard the factorization cached by a direct solver, forcing the
+        next solve to factorize the matrix again.
+
+        The factorization is reused for as long as a cheap fingerprint of
+        the matrix values and structure does not change, as is the case
+        for constant-coefficient problems.
+
+            >>> from fipy import *
+            >>> mesh = Grid1D(nx=5)
+            >>> var = CellVariable(mesh=mesh)
+            >>> var.constrain(1., mesh.facesLeft)
+            >>> eq = TransientTerm() == DiffusionTerm()
+            >>> solver = LinearLUSolver()
+            >>> eq.solve(var, dt=1., solver=solver)
+            >>> LU = solver._factorization
+            >>> eq.solve(var, dt=1., solver=solver)
+            >>> print solver._factorization is LU
+            True
+            >>> eq.solve(var, dt=2., solver=solver)
+            >>> print solver._factorization is LU
+            False
+            >>> LU = solver._factorization
+            >>> solver.invalidateFactorization()
+            >>> eq.solve(var, dt=2., solver=solver)
+            >>> print solver._factorization is LU
+            False
+
+        """
+        self._factorization = None
+        self._factorizationKey = None
+
+    def _getFactorization(self, key, factorize):
+        """
+        Return the cached factorization if `key`, a fingerprint of the
+        matrix, matches the one it was computed for. Otherwise, cache and
+        return the result of `factorize()`.
+        """
+        if self._factorization is None or key != self._factorizationKey:
+            self._factorization = None
+            self._factorization = factorize()
+            self._factorizationKey = key
+
+        return self._factorization
+
+    _preconditionerCache = None
+    _preconditionerKey = None
+    _preconditionerUses = 0
+    _preconditionerIterations = None
+    _preconditionerRebuildEvery = 1
+    _preconditionerMaxIterations = None
+
+    def setPreconditionerReuse(self, every=1, maxIterations=None):
+        """
+        Set the policy for recycling a preconditioner between solves.
+
+        By default, the preconditioner is rebuilt for every solve. Building
+        an algebraic multigrid hierarchy often costs more than the solve
+        itself, and a preconditioner built for one time step is usually a
+        good one for the next.
+
+        :Parameters:
+          - `every`: Rebuild the preconditioner after it has been used for
+            this many solves.
+          - `maxIterations`: Rebuild the preconditioner if the previous
+            solve took more than this many iterations.
+
+        The preconditioner is always rebuilt if the size of the matrix
+        changes.
+
+            >>> from fipy import *
+            >>> solver = DefaultSolver()
+            >>> solver.setPreconditionerReuse(every=3)
+            >>> builds = []
+            >>> def build():
+            ...     builds.append(None)
+            ...     return len(builds)
+            >>> print [solver._getPreconditioner((10,), build) for i in range(7)]
+            [1, 1, 1, 2, 2, 2, 3]
+            >>> print solver._getPreconditioner((20,), build)
+            4
+
+        A slow solve triggers a rebuild before the next one
+
+            >>> solver.setPreconditionerReuse(every=100, maxIterations=50)
+            >>> print solver._getPreconditioner((20,), build)
+            5
+            >>> solver._recordIterations(20)
+            >>> print solver._getPreconditioner((20,), build)
+            5
+            >>> solver._recordIterations(60)
+            >>> print solver._getPreconditioner((20,), build)
+            6
+            >>> solver.invalidatePreconditioner()
+            >>> print solver._getPreconditioner((20,), build)
+            7
+
+        """
+        self._preconditionerRebuildEvery = every
+        self._preconditionerMaxIterations = maxIterations
+        self.invalidatePreconditioner()
+
+    def invalidatePreconditioner(self):
+        """
+        Discard any recycled preconditioner, forcing the next solve to
+        build a new one.
+        """
+        self._preconditionerCache = None
+        self._preconditionerKey = None
+        self._preconditionerUses = 0
+        self._preconditionerIterations = None
+
+    def _getPreconditioner(self, key, build):
+        """
+        Return the recycled preconditioner if the reuse policy allows it
+        and `key`, typically the shape of the matrix, matches the one it
+        was built for. Otherwise, cache and return the result of `build()`.
+        A `build()` that returns `None` is called again for the next solve.
+        """
+        maxIterations = self._preconditionerMaxIterations
+        if (self._preconditionerCache is None
+            or key != self._preconditionerKey
+            or self._preconditionerUses >= self._preconditionerRebuildEvery
+            or (maxIterations is not None
+                and self._preconditionerIterations is not None
+                and self._preconditionerIterations > maxIterations)):
+            self._preconditionerCache = None
+            self._preconditionerCache = build()
+            self._preconditionerKey = key
+            self._preconditionerUses = 0
+            self._preconditionerIterations = None
+
+        self._preconditionerUses += 1
+
+        return self._preconditionerCache
+
+    def _recordIterations(self, iterations):
+        self._preconditionerIterations = iterations
+        self.numberOfIterations = iterations
+
     def _storeMatrix(self, var, matrix, RHSvector):
         self.var = var
         self.matrix = matrix
@@ -184,3 +333,51 @@ class Solver(object):
 
     def _canSolveAsymmetric(self):
         return True
+
+def _importError(package):
+    """
+    Import `fipy.solvers` in a fresh interpreter, with `package` chosen by
+    `FIPY_SOLVERS`, and return the error it fails with, unless the
+    failure is just that `package` is not installed.
+
+    Every solver package should import cleanly, whether or not it can be
+    used here
+
+        >>> for package in ["pysparse", "trilinos", "no-pysparse", "scipy", "pyamg"]:
+        ...     print package, _importError(package)
+        pysparse None
+        trilinos None
+        no-pysparse None
+        scipy None
+        pyamg None
+
+    """
+    import os
+    import sys
+    import subprocess
+    import fipy
+
+    env = dict(os.environ)
+    env["FIPY_SOLVERS"] = package
+    path = os.path.dirname(os.path.dirname(os.path.abspath(fipy.__file__)))
+    env["PYTHONPATH"] = os.pathsep.join([path] + [p for p in [env.get("PYTHONPATH")] if p])
+
+    process = subprocess.Popen([sys.executable, "-c", "import fipy.solvers"],
+                               env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = process.communicate()
+    if process.returncode == 0:
+        return None
+
+    lines = err.strip().splitlines()
+    error = lines and lines[-1]
+    if error and error.startswith("ImportError"):
+        return None
+    else:
+        return error
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -49,11 +49,13 @@
 __docformat__ = 'restructuredtext'
 
 import os
+import zlib
 
 from PyTrilinos import Epetra
 from PyTrilinos import Amesos
 
 from fipy.solvers.trilinos.trilinosSolver import TrilinosSolver
+from fipy.tools import numerix
 
 __all__ = ["LinearLUSolver"]
 
@@ -62,6 +64,9 @@ class LinearLUSolver(TrilinosSolver):
     """
     The `LinearLUSolver` is an interface to the Amesos KLU solver in Trilinos.
 
+    The factorization is kept and reused for as long as the matrix does not
+    change. Call `invalidateFactorization()` to discard it.
+
     """
 
     def __init__(self, tolerance=1e-10, iterations=10, precon=None, maxIterations=10):
@@ -84,11 +89,48 @@ class LinearLUSolver(TrilinosSolver):
         self.Factory = Amesos.Factory()
 
 
+    def _fingerprint(self, L):
+        """Digest of the structure and values of the `Epetra.CrsMatrix` `L`,
+        used to decide whether a cached factorization can be reused. The
+        digest of each processor's rows is shared with all of them, so that
+        they agree on whether to factorize again. The compressed rows of
+        `L` are hashed as whole arrays.
+        """
+        if not L.StorageOptimized():
+            L.OptimizeStorage()
+        offsets, columns, values = L.ExtractCrsDataPointers()
+        globalColumns = numerix.asarray(L.ColMap().MyGlobalElements())
+
+        crc = zlib.crc32(numerix.ascontiguousarray(offsets, 'i'))
+        crc = zlib.crc32(numerix.ascontiguousarray(globalColumns[columns]), crc)
+        crc = zlib.crc32(numerix.ascontiguousarray(values, 'd'), crc)
+
+        comm = L.Comm()
+        crcs = numerix.zeros((comm.NumProc(),), 'd')
+        crcs[comm.MyPID()] = crc
+
+        return (L.NumGlobalRows(), L.NumGlobalNonzeros()) + tuple(comm.SumAll(crcs))
+
+    def _factorize(self, L):
+        xError = Epetra.Vector(L.RowMap())
+        errorVector = Epetra.Vector(L.RangeMap())
+
+        Problem = Epetra.LinearProblem(L, xError, errorVector)
+        Solver = self.Factory.Create("Klu", Problem)
+
+        return (Solver, Problem, L, xError, errorVector)
+
     def _solve_(self, L, x, b):
 
+        fingerprint = self._fingerprint(L)
+
+        # Solver is kept together with the Problem, matrix and vectors it
+        # refers to, so that KLU only factorizes L again when it changes
+        Solver, Problem, factorizedL, xError, errorVector = self._getFactorization(fingerprint,
+                                                                                   lambda: self._factorize(L))
+
         for iteration in range(self.iterations):
              # errorVector = L*x - b
-             errorVector = Epetra.Vector(L.RangeMap())
              L.Multiply(False, x, errorVector)
              # If A is an Epetra.Vector with map M
              # and B is an Epetra.Vector with map M
@@ -104,10 +146,6 @@ class LinearLUSolver(TrilinosSolver):
              if (tol / tol0) <= self.tolerance:
                  break
 
-             xError = Epetra.Vector(L.RowMap())
-
-             Problem = Epetra.LinearProblem(L, xError, errorVector)
-             Solver = self.Factory.Create("Klu", Problem)
              Solver.Solve()
 
              x[:] = x - xError
@@ -63,7 +63,7 @@ class ICPreconditioner(Preconditioner):
 
     def _applyToSolver(self, solver, matrix):
         Factory = IFPACK.Factory()
-        Prec = Factory.Create("IC", matrix)
-        Prec.Initialize()
-        Prec.Compute()
-        solver.SetPrecOperator(Prec)
+        self.Prec = Factory.Create("IC", matrix)
+        self.Prec.Initialize()
+        self.Prec.Compute()
+        solver.SetPrecOperator(self.Prec)
@@ -79,6 +79,22 @@ class TrilinosAztecOOSolver(TrilinosSolver):
                                 iterations=iterations, precon=None)
         self.preconditioner = precon
 
+    def _buildPreconditioner(self, Solver, L):
+        """
+        Apply the preconditioner to `Solver` and return the operator it
+        built, along with the matrix it references, so that both can be
+        recycled. Preconditioners that are only Aztec options return
+        `None` and are applied afresh for every solve.
+        """
+        self.preconditioner._applyToSolver(solver=Solver, matrix=L)
+
+        if hasattr(self.preconditioner, 'Prec'):
+            Prec = self.preconditioner.Prec
+            del self.preconditioner.Prec
+            return (Prec, L)
+        else:
+            return None
+
     def _solve_(self, L, x, b):
 
         Solver = AztecOO.AztecOO(L, x, b)
@@ -89,15 +105,17 @@ class TrilinosAztecOOSolver(TrilinosSolver):
         Solver.SetAztecOption(AztecOO.AZ_output, AztecOO.AZ_none)
 
         if self.preconditioner is not None:
-            self.preconditioner._applyToSolver(solver=Solver, matrix=L)
+            recycled = self._getPreconditioner((L.NumGlobalRows(), L.NumGlobalNonzeros()),
+                                               lambda: self._buildPreconditioner(Solver, L))
+            if recycled is not None:
+                Prec, matrix = recycled
+                Solver.SetPrecOperator(Prec)
         else:
             Solver.SetAztecOption(AztecOO.AZ_precond, AztecOO.AZ_none)
 
         output = Solver.Iterate(self.iterations, self.tolerance)
 
-        if self.preconditioner is not None:
-            if hasattr(self.preconditioner, 'Prec'):
-                del self.preconditioner.Prec
+        self._recordIterations(Solver.NumIters())
 
         if 'FIPY_VERBOSE_SOLVER' in os.environ:
             status = Solver.GetAztecStatus()
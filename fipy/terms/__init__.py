@@ -30,6 +30,10 @@ class TransientTermError(Exception):
     def __init__(self, s='The equation requires a TransientTerm with explicit convection.'):
         Exception.__init__(self, s)
 
+class ExplicitUpdateError(Exception):
+    def __init__(self, s='The equation can only be updated explicitly if its matrix is diagonal and nonsingular.'):
+        Exception.__init__(self, s)
+
 from fipy.terms.transientTerm import *
 from fipy.terms.diffusionTerm import *
 from fipy.terms.explicitDiffusionTerm import *
@@ -54,6 +58,7 @@ __all__ = ["ExplicitVariableError",
            "SolutionVariableNumberError",
            "SolutionVariableRequiredError",
            "IncorrectSolutionVariable",
+           "ExplicitUpdateError",
            "ConvectionTerm",
            "FirstOrderAdvectionTerm",
            "AdvectionTerm"]
@@ -105,24 +105,45 @@ class _CoupledBinaryTerm(_AbstractBinaryTerm):
 
         Only called at top-level by `_prepareLinearSystem()`
 
+        If `SparseMatrix` has a coupled class, each (equation, variable)
+        block is built at the size of a single variable and added in place
+        into the coupled matrix. Otherwise, every block is built at the
+        size of the coupled matrix by an `OffsetSparseMatrix`.
+
         """
 
-        from fipy.matrices.offsetSparseMatrix import OffsetSparseMatrix
-        SparseMatrix =  OffsetSparseMatrix(SparseMatrix=SparseMatrix,
-                                           numberOfVariables=len(self._vars),
-                                           numberOfEquations=len(self._uncoupledTerms))
-        matrix = SparseMatrix(mesh=var.mesh)
+        numberOfVariables = len(self._vars)
+        numberOfEquations = len(self._uncoupledTerms)
+
+        CoupledSparseMatrix = SparseMatrix.getCoupledClass()
+        offset = CoupledSparseMatrix is None
+        if offset:
+            SparseMatrix = CoupledSparseMatrix = OffsetSparseMatrix(SparseMatrix=SparseMatrix,
+                                                                    numberOfVariables=numberOfVariables,
+                                                                    numberOfEquations=numberOfEquations)
+
+        def coupledMatrix():
+            return CoupledSparseMatrix(mesh=var.mesh,
+                                       numberOfVariables=numberOfVariables,
+                                       numberOfEquations=numberOfEquations)
+
+        matrix = coupledMatrix()
         RHSvectors = []
 
         for equationIndex, uncoupledTerm in enumerate(self._uncoupledTerms):
 
-            SparseMatrix.equationIndex = equationIndex
+            if offset:
+                SparseMatrix.equationIndex = equationIndex
             termRHSvector = 0
-            termMatrix = SparseMatrix(mesh=var.mesh)
+            if uncoupledTerm._cacheMatrix:
+                termMatrix = coupledMatrix()
+            else:
+                termMatrix = matrix
 
             for varIndex, tmpVar in enumerate(var.vars):
 
-                SparseMatrix.varIndex = varIndex
+                if offset:
+                    SparseMatrix.varIndex = varIndex
 
                 tmpVar, tmpMatrix, tmpRHSvector = uncoupledTerm._buildAndAddMatrices(tmpVar,
                                                                                      SparseMatrix,
@@ -132,12 +153,16 @@ class _CoupledBinaryTerm(_AbstractBinaryTerm):
                                                                                      diffusionGeomCoeff=uncoupledTerm._getDiffusionGeomCoeff(tmpVar),
                                                                                      buildExplicitIfOther=buildExplicitIfOther)
 
-                termMatrix += tmpMatrix
+                if offset:
+                    termMatrix += tmpMatrix
+                else:
+                    termMatrix._addBlock(tmpMatrix, equationIndex, varIndex)
                 termRHSvector += tmpRHSvector
 
             uncoupledTerm._buildCache(termMatrix, termRHSvector)
             RHSvectors += [CellVariable(value=termRHSvector, mesh=var.mesh)]
-            matrix += termMatrix
+            if termMatrix is not matrix:
+                matrix += termMatrix
 
         return (var, matrix, _CoupledCellVariable(RHSvectors))
 
@@ -50,6 +50,8 @@ __docformat__ = 'restructuredtext'
 import os
 
 from fipy.tools import numerix
+from fipy.matrices.matrixFreeMatrix import _MatrixFreeMatrix, _matrixFreeMatrixClass, _NotMatrixFreeError
+from fipy.matrices.diagonalMatrix import _DiagonalMatrix
 from fipy.terms import AbstractBaseClassError
 from fipy.terms import SolutionVariableRequiredError
 
@@ -100,6 +102,10 @@ class Term(object):
         raise NotImplementedError
 
     def _buildCache(self, matrix, RHSvector):
+        if isinstance(matrix, _MatrixFreeMatrix):
+            ## a residual was evaluated without building the matrix
+            return
+
         if self._cacheMatrix:
             self._matrix = matrix
             self._matrix.cache = True
@@ -133,14 +139,12 @@ class Term(object):
         else:
             return var.shape[0]
 
-    def _getMatrixClass(self, solver, var):
+    def _getMatrixClass(self, SparseMatrix, var):
         if self._vectorSize(var) > 1:
             from fipy.matrices.offsetSparseMatrix import OffsetSparseMatrix
-            SparseMatrix =  OffsetSparseMatrix(SparseMatrix=solver._matrixClass,
+            SparseMatrix =  OffsetSparseMatrix(SparseMatrix=SparseMatrix,
                                                numberOfVariables=self._vectorSize(var),
                                                numberOfEquations=self._vectorSize(var))
-        else:
-            SparseMatrix = solver._matrixClass
 
         return SparseMatrix
 
@@ -162,7 +166,7 @@ class Term(object):
                 Term._viewer = MatplotlibSparseMatrixViewer()
 
         var, matrix, RHSvector = self._buildAndAddMatrices(var,
-                                                           self._getMatrixClass(solver, var),
+                                                           self._getMatrixClass(solver._matrixClass, var),
                                                            boundaryConditions=boundaryConditions,
                                                            dt=dt,
                                                            transientGeomCoeff=self._getTransientGeomCoeff(var),
@@ -278,12 +282,142 @@ class Term(object):
         >>> len(DiffusionTerm().justResidualVector(v)) == m.numberOfCells
         True
 
+        Unless the matrix is cached, under-relaxed, or needed by
+        `residualFn`, the residual is evaluated without building the
+        matrix, as each `Term` accumulates its product with the variable
+        directly
+
+        >>> v.setValue(m.x**2)
+        >>> v.constrain(1., m.facesLeft)
+        >>> eq = TransientTerm() == DiffusionTerm(coeff=1 + v) + v**2
+        >>> residual = eq.justResidualVector(v, dt=1.)
+        >>> eq.cacheMatrix()
+        >>> print numerix.allclose(residual, eq.justResidualVector(v, dt=1.))
+        True
+
         """
+        if underRelaxation is None and residualFn is None:
+            residual = self._matrixFreeResidualVector(var, boundaryConditions, dt)
+            if residual is not None:
+                return residual
+
         solver = self._prepareLinearSystem(var, solver, boundaryConditions, dt)
         solver._applyUnderRelaxation(underRelaxation)
 
         return solver._calcResidualVector(residualFn=residualFn)
 
+    def _matrixFreeResidualVector(self, var, boundaryConditions, dt):
+        """
+        Return the residual vector, built with a `_MatrixFreeMatrix`, or
+        `None` if some `Term` needs its matrix.
+        """
+        if self._cacheMatrix or 'FIPY_DISPLAY_MATRIX' in os.environ:
+            return None
+
+        var = self._verifyVar(var)
+        self._checkVar(var)
+
+        if var.mesh.communicator.Nproc > 1:
+            return None
+
+        if type(boundaryConditions) not in (type(()), type([])):
+            boundaryConditions = (boundaryConditions,)
+
+        try:
+            var, matrix, RHSvector = self._buildUnassembled(var,
+                                                            _matrixFreeMatrixClass(numerix.array(var).flatten()),
+                                                            boundaryConditions,
+                                                            dt)
+        except _NotMatrixFreeError:
+            return None
+
+        return matrix.product - RHSvector
+
+    def _buildUnassembled(self, var, SparseMatrix, boundaryConditions, dt):
+        """
+        Build the linear system with a stand-in `SparseMatrix` class that
+        does not assemble the matrix.
+        """
+        for bc in boundaryConditions:
+            bc._resetBoundaryConditionApplied()
+
+        var, matrix, RHSvector = self._buildAndAddMatrices(var,
+                                                           self._getMatrixClass(SparseMatrix, var),
+                                                           boundaryConditions=boundaryConditions,
+                                                           dt=dt,
+                                                           transientGeomCoeff=self._getTransientGeomCoeff(var),
+                                                           diffusionGeomCoeff=self._getDiffusionGeomCoeff(var),
+                                                           buildExplicitIfOther=self._buildExplcitIfOther)
+
+        if self._cacheRHSvector:
+            self._RHSvector = RHSvector
+
+        return var, matrix, RHSvector
+
+    def explicitIncrement(self, var=None, boundaryConditions=(), dt=None):
+        r"""
+        Return the change in `var` that solves an explicit equation, i.e.,
+        one whose only implicit terms in the solution variable are
+        `TransientTerm` and `ImplicitSourceTerm` objects. The matrix of
+        such an equation is diagonal, so the new value is found from the
+        vectorized flux computations of the explicit terms, without
+        assembling a sparse matrix or calling a solver.
+
+        :Parameters:
+
+           - `var`: The variable to be solved for. Provides the old value and the current value that the increment is added to.
+           - `boundaryConditions`: A tuple of boundaryConditions.
+           - `dt`: The time step size.
+
+        Each step of an explicit scheme is then
+
+        >>> from fipy import *
+        >>> m = Grid1D(nx=20)
+        >>> v = CellVariable(mesh=m, value=1. * (m.x < 10), hasOld=True)
+        >>> v.constrain(1., m.facesLeft)
+        >>> eq = TransientTerm() == (ExplicitDiffusionTerm(coeff=0.1)
+        ...                          - VanLeerConvectionTerm(coeff=(1.,))
+        ...                          + 0.1 * v)
+        >>> same = []
+        >>> for step in range(5):
+        ...     v.updateOld()
+        ...     explicit = v.value + eq.explicitIncrement(v, dt=0.2)
+        ...     eq.solve(v, dt=0.2)
+        ...     same.append(numerix.allclose(explicit, v.value))
+        >>> print same
+        [True, True, True, True, True]
+
+        A `Term` that couples the cells implicitly requires a solve
+
+        >>> (TransientTerm() == DiffusionTerm()).explicitIncrement(v, dt=1.)
+        Traceback (most recent call last):
+            ...
+        ExplicitUpdateError: The equation can only be updated explicitly if its matrix is diagonal and nonsingular.
+
+        `explicitIncrement` is only available in serial.
+
+        """
+        from fipy.terms import ExplicitUpdateError
+
+        var = self._verifyVar(var)
+        self._checkVar(var)
+
+        if var.mesh.communicator.Nproc > 1:
+            raise NotImplementedError, "explicitIncrement() is only available in serial"
+
+        if type(boundaryConditions) not in (type(()), type([])):
+            boundaryConditions = (boundaryConditions,)
+
+        try:
+            var, matrix, RHSvector = self._buildUnassembled(var, _DiagonalMatrix, boundaryConditions, dt)
+        except _NotMatrixFreeError:
+            raise ExplicitUpdateError
+
+        if not matrix.isDiagonal or not matrix.diagonal.all():
+            raise ExplicitUpdateError
+
+        return RHSvector / matrix.diagonal - numerix.array(var).flatten()
+
     def residualVectorAndNorm(self, var=None, solver=None, boundaryConditions=(), dt=None, underRelaxation=None, residualFn=None):
         r"""
         Builds the `Term`'s linear system once. This method
@@ -221,10 +221,9 @@ def _TestClass(base):
                     return
 
             if self.inline:
-                try:
-                    import weave
-                except ImportError, a:
-                    print >>sys.stderr, "!!! weave library is not installed"
+                from fipy.tools import inline
+                if not inline.doInline:
+                    print >>sys.stderr, "!!! neither numba nor weave is installed"
                     return
 
             if self.pythoncompiled is not None:
@@ -49,26 +49,42 @@ __docformat__ = 'restructuredtext'
 
 import cPickle
 import os
+import struct
 import sys
 import gzip
+import zlib
 
 from fipy.tools import parallelComm
 
 __all__ = ["write", "read"]
 
+_MAGIC = "FiPy dump 2\n"
+
+# arrays smaller than this are left in the pickle
+_minimumArrayBytes = 2**12
+
+# arrays are compressed in chunks of this many bytes
+_chunkBytes = 2**22
+
 # TODO: add test to show that round trip pickle of mesh doesn't work properly
 # FIXME: pickle fails to work properly on numpy 1.1 (run gapFillMesh.py)
-def write(data, filename = None, extension = '', communicator=parallelComm):
+def write(data, filename = None, extension = '', communicator=parallelComm, compress=True):
     """
     Pickle an object and write it to a file. Wrapper for
     `cPickle.dump()`.
 
+    The object is pickled with the binary protocol, except for large
+    NumPy arrays, whose raw buffers are streamed to the file after the
+    pickle, either compressed in chunks or, if `compress` is `False`,
+    uncompressed so that `read()` can map them from the file.
+
     :Parameters:
       - `data`: The object to be pickled.
       - `filename`: The name of the file to place the pickled object. If `filename` is `None`
         then a temporary file will be used and the file object and file name will be returned as a tuple
       - `extension`: Used if filename is not given.
       - `communicator`: Object with `procID` and `Nproc` attributes.
+      - `compress`: Whether to compress the file.
 
     Test to check pickling and unpickling.
 
@@ -79,37 +95,267 @@ def write(data, filename = None, extension = '', communicator=parallelComm):
         >>> print old.numberOfCells == new.numberOfCells
         True
 
+    Large arrays round trip through their raw buffers
+
+        >>> from fipy import CellVariable, numerix
+        >>> mesh = Grid1D(nx=10000)
+        >>> var = CellVariable(mesh=mesh, value=mesh.cellCenters[0]**2, hasOld=True)
+        >>> for compress in (True, False):
+        ...     f, tempfile = write({'var': var, 'faces': mesh.faceCenters.value,
+        ...                          'ids': numerix.arange(5000)},
+        ...                         compress=compress)
+        ...     new = read(tempfile, f)
+        ...     print numerix.allclose(new['var'], var), new['var'].mesh.numberOfCells
+        ...     print numerix.allclose(new['faces'], mesh.faceCenters), new['ids'].dtype == numerix.arange(1).dtype
+        True 10000
+        True True
+        True 10000
+        True True
+
+    Uncompressed arrays in a named file are mapped, copy-on-write
+
+        >>> import shutil, tempfile
+        >>> directory = tempfile.mkdtemp()
+        >>> filename = os.path.join(directory, 'var.dump')
+        >>> write(var, filename, compress=False)
+        >>> new = read(filename)
+        >>> new.setValue(1., where=mesh.cellCenters[0] < 1.)
+        >>> print new[:3]
+        [ 1.    2.25  6.25]
+        >>> print read(filename)[:3]
+        [ 0.25  2.25  6.25]
+
+    A file can be written over while arrays read from it are still
+    mapped, as the new file replaces it rather than truncating it
+
+        >>> write({'faces': mesh.faceCenters.value}, filename, compress=False)
+        >>> data = read(filename)
+        >>> write(data, filename, compress=False)
+        >>> print numerix.allclose(read(filename)['faces'], data['faces'])
+        True
+        >>> print numerix.allclose(data['faces'], mesh.faceCenters)
+        True
+        >>> print os.listdir(directory)
+        ['var.dump']
+        >>> del new, data
+        >>> shutil.rmtree(directory)
+
     """
+    import tempfile
+
     if communicator.procID == 0:
         if filename is None:
-            import tempfile
             (f, _filename) =  tempfile.mkstemp(extension)
+            fileStream = open(_filename, mode='wb')
         else:
-            (f, _filename) = (None, filename)
-        fileStream = gzip.GzipFile(filename = _filename, mode = 'w', fileobj = None)
+            # arrays read from `filename` may still be mapped from it, so it
+            # must not be truncated; a new file is written alongside and
+            # then replaces it
+            directory, name = os.path.split(os.path.abspath(filename))
+            (fd, _filename) = tempfile.mkstemp(prefix=name + '.', dir=directory)
+            fileStream = os.fdopen(fd, 'wb')
+            f = None
     else:
-        fileStream = open(os.devnull, mode='w')
+        fileStream = open(os.devnull, mode='wb')
         (f, _filename) = (None, os.devnull)
 
-    cPickle.dump(data, fileStream, 0)
+    try:
+        # every rank pickles, as variables gather their global values
+        _writeBinary(data, fileStream, compress=compress)
+    except:
+        fileStream.close()
+        if filename is not None and _filename != os.devnull:
+            os.remove(_filename)
+        raise
     fileStream.close()
 
     if filename is None:
         return (f, _filename)
+    elif _filename != os.devnull:
+        _replace(_filename, filename)
+
+def _replace(source, destination):
+    """Move the file `source` over `destination`, giving it the permissions
+    of a newly created file.
+    """
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(source, 0666 & ~umask)
+
+    try:
+        os.rename(source, destination)
+    except OSError:
+        # Windows does not rename over an existing file
+        os.remove(destination)
+        os.rename(source, destination)
+
+def _writeBinary(data, fileStream, compress=True):
+    import numpy
+
+    arrays = []
+    def persistent_id(obj):
+        if (type(obj) is numpy.ndarray
+            and obj.dtype.kind not in 'OV'
+            and obj.nbytes >= _minimumArrayBytes):
+            arrays.append(obj)
+            return str(len(arrays) - 1)
+        else:
+            return None
+
+    import StringIO
+    pickleStream = StringIO.StringIO()
+    pickler = cPickle.Pickler(pickleStream, 2)
+    pickler.persistent_id = persistent_id
+    pickler.dump(data)
+
+    pickled = pickleStream.getvalue()
+    if compress:
+        pickled = zlib.compress(pickled)
+
+    fileStream.write(_MAGIC)
+    fileStream.write(struct.pack('<?Q', compress, len(pickled)))
+    fileStream.write(pickled)
+
+    for arr in arrays:
+        flat = numpy.ascontiguousarray(arr).reshape(-1)
+        header = cPickle.dumps((flat.dtype.str, arr.shape), 2)
+        fileStream.write(struct.pack('<Q', len(header)))
+        fileStream.write(header)
+
+        itemsPerChunk = max(1, _chunkBytes // flat.itemsize)
+        for start in range(0, len(flat), itemsPerChunk):
+            chunk = flat[start:start + itemsPerChunk].tostring()
+            if compress:
+                chunk = zlib.compress(chunk, 1)
+                fileStream.write(struct.pack('<Q', len(chunk)))
+            fileStream.write(chunk)
+
+def _readBinary(fileStream, unpickler, filename=None):
+    """Unpickle an object written by `_writeBinary()` from `fileStream`,
+    which is positioned after the magic string.
+
+    If `filename` is given, uncompressed arrays are mapped from the file,
+    copied only as they are modified, so that each process of a parallel
+    run reads little more than its own partition of the data.
+    """
+    import numpy
+
+    compress, length = struct.unpack('<?Q', fileStream.read(struct.calcsize('<?Q')))
+    pickled = fileStream.read(length)
+    if compress:
+        pickled = zlib.decompress(pickled)
+
+    def readLength():
+        return struct.unpack('<Q', fileStream.read(struct.calcsize('<Q')))[0]
+
+    loaded = []
+    def persistent_load(pid):
+        # arrays are unpickled in the order they were pickled
+        assert int(pid) == len(loaded)
+
+        dtype, shape = cPickle.loads(fileStream.read(readLength()))
+        dtype = numpy.dtype(dtype)
+        size = int(numpy.prod(shape))
+
+        if not compress and filename is not None:
+            offset = fileStream.tell()
+            arr = numpy.memmap(filename, dtype=dtype, mode='c', offset=offset, shape=shape).view(numpy.ndarray)
+            fileStream.seek(offset + size * dtype.itemsize)
+        else:
+            flat = numpy.empty((size,), dtype=dtype)
+            itemsPerChunk = max(1, _chunkBytes // dtype.itemsize)
+            for start in range(0, size, itemsPerChunk):
+                stop = min(start + itemsPerChunk, size)
+                if compress:
+                    chunk = zlib.decompress(fileStream.read(readLength()))
+                else:
+                    chunk = fileStream.read((stop - start) * dtype.itemsize)
+                flat[start:stop] = numpy.frombuffer(chunk, dtype=dtype)
+            arr = flat.reshape(shape)
+
+        loaded.append(arr)
+        return arr
+
+    unpickler = unpickler(_stringStream(pickled))
+    unpickler.persistent_load = persistent_load
+    return unpickler.load()
+
+def _stringStream(data):
+    if sys.version_info < (3,0):
+        import cStringIO
+        return cStringIO.StringIO(data)
+    else:
+        import io
+        return io.BytesIO(data)
 
 def read(filename, fileobject=None, communicator=parallelComm, mesh_unmangle=False):
     """
     Read a pickled object from a file. Returns the unpickled object.
     Wrapper for `cPickle.load()`.
 
+    Files written by `write()` are read by every process directly. Older,
+    gzipped pickles are read by the first process and broadcast to the
+    others.
+
     :Parameters:
       - `filename`: The name of the file to unpickle the object from.
       - `fileobject`: Used to remove temporary files
       - `communicator`: Object with `procID` and `Nproc` attributes.
       - `mesh_unmangle`: Correct improper pickling of non-uniform meshes (ticket:243)
 
+    Files written with protocol 0 into gzip by earlier versions of
+    :term:`FiPy` can still be read
+
+        >>> import tempfile
+        >>> f, tempfile = tempfile.mkstemp('.gz')
+        >>> fileStream = gzip.GzipFile(filename=tempfile, mode='w')
+        >>> cPickle.dump({'a': range(3)}, fileStream, 0)
+        >>> fileStream.close()
+        >>> print read(tempfile, f)
+        {'a': [0, 1, 2]}
+
     """
+    def unpickler(f):
+        unpickler = cPickle.Unpickler(f)
+        if mesh_unmangle:
+            unpickler.find_global = _unmangledClass
+        return unpickler
+
     if communicator.procID == 0:
+        fileStream = open(filename, mode='rb')
+        binary = (fileStream.read(len(_MAGIC)) == _MAGIC)
+    else:
+        binary = None
+
+    if communicator.Nproc > 1:
+        binary = communicator.bcast(binary, root=0)
+
+    if binary:
+        if fileobject is None:
+            if communicator.procID != 0:
+                fileStream = open(filename, mode='rb')
+                fileStream.seek(len(_MAGIC))
+            data = _readBinary(fileStream, unpickler, filename=filename)
+            fileStream.close()
+        else:
+            # temporary files are private to the first process
+            if communicator.procID == 0:
+                contents = fileStream.read()
+                fileStream.close()
+                os.close(fileobject)
+                os.remove(filename)
+            else:
+                contents = None
+
+            if communicator.Nproc > 1:
+                contents = communicator.bcast(contents, root=0)
+
+            data = _readBinary(_stringStream(contents), unpickler)
+
+        return data
+
+    if communicator.procID == 0:
+        fileStream.close()
         fileStream = gzip.GzipFile(filename = filename, mode = 'r', fileobj = None)
         data = fileStream.read()
         fileStream.close()
@@ -122,44 +368,32 @@ def read(filename, fileobject=None, communicator=parallelComm, mesh_unmangle=Fal
     if communicator.Nproc > 1:
         data = communicator.bcast(data, root=0)
 
-    if sys.version_info < (3,0):
-        import StringIO
-        f = StringIO.StringIO(data)
-    else:
-        import io
-        f = io.BytesIO(data)
-
-    unpickler = cPickle.Unpickler(f)
-
-    if mesh_unmangle:
-        def find_class(module, name):
-            __import__(module)
-            mod = sys.modules[module]
-            klass = getattr(mod, name)
+    return unpickler(_stringStream(data)).load()
 
-            from fipy import meshes
-            import types
+def _unmangledClass(module, name):
+    __import__(module)
+    mod = sys.modules[module]
+    klass = getattr(mod, name)
 
-            if isinstance(klass, types.ClassType) and issubclass(klass, meshes.mesh.Mesh):
-                class UnmangledMesh(klass):
-                    def __setstate__(self, dict):
-                        if ('cellFaceIDs' in dict
-                            and 'faceVertexIDs' in dict):
+    from fipy import meshes
+    import types
 
-                            dict = dict.copy()
-                            for key in ('cellFaceIDs', 'faceVertexIDs'):
-                                arr = dict[key]
-                                arr.data[:] = arr.transpose().flatten().reshape(arr.shape)
+    if isinstance(klass, types.ClassType) and issubclass(klass, meshes.mesh.Mesh):
+        class UnmangledMesh(klass):
+            def __setstate__(self, dict):
+                if ('cellFaceIDs' in dict
+                    and 'faceVertexIDs' in dict):
 
-                        klass.__setstate__(self, dict)
+                    dict = dict.copy()
+                    for key in ('cellFaceIDs', 'faceVertexIDs'):
+                        arr = dict[key]
+                        arr.data[:] = arr.transpose().flatten().reshape(arr.shape)
 
-                return UnmangledMesh
-            else:
-                return klass
-
-        unpickler.find_global = find_class
+                klass.__setstate__(self, dict)
 
-    return unpickler.load()
+        return UnmangledMesh
+    else:
+        return klass
 
 def _test():
     import fipy.tests.doctestPlus
@@ -1,13 +1,60 @@
-__all__ = ["doInline"]
+"""Compiled kernels for the `--inline` code paths
+
+Kernels are written in a small subset of C and run by one of several
+backends, chosen with the :envvar:`FIPY_INLINE` environment variable:
+
+  - ``numba``: translate the kernel to Python and compile it with Numba
+  - ``weave``: compile the kernel as C with :mod:`weave`
+  - ``python``: translate the kernel to Python and interpret it
+    (very slow; useful for debugging kernels)
+  - ``numexpr``: run no kernels, but evaluate the expression trees of
+    :class:`~fipy.variables.operatorVariable._OperatorVariable` in a
+    single pass with :mod:`numexpr`
+
+Any other value, or the `--inline` flag, picks the first of ``numba``,
+``weave`` and ``numexpr`` that can be imported. If none can, FiPy uses its
+NumPy code paths.
+
+`doInline` is `True` when kernels are compiled. `doFuse` is `True` when
+expression trees are evaluated in one pass, by a kernel or by
+:mod:`numexpr`, rather than one NumPy operation at a time.
+"""
+__docformat__ = 'restructuredtext'
+
+__all__ = ["doInline", "doFuse"]
 
 import inspect
 import os
+import re
 import sys
 
-if '--inline' in [s.lower() for s in sys.argv[1:]]:
-    doInline = True
+def _selectBackend(requested):
+    if requested in ('numba', 'weave', 'python', 'numexpr'):
+        candidates = (requested,)
+    else:
+        candidates = ('numba', 'weave', 'numexpr')
+
+    for candidate in candidates:
+        if candidate == 'python':
+            return candidate
+        try:
+            __import__(candidate)
+            return candidate
+        except ImportError:
+            pass
+
+    import warnings
+    warnings.warn("inline compilation requires one of %s; falling back to NumPy" % ", ".join(candidates),
+                  stacklevel=3)
+    return None
+
+if '--inline' in [s.lower() for s in sys.argv[1:]] or 'FIPY_INLINE' in os.environ:
+    _backend = _selectBackend(os.environ.get('FIPY_INLINE', '').lower())
 else:
-    doInline = 'FIPY_INLINE' in os.environ
+    _backend = None
+
+doInline = _backend in ('numba', 'weave', 'python')
+doFuse = _backend is not None
 
 _inlineFrameComment = 'FIPY_INLINE_COMMENT' in os.environ
 
@@ -65,6 +112,10 @@ def _operatorVariableComment(canInline=True, level=3):
         return ""
 
 def _runInline(code_in, converters=None, verbose=0, comment=None, **args):
+    if _backend != 'weave':
+        _runTranslatedInline(code_in, iterateElements=False, **args)
+        return
+
     argsKeys = args.keys()
     dimList = ['i', 'j', 'k']
 
@@ -111,6 +162,10 @@ def _runInline(code_in, converters=None, verbose=0, comment=None, **args):
                  extra_compile_args =['-O3'])
 
 def _runIterateElementInline(code_in, converters=None, verbose=0, comment=None, **args):
+    if _backend != 'weave':
+        _runTranslatedInline(code_in, iterateElements=True, **args)
+        return
+
     loops = """
 int i;
 for(i=0; i < ni; i++) {
@@ -181,3 +236,523 @@ static int arrayIndex(PyArrayObject* array, int i, int vec[])
     return index / array->descr->elsize;
 }
                  """)
+
+_kernels = {}
+
+def _runTranslatedInline(code_in, iterateElements, **args):
+    """Translate a C kernel to Python and run it with the selected backend.
+
+    Arrays are indexed as in the C kernels: flattened by `_runInline` and
+    through the `ITEM()` macro by `_runIterateElementInline`.
+    """
+    import numpy
+
+    for key, value in args.items():
+        if isinstance(value, numpy.ndarray):
+            value = numpy.asarray(value)
+            if value.dtype.char == '?':
+                value = value.astype('B')
+            if value.shape == ():
+                value = value[()]
+            elif not iterateElements and value.ndim > 1:
+                value = value.reshape(-1)
+            args[key] = value
+
+    names = sorted(args.keys())
+    ndims = dict((name, numpy.ndim(args[name])) for name in names)
+
+    if iterateElements:
+        loops = len(args['shape']) - 1
+    else:
+        loops = len([n for n in ('ni', 'nj', 'nk') if n in args])
+
+    key = (code_in, iterateElements, loops, tuple(sorted(ndims.items())))
+    kernel = _kernels.get(key)
+    if kernel is None:
+        source = _translate(code_in, names=names, ndims=ndims,
+                            iterateElements=iterateElements, loops=loops)
+        namespace = _kernelNamespace()
+        exec(compile(source, "<fipy kernel>", "exec"), namespace)
+        kernel = namespace["_kernel"]
+        kernel.argnames = inspect.getargspec(kernel).args
+        if _backend == 'numba':
+            import numba
+            namespace['pow'] = numba.njit(_power)
+            argnames = kernel.argnames
+            kernel = numba.njit(kernel)
+            kernel.argnames = argnames
+        _kernels[key] = kernel
+
+    for name in kernel.argnames:
+        if name not in args:
+            args[name] = args[name[:-len('_flat')]].reshape(-1)
+
+    kernel(*[args[name] for name in kernel.argnames])
+
+def _kernelNamespace():
+    """The C math library, preferring NumPy's ufuncs, which both follow C
+    semantics more closely and are more widely supported by Numba."""
+    import math
+    import numpy
+    namespace = {}
+    for name in dir(math):
+        if not name.startswith('_'):
+            namespace[name] = getattr(numpy, name, getattr(math, name))
+            if not isinstance(namespace[name], numpy.ufunc):
+                namespace[name] = getattr(math, name)
+    namespace.update(pow=_power, absolute=abs,
+                     arcsin=math.asin, arccos=math.acos, arctan=math.atan,
+                     arctan2=math.atan2, arcsinh=math.asinh,
+                     arccosh=math.acosh, arctanh=math.atanh)
+    return namespace
+
+def _power(x, y):
+    # `Variable.__pow__` is mostly used for squares and cubes
+    if y == 2:
+        return x * x
+    elif y == 3:
+        return x * x * x
+    else:
+        return x ** y
+
+def _translate(code, names, ndims, iterateElements=False, loops=1):
+    """Translate a C kernel into the source of a Python function `_kernel`
+    taking the arguments `names`.
+
+    Only the small subset of C used by FiPy's kernels is understood:
+    declarations, assignments, `if`/`else`, `for` and `while` statements,
+    `#define` macros and the `ITEM()` macro of `_runIterateElementInline`.
+
+        >>> print _translate('''
+        ...     int ID1 = id1[i];
+        ...     double cell1 = var[ID1];
+        ...     // a comment
+        ...     if (cell1 < 0 || !flag) {
+        ...         val[i] = 0;
+        ...     } else if (cell1 > 1.)
+        ...         val[i] = 1.;
+        ...     else {
+        ...         val[i] = cell1;
+        ...     }
+        ... ''', names=['flag', 'id1', 'ni', 'val', 'var'],
+        ...    ndims=dict(flag=0, id1=1, ni=0, val=1, var=1))
+        def _kernel(flag, id1, ni, val, var):
+            for i in range(ni):
+                ID1 = id1[i]
+                cell1 = var[ID1]
+                if cell1 < 0 or not flag:
+                    val[i] = 0
+                else:
+                    if cell1 > 1.:
+                        val[i] = 1.
+                    else:
+                        val[i] = cell1
+        <BLANKLINE>
+
+        >>> print _translate('''
+        ...     # define pi 3.141592653589793
+        ...     # define mod(x) (fmod(x + 3. * pi, 2. * pi) - pi)
+        ...     double t, u;
+        ...     int k;
+        ...     t = u = 0.;
+        ...     for (k = 0; k < M; k++) {
+        ...         t += ITEM(orientations, i, &k) * ITEM(faceValues, ITEM(ids, i, &k), vec);
+        ...     }
+        ...     ITEM(val, i, vec) = mod(t) / ITEM(volumes, i, NULL) / spacing[vec[0]];
+        ... ''', names=['M', 'faceValues', 'ids', 'ni', 'orientations',
+        ...             'shape', 'spacing', 'val', 'volumes'],
+        ...    ndims=dict(M=0, faceValues=2, ids=2, ni=0, orientations=2,
+        ...               shape=1, spacing=1, val=2, volumes=1),
+        ...    iterateElements=True)
+        def _kernel(M, faceValues, ids, ni, orientations, shape, spacing, val, volumes):
+            for i in range(ni):
+                for vec_0 in range(shape[0]):
+                    t = 0.
+                    u = 0.
+                    k = 0
+                    t = u = 0.
+                    for k in range(0, M):
+                        t += orientations[k, i] * faceValues[vec_0, ids[k, i]]
+                    val[vec_0, i] = ((fmod((t) + 3. * 3.141592653589793, 2. * 3.141592653589793) - 3.141592653589793)) / volumes[i] / spacing[vec_0]
+        <BLANKLINE>
+
+    """
+    code = re.sub(r'/\*.*?\*/', '', code, flags=re.S)
+    code = re.sub(r'//[^\n]*', '', code)
+    code = _expandMacros(code)
+
+    # outside of `ITEM()`, C indexes the raw data
+    flattened = [name for name in names
+                 if ndims[name] > 1 and re.search(r'\b%s\s*\[' % name, code)]
+    for name in flattened:
+        code = re.sub(r'\b%s\s*\[' % name, '%s_flat[' % name, code)
+
+    def item(arr, index, vec):
+        nd = ndims[arr]
+        if vec == 'NULL':
+            leading = ['0'] * (nd - 1)
+        elif vec.startswith('&'):
+            leading = ([vec[1:].strip()] + ['0'] * nd)[:nd - 1]
+        else:
+            leading = ['%s_%d' % (vec, dim) for dim in range(nd - 1)]
+        return '%s[%s]' % (arr, ', '.join(leading + [index]))
+
+    code = _expandCalls(code, 'ITEM', item)
+    code = re.sub(r'\bvec\[(\d+)\]', r'vec_\1', code)
+
+    lines = ['def _kernel(%s):' % ', '.join(list(names) + ['%s_flat' % name for name in flattened])]
+    if iterateElements:
+        lines.append('    for i in range(ni):')
+        for dim in range(loops):
+            lines.append('    ' * (dim + 2) + 'for vec_%d in range(shape[%d]):' % (dim, dim))
+        indent = loops + 2
+    else:
+        for dim, index in enumerate('ijk'[:loops]):
+            lines.append('    ' * (dim + 1) + 'for %s in range(n%s):' % (index, index))
+        indent = loops + 1
+
+    lines += _translateStatements(code, indent) or ['    ' * indent + 'pass']
+
+    return '\n'.join(lines) + '\n'
+
+_declaration = re.compile(r'(?:const\s+)?(?:unsigned\s+|signed\s+)?'
+                          r'(long\s+long|long\s+int|long|int|short|char|double|float)\s+(?=[A-Za-z_])(.*)$', re.S)
+
+def _matching(code, start):
+    """Index of the bracket closing the one at `start`."""
+    depth = 0
+    for index in range(start, len(code)):
+        if code[index] in '([{':
+            depth += 1
+        elif code[index] in ')]}':
+            depth -= 1
+            if depth == 0:
+                return index
+    raise SyntaxError("unbalanced %s in kernel: %s" % (code[start], code[start:]))
+
+def _findTopLevel(code, start, char):
+    index = start
+    while index < len(code) and code[index] != char:
+        if code[index] in '([{':
+            index = _matching(code, index)
+        index += 1
+    return index
+
+def _splitTopLevel(code, char):
+    pieces = []
+    start = 0
+    while start <= len(code):
+        end = _findTopLevel(code, start, char)
+        pieces.append(code[start:end])
+        start = end + 1
+    return pieces
+
+def _expandCalls(code, name, expand):
+    """Replace each call `name(args)` in `code` with `expand(*args)`."""
+    pattern = re.compile(r'\b%s\s*\(' % name)
+    match = pattern.search(code)
+    while match is not None:
+        end = _matching(code, match.end() - 1)
+        args = [_expandCalls(arg, name, expand).strip()
+                for arg in _splitTopLevel(code[match.end():end], ',')]
+        replacement = expand(*args)
+        code = code[:match.start()] + replacement + code[end + 1:]
+        match = pattern.search(code, match.start() + len(replacement))
+    return code
+
+def _expandMacros(code):
+    macros = []
+    lines = []
+    for line in code.splitlines():
+        match = re.match(r'\s*#\s*define\s+(\w+)(?:\(([^)]*)\))?\s*(.*)$', line)
+        if match is not None:
+            macros.append(match.groups())
+        elif not re.match(r'\s*#', line):
+            lines.append(line)
+    code = '\n'.join(lines)
+
+    # later macros may use earlier ones
+    for name, params, body in reversed(macros):
+        if params is None:
+            code = re.sub(r'\b%s\b' % name, body.strip(), code)
+        else:
+            params = [param.strip() for param in params.split(',')]
+            def expand(*args):
+                expanded = body
+                for param, arg in zip(params, args):
+                    expanded = re.sub(r'\b%s\b' % param, '(%s)' % arg, expanded)
+                return '(%s)' % expanded.strip()
+            code = _expandCalls(code, name, expand)
+
+    return code
+
+def _translateExpression(code):
+    code = ' '.join(code.split())
+    if '?' in code:
+        raise NotImplementedError("conditional expressions are not supported in kernels: %s" % code)
+    code = re.sub(r'\((?:int|long|double|float)\)', '', code)
+    code = code.replace('&&', ' and ').replace('||', ' or ')
+    code = re.sub(r'!(?!=)', ' not ', code)
+    return ' '.join(code.split())
+
+def _translateSimpleStatement(statement, indent):
+    prefix = '    ' * indent
+    statement = ' '.join(statement.split())
+
+    match = _declaration.match(statement)
+    if match is not None:
+        ctype, declarators = match.groups()
+        zero = '0.' if ctype in ('double', 'float') else '0'
+        lines = []
+        for declarator in _splitTopLevel(declarators, ','):
+            declarator = declarator.strip()
+            if '[' in declarator.split('=')[0]:
+                raise NotImplementedError("array declarations are not supported in kernels: %s" % statement)
+            elif '=' in declarator:
+                lines.append(prefix + _translateExpression(declarator))
+            else:
+                lines.append(prefix + '%s = %s' % (declarator, zero))
+        return lines
+
+    match = re.match(r'^(?:(\w+)\s*(\+\+|--)|(\+\+|--)\s*(\w+))$', statement)
+    if match is not None:
+        name = match.group(1) or match.group(4)
+        op = (match.group(2) or match.group(3))[0]
+        return [prefix + '%s %s= 1' % (name, op)]
+
+    return [prefix + _translateExpression(statement)]
+
+def _skipSpace(code, pos):
+    while pos < len(code) and code[pos].isspace():
+        pos += 1
+    return pos
+
+def _translateStatements(code, indent):
+    lines = []
+    pos = _skipSpace(code, 0)
+    while pos < len(code):
+        statementLines, pos = _translateStatement(code, pos, indent)
+        lines += statementLines
+        pos = _skipSpace(code, pos)
+    return lines
+
+def _translateStatement(code, pos, indent):
+    """Translate the statement starting at `pos`, returning the lines of
+    Python and the position following the statement."""
+    prefix = '    ' * indent
+
+    if code[pos] == ';':
+        return [], pos + 1
+    elif code[pos] == '{':
+        end = _matching(code, pos)
+        return _translateStatements(code[pos + 1:end], indent), end + 1
+
+    keyword = re.compile(r'(for|if|while)\b').match(code, pos)
+    if keyword is None:
+        end = _findTopLevel(code, pos, ';')
+        return _translateSimpleStatement(code[pos:end], indent), end + 1
+
+    keyword, pos = keyword.group(1), _skipSpace(code, keyword.end())
+    header = None
+    if code[pos] == '(':
+        end = _matching(code, pos)
+        after = _skipSpace(code, end + 1)
+        if keyword == 'for' or code[after] == '{' or re.match(r'\w', code[after]):
+            header, pos = code[pos + 1:end], end + 1
+    if header is None:
+        # C requires the parentheses, but weave kernels have been known to
+        # omit them when the condition is a macro
+        end = _findTopLevel(code, pos, '{')
+        header, pos = code[pos:end], end
+
+    body, pos = _translateStatement(code, _skipSpace(code, pos), indent + 1)
+    body = body or [prefix + '    pass']
+
+    if keyword == 'for':
+        init, condition, step = [' '.join(part.split()) for part in _splitTopLevel(header, ';')]
+        init = _declaration.match(init).group(2) if _declaration.match(init) else init
+        start = re.match(r'^(\w+)\s*=\s*(.+)$', init)
+        stop = re.match(r'^(\w+)\s*<\s*(.+)$', condition)
+        if (start is not None and stop is not None
+            and start.group(1) == stop.group(1)
+            and step in ('%s++' % start.group(1), '++%s' % start.group(1))):
+            lines = [prefix + 'for %s in range(%s, %s):' % (start.group(1), start.group(2), stop.group(2))] + body
+        else:
+            lines = (_translateSimpleStatement(init, indent)
+                     + [prefix + 'while %s:' % _translateExpression(condition)]
+                     + body
+                     + _translateSimpleStatement(step, indent + 1))
+    elif keyword == 'while':
+        lines = [prefix + 'while %s:' % _translateExpression(header)] + body
+    else:
+        lines = [prefix + 'if %s:' % _translateExpression(header)] + body
+        following = _skipSpace(code, pos)
+        if re.compile(r'else\b').match(code, following):
+            orelse, pos = _translateStatement(code, _skipSpace(code, following + len('else')), indent + 1)
+            lines += [prefix + 'else:'] + (orelse or [prefix + '    pass'])
+
+    return lines, pos
+
+def _compareTranslatedKernels():
+    """Run every kernel of FiPy translated by the ``python`` backend, and
+    the NumPy code it replaces, on the same small problems, each in a
+    fresh interpreter because the code paths are chosen on import.
+
+    Returns the callers of the kernels that were run and the names of the
+    results that differ between the two.
+
+        >>> callers, mismatches = _compareTranslatedKernels()
+        >>> for caller in callers:
+        ...     print caller
+        abstractUpwindConvectionTerm.py:_calcValue
+        addOverFacesVariable.py:_calcValueInline
+        arithmeticCellToFaceVariable.py:_calcValue_
+        cellTerm.py:_buildMatrixInline_
+        faceGradVariable.py:_calcValueInline
+        faceTerm.py:_explicitBuildMatrixInline_
+        gaussCellGradVariable.py:_calcValueInline
+        grid2DBuilder.py:createCells
+        harmonicCellToFaceVariable.py:_calcValue_
+        levelSetDiffusionVariable.py:_calcValue_
+        modCellGradVariable.py:_calcValueInline
+        modCellToFaceVariable.py:_calcValue_
+        modFaceGradVariable.py:_calcValue
+        numerix.py:sqrtDot
+        powerLawConvectionTerm.py:_calcValue
+        uniformGrid2D.py:_adjacentCellIDs
+        uniformGrid2D.py:_areaProjections
+        uniformGrid2D.py:faceCellIDs
+        variable.py:_execInline
+        vector.py:putAdd
+        >>> print mismatches
+        []
+
+    """
+    script = """
+import os
+import sys
+import cPickle
+from fipy import *
+from fipy.tools import inline
+from fipy.meshes.uniformGrid2D import UniformGrid2D
+from fipy.variables.addOverFacesVariable import _AddOverFacesVariable
+from fipy.variables.levelSetDiffusionVariable import _LevelSetDiffusionVariable
+
+callers = set()
+if inline._backend == 'python':
+    run = inline._runTranslatedInline
+    def record(*args, **kwargs):
+        code = sys._getframe(2).f_code
+        callers.add('%s:%s' % (os.path.basename(code.co_filename), code.co_name))
+        return run(*args, **kwargs)
+    inline._runTranslatedInline = record
+
+results = {}
+for mesh in (Grid2D(nx=3, ny=4, dx=0.5, dy=0.25), UniformGrid2D(nx=3, ny=4, dx=0.5, dy=0.25)):
+    for attr in ('_adjacentCellIDs', '_areaProjections', 'faceCellIDs', 'cellFaceIDs'):
+        results[mesh.__class__.__name__ + '.' + attr] = numerix.MA.filled(getattr(mesh, attr), -1)
+
+mesh = Grid2D(nx=4, ny=3)
+x, y = mesh.cellCenters
+phi = CellVariable(mesh=mesh, value=numerix.sin(x) * y, hasOld=True)
+phi.constrain(1., mesh.facesLeft)
+theta = ModularVariable(mesh=mesh, value=3 * x - 2 * y)
+
+results['operator'] = phi**2 + 3 * phi * x
+results['grad'] = phi.grad
+results['faceGrad'] = phi.faceGrad
+results['arithmeticFaceValue'] = phi.arithmeticFaceValue
+results['harmonicFaceValue'] = (phi + 2).harmonicFaceValue
+results['modular grad'] = theta.grad
+results['modular faceGrad'] = theta.faceGrad
+results['modular arithmeticFaceValue'] = theta.arithmeticFaceValue
+results['sqrtDot'] = numerix.sqrtDot(phi.grad.value, phi.grad.value)
+results['levelSet'] = _LevelSetDiffusionVariable(phi - 0.5, 2.)
+results['addOverFaces'] = _AddOverFacesVariable(phi.faceGrad.dot(mesh._orientedAreaProjections))
+
+eq = (TransientTerm() == DiffusionTerm(coeff=phi.arithmeticFaceValue + 1)
+      - PowerLawConvectionTerm(coeff=(1., 0.5))
+      - UpwindConvectionTerm(coeff=(-0.5, 1.))
+      - ExplicitUpwindConvectionTerm(coeff=(0.5, 0.5))
+      + ImplicitSourceTerm(coeff=0.1) + 0.2)
+for step in range(2):
+    phi.updateOld()
+    eq.solve(var=phi, dt=0.1,
+             boundaryConditions=(FixedValue(faces=mesh.facesRight, value=0.),
+                                 FixedFlux(faces=mesh.facesTop, value=1.)))
+results['solution'] = phi
+
+results = dict((name, numerix.array(value)) for name, value in results.items())
+cPickle.dump((results, sorted(callers)), sys.stdout, 2)
+"""
+    import cPickle
+    import subprocess
+    import numpy
+    import fipy
+
+    path = os.path.dirname(os.path.dirname(os.path.abspath(fipy.__file__)))
+
+    def run(backend):
+        env = dict(os.environ)
+        env.pop('FIPY_INLINE', None)
+        if backend is not None:
+            env['FIPY_INLINE'] = backend
+        env['PYTHONPATH'] = os.pathsep.join([path] + [p for p in [env.get('PYTHONPATH')] if p])
+        process = subprocess.Popen([sys.executable, "-c", script],
+                                   env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        out, err = process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError(err)
+        return cPickle.loads(out)
+
+    translated, callers = run('python')
+    plain, unused = run(None)
+
+    mismatches = [name for name in sorted(plain)
+                  if not numpy.allclose(translated[name], plain[name])]
+
+    return callers, mismatches
+
+_numexprFunctions = {
+    'asin': 'arcsin', 'acos': 'arccos', 'atan': 'arctan', 'atan2': 'arctan2',
+    'asinh': 'arcsinh', 'acosh': 'arccosh', 'atanh': 'arctanh',
+    'absolute': 'abs', 'fabs': 'abs'
+}
+
+def _numexprExpression(expression):
+    """Convert an expression generated by `Variable._getCstring()` to one
+    that :mod:`numexpr` evaluates over whole arrays.
+
+    The element indices are dropped, leaving :mod:`numexpr` to broadcast
+    the arguments.
+
+        >>> print _numexprExpression('((var00[i + j * ni] * asin(var01[i])) + not (var1[0]))')
+        ((var00 * arcsin(var01)) + ~ (var1))
+        >>> print _numexprExpression('(pow((var01 - var00[i]), var1))')
+        ((((var01 - var00))**(var1)))
+
+    """
+    expression = re.sub(r'\b(var\w*)\[[^\]]*\]', r'\1', expression)
+    expression = _expandCalls(expression, 'pow', lambda x, y: '((%s)**(%s))' % (x, y))
+    expression = re.sub(r'\bnot\b', '~', expression)
+    return re.sub(r'\b(%s)\s*\(' % '|'.join(_numexprFunctions),
+                  lambda match: _numexprFunctions[match.group(1)] + '(', expression)
+
+def _evaluateFused(expression, args):
+    import numexpr
+    expression = _numexprExpression(expression)
+
+    # literal constants let numexpr turn small integer powers into products
+    constants = dict((name, value) for name, value in args.items() if type(value) in (type(1), type(1.)))
+    if constants:
+        expression = re.sub(r'\b(%s)\b' % '|'.join(constants),
+                            lambda match: repr(constants[match.group(1)]), expression)
+
+    return numexpr.evaluate(expression, local_dict=args, global_dict={})
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -103,6 +103,21 @@ elif arch == '64bit':
 else:
     raise Exception('Cannot set integer dtype because architecture is unknown.')
 
+# The connectivity of meshes, and the row and column indices of the
+# matrices assembled on them, are stored as INDEX_DTYPE. Meshes with fewer
+# than 2**31 vertices, faces and cells can halve the memory this takes on
+# 64-bit platforms by setting FIPY_INDEX_DTYPE=int32.
+
+import os
+_indexDtype = os.environ.get('FIPY_INDEX_DTYPE', '').lower()
+if _indexDtype in ('int32', 'int64'):
+    INDEX_DTYPE = NUMERIX.dtype(_indexDtype).type
+elif _indexDtype == '':
+    INDEX_DTYPE = INT_DTYPE
+else:
+    raise ValueError('FIPY_INDEX_DTYPE must be "int32" or "int64", not "%s"' % _indexDtype)
+del _indexDtype
+
 from numpy.core import umath
 from numpy import newaxis as NewAxis
 from numpy import *
@@ -447,13 +462,13 @@ if inline.doInline:
 
         Usually used with v1==v2 to return magnitude of v1.
         """
-        unit1 = unit2 = 1
-
         def dimensionlessUnmasked(a):
-            unit = 1
+            unit = None
             mask = False
             if _isPhysical(a):
-                unit = a.inBaseUnits().getUnit()
+                unit = a.inBaseUnits().unit
+                if unit.isDimensionless():
+                    unit = None
                 a = a.numericValue
             if MA.isMaskedArray(a):
                 mask = a.mask
@@ -481,9 +496,9 @@ if inline.doInline:
         if NUMERIX.any(mask1) or NUMERIX.any(mask2):
             result1 = MA.array(result1, mask=NUMERIX.logical_or(mask1, mask2))
 
-        if unit1 != 1 or unit2 != 1:
+        if unit1 is not None or unit2 is not None:
             from fipy.tools.dimensions.physicalField import PhysicalField
-            result1 = PhysicalField(value=result, unit=(unit1 * unit2)**0.5)
+            result1 = PhysicalField(value=result1, unit=((unit1 or 1) * (unit2 or 1))**0.5)
 
         return result1
 else:
@@ -496,7 +511,26 @@ else:
         ## We can't use Numeric.dot on an array of vectors
         return sqrt(dot(a1, a2))
 
-def nearest(data, points, max_mem=1e8):
+def _nearestTree(data):
+    """build a spatial index of the (D, N) `data` for `nearest`
+
+    Returns `None` if SciPy is not available or if `data` has units.
+    """
+    if _isPhysical(data):
+        return None
+
+    try:
+        from scipy.spatial import cKDTree
+    except ImportError:
+        return None
+
+    data = asarray(data)
+    if data.shape[-1] == 0:
+        return None
+
+    return cKDTree(data.reshape((data.shape[0], -1)).swapaxes(0, 1))
+
+def nearest(data, points, max_mem=1e8, tree=None):
     """find the indices of `data` that are closest to `points`
 
     >>> from fipy import *
@@ -508,6 +542,20 @@ def nearest(data, points, max_mem=1e8):
     [4 5 7 8]
     >>> print nearest(m0.cellCenters.globalValue, m1.cellCenters.globalValue, max_mem=10000)
     [4 5 7 8]
+
+    A spatial index of `data`, built by `_nearestTree()`, answers each
+    query in logarithmic time and can be reused for many sets of `points`.
+    Points equidistant from several values of `data` resolve to the lowest
+    index, whether or not the index is used
+
+    >>> m2 = Grid2D(nx=2, ny=2)
+    >>> data = m2.cellCenters.globalValue
+    >>> points = m2.vertexCoords
+    >>> tree = _nearestTree(data)
+    >>> print nearest(data, points, tree=tree)
+    [0 0 1 0 0 1 2 2 3]
+    >>> print nearest(data, points, max_mem=100)
+    [0 0 1 0 0 1 2 2 3]
     """
     data = asanyarray(data)
     points = asanyarray(points)
@@ -519,6 +567,13 @@ def nearest(data, points, max_mem=1e8):
     if N == 0:
         return arange(0)
 
+    if points.ndim == 2 and not _isPhysical(points):
+        if tree is None:
+            tree = _nearestTree(data)
+
+        if tree is not None:
+            return _nearestFromTree(tree, data, points)
+
     # given (D, N) data and (D, M) points,
     # break points into (D, C) chunks of points
     # calculatate the full factorial (D, N, C) distances between them
@@ -564,6 +619,31 @@ def nearest(data, points, max_mem=1e8):
 
     return nearestIndices
 
+def _nearestFromTree(tree, data, points):
+    """query `tree`, built from `data`, for the indices closest to `points`
+    """
+    data = asarray(data)
+    points = asarray(points)
+    N = data.shape[-1]
+    M = points.shape[-1]
+
+    if M == 0:
+        return zeros((0,), dtype=INT_DTYPE)
+
+    # a few candidates per point, so that ties can be broken the same way
+    # as by the exhaustive search: in favor of the lowest index
+    k = min(N, 2**data.shape[0])
+    candidates = tree.query(points.swapaxes(0, 1), k=k)[1]
+    candidates = candidates.reshape((M, k))
+
+    # (D, M, k) -> (M, k)
+    tmp = data[..., candidates] - points[..., newaxis]
+    tmp = dot(tmp, tmp, axis=0)
+
+    closest = tmp == tmp.min(axis=-1)[..., newaxis]
+
+    return where(closest, candidates, N).min(axis=-1).astype(INT_DTYPE)
+
 def allequal(first, second):
     """
     Returns `true` if every element of `first` is equal to the corresponding
@@ -56,6 +56,7 @@ def _suite():
             'numerix',
             'dump',
             'vector',
+            'inline',
         ), base = __name__)
 
     return theSuite
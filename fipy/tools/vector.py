@@ -52,33 +52,67 @@ from fipy.tools import inline, numerix
 
 __all__ = ["putAdd", "prune"]
 
-# Factored out for fipy.variables.surfactantConvectionVariable._ConvectionCoeff
-# for some reason
 def _putAdd(vector, ids, additionVector, mask=False):
-    """This is a temporary replacement for Numeric.put as it was not doing
-    what we thought it was doing.
+    """Add the elements of `additionVector` to the elements of `vector`
+    with flat indices `ids`, accumulating repeated indices.
+
+    `additionVector` has either the shape of `ids`, or leading element
+    dimensions of its own, in which case each leading element is added to
+    the corresponding element of `vector`. Entries where `mask` is `True`
+    are skipped.
+
+        >>> vector = numerix.zeros(4, 'd')
+        >>> _putAdd(vector, numerix.array([0, 2, 2, 3]), [1., 2., 3., 4.])
+        >>> print vector
+        [ 1.  0.  5.  4.]
+
+        >>> vector = numerix.zeros((2, 3), 'd')
+        >>> ids = numerix.array([[0, 1], [1, 2]])
+        >>> _putAdd(vector, ids, [[[1., 2.], [3., 4.]], [[5., 6.], [7., 8.]]],
+        ...         mask=[[False, True], [False, False]])
+        >>> print vector
+        [[ 1.  3.  4.]
+         [ 5.  7.  8.]]
+
+        >>> vector = numerix.zeros(3, 'l')
+        >>> _putAdd(vector, numerix.array([1, 1]), 2)
+        >>> print vector
+        [0 4 0]
+        >>> _putAdd(vector, numerix.array([0, 2]), [1.5, 2.5])
+        >>> print vector
+        [1 4 2]
+
     """
+    ids = numerix.asarray(ids)
     additionVector = numerix.array(additionVector)
 
+    if additionVector.ndim < ids.ndim:
+        additionVector = additionVector + numerix.zeros(ids.shape, dtype=additionVector.dtype)
+
+    leading = additionVector.shape[:additionVector.ndim - ids.ndim]
+    numberOfLeading = int(numerix.prod(leading))
+    values = additionVector.reshape((numberOfLeading, -1))
+
     if numerix.sometrue(mask):
-        if len(vector.shape) < len(additionVector.shape):
-            for j in range(vector.shape[0]):
-                for id, value, masked in zip(ids.flat, additionVector[j].flat, mask.flat):
-                    if not masked:
-                        vector[j].flat[id] += value
-        else:
-            for id, value, masked in zip(ids.flat, additionVector.flat, mask.flat):
-                if not masked:
-                    vector.flat[id] += value
+        keep = ~(numerix.array(mask, dtype=bool) | numerix.zeros(ids.shape, dtype=bool)).ravel()
+        ids = ids.ravel()[keep]
+        values = values[..., keep]
+    else:
+        ids = ids.ravel()
 
+    length = vector.size // numberOfLeading
+    flatIDs = (ids + length * numerix.arange(numberOfLeading)[..., numerix.newaxis]).ravel()
+
+    if vector.dtype.kind == 'f' and values.dtype.kind in 'biuf':
+        increments = numerix.bincount(flatIDs, weights=values.ravel(),
+                                      minlength=vector.size)
     else:
-        if len(vector.shape) < len(additionVector.shape):
-            for j in range(vector.shape[0]):
-                for id, value in zip(ids.flat, additionVector[j].flat):
-                    vector[j].flat[id] += value
-        else:
-            for id, value in zip(ids.flat, additionVector.flat):
-                vector.flat[id] += value
+        increments = numerix.zeros((vector.size,), dtype=vector.dtype)
+        # cast like the in-place addition of the elements one at a time
+        numerix.add.at(increments, flatIDs,
+                       values.ravel().astype(vector.dtype, casting='unsafe'))
+
+    vector += increments.reshape(vector.shape)
 
 if inline.doInline:
     ## FIXME: inline version doesn't account for all of the conditions that Python
@@ -46,7 +46,6 @@
 
 __docformat__ = 'restructuredtext'
 
-from fipy.tools.numerix import random
 from fipy.variables.noiseVariable import NoiseVariable
 
 __all__ = ["BetaNoiseVariable"]
@@ -135,8 +134,10 @@ class BetaNoiseVariable(NoiseVariable):
         self.beta = self._requires(beta)
 
     def random(self):
-        return random.beta(a = self.alpha, b = self.beta,
-                           size = [self.mesh.globalNumberOfCells])
+        # independent gamma variates, drawn from disjoint streams
+        x = self._standardGamma(shape=self.alpha.value, stream=0)
+        y = self._standardGamma(shape=self.beta.value, stream=2**20)
+        return x / (x + y)
 
 def _test():
     import fipy.tests.doctestPlus
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "cellProbeVariable.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #    mail: NIST
+ #     www: http://ctcms.nist.gov
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # of Standards and Technology, an agency of the Federal Government.
+ # Pursuant to title 17 section 105 of the United States Code,
+ # United States Code this software is not subject to copyright
+ # protection, and this software is considered to be in the public domain.
+ # FiPy is an experimental system.
+ # NIST assumes no responsibility whatsoever for its use by whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # To the extent that NIST may hold copyright in countries other than the
+ # United States, you are hereby granted the non-exclusive irrevocable and
+ # unconditional right to print, publish, prepare derivative works and
+ # distribute this software, in any medium, or authorize others to do so on
+ # your behalf, on a royalty-free basis throughout the world.
+ #
+ # You may improve, modify, and create derivative works of the software or
+ # any portion of the software, and you may copy and distribute such
+ # modifications or works.  Modified works should carry a notice stating
+ # that you changed the software and should note the date and nature of any
+ # such change.  Please explicitly acknowledge the National Institute of
+ # Standards and Technology as the original source.
+ #
+ # This software can be redistributed and/or modified freely provided that
+ # any derivative works bear some notice that they are derived from it, and
+ # any modified versions bear some notice that they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+__docformat__ = 'restructuredtext'
+
+__all__ = []
+
+from fipy.tools import numerix
+
+from fipy.variables.variable import Variable
+
+class _CellProbeVariable(Variable):
+    r"""
+    Takes a `CellVariable` and interpolates it to a fixed set of points.
+
+    The nearest cell of each point and, for `order=1`, the displacement
+    of the point from the center of that cell are found once, when the
+    probe is created. The value is only recalculated when the
+    `CellVariable` changes, as
+
+    .. math::
+
+       \phi(\vec{x}) \approx \phi_P + (\vec{x} - \vec{x}_P) \cdot (\nabla\phi)_P
+
+    using only the cells owned by each processor; the partial results are
+    then summed over the processors.
+
+        >>> from fipy.meshes import Grid2D
+        >>> from fipy.variables.cellVariable import CellVariable
+        >>> m = Grid2D(nx=3, ny=2)
+        >>> v = CellVariable(mesh=m, value=m.cellCenters[0])
+        >>> probe = _CellProbeVariable(var=v, points=((0., 1.1, 1.2), (0., 1., 1.)), order=1)
+        >>> print probe
+        [ 0.25  1.1   1.2 ]
+        >>> v.value = 2 * m.cellCenters[0]
+        >>> print probe
+        [ 0.5  2.2  2.4]
+        >>> print _CellProbeVariable(var=v, points=((0., 1.1, 1.2), (0., 1., 1.)))
+        [ 1.  3.  3.]
+        >>> _CellProbeVariable(var=v, points=((0.,), (0.,)), order=2)
+        Traceback (most recent call last):
+            ...
+        ValueError: order should be either 0 or 1
+
+    """
+    def __init__(self, var, points, order=0, nearestCellIDs=None):
+        if order not in (0, 1):
+            raise ValueError, 'order should be either 0 or 1'
+
+        Variable.__init__(self, unit=var.unit)
+        self.var = self._requires(var)
+        self.order = order
+
+        mesh = var.mesh
+
+        if nearestCellIDs is None:
+            nearestCellIDs = mesh._getNearestCellID(points)
+        nearestCellIDs = numerix.asarray(nearestCellIDs)
+
+        if mesh.communicator.Nproc > 1:
+            globalToLocal = -numerix.ones((mesh.globalNumberOfCells,), dtype=int)
+            globalToLocal[mesh._globalNonOverlappingCellIDs] = mesh._localNonOverlappingCellIDs
+            localCellIDs = globalToLocal[nearestCellIDs]
+            self.owned = localCellIDs >= 0
+            self.localCellIDs = localCellIDs[..., self.owned]
+        else:
+            self.owned = None
+            self.localCellIDs = nearestCellIDs
+
+        if order == 1:
+            self.grad = self._requires(var.grad)
+            if self.owned is not None:
+                points = numerix.asanyarray(points)[..., self.owned]
+            self.displacements = (points
+                                  - mesh.cellCenters.value[..., self.localCellIDs])
+
+    def _calcValue(self):
+        value = self.var.value[..., self.localCellIDs]
+
+        if self.order == 1:
+            value = value + numerix.dot(self.displacements,
+                                        self.grad.value[..., self.localCellIDs])
+
+        if self.owned is not None:
+            partial = numerix.zeros(value.shape[:-1] + self.owned.shape,
+                                    dtype=numerix.obj2sctype(value))
+            partial[..., self.owned] = value
+            value = self.var.mesh.communicator.sum(partial[numerix.newaxis], axis=0)
+
+        return value
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -211,25 +211,43 @@ class CellVariable(_MeshVariable):
 
         """
         if points is not None:
+            return self.probe(points=points, order=order,
+                              nearestCellIDs=nearestCellIDs).value
+        else:
+            return _MeshVariable.__call__(self)
 
-            if nearestCellIDs is None:
-                nearestCellIDs = self.mesh._getNearestCellID(points)
+    def probe(self, points, order=0, nearestCellIDs=None):
+        r"""
+        Return a `Variable` that interpolates the `CellVariable` to a fixed
+        set of points, as by :meth:`__call__`.
 
-            if order == 0:
-                return self.globalValue[..., nearestCellIDs]
+        The nearest cells and interpolation weights are found only once,
+        so this is much cheaper than calling the `CellVariable` when the
+        same points are sampled repeatedly, e.g., at every time step. The
+        interpolated values are only recalculated when the `CellVariable`
+        changes.
 
-            elif order == 1:
-                ##cellID = self.mesh._getNearestCellID(points)
-##                return self[...,self.mesh._getNearestCellID(points)] + numerix.dot(points - self.mesh.cellCenters[...,cellID], self.grad[...,cellID])
-                return (self.globalValue[..., nearestCellIDs]
-                        + numerix.dot(points - self.mesh.cellCenters.globalValue[...,nearestCellIDs],
-                                      self.grad.globalValue[...,nearestCellIDs]))
+        :Parameters:
 
-            else:
-                raise ValueError, 'order should be either 0 or 1'
+           - `points`: A set of points in the format (X, Y, Z)
+           - `order`: The order of interpolation, 0 or 1, default is 0
+           - `nearestCellIDs` : Optional argument if user can calculate own
+             nearest cell IDs array, shape should be same as points
 
-        else:
-            return _MeshVariable.__call__(self)
+        >>> from fipy import *
+        >>> m = Grid2D(nx=3, ny=2)
+        >>> v = CellVariable(mesh=m, value=m.cellCenters[0])
+        >>> probe = v.probe(((0., 1.1, 1.2), (0., 1., 1.)), order=1)
+        >>> print probe
+        [ 0.25  1.1   1.2 ]
+        >>> v.setValue(3., where=m.cellCenters[0] < 1.)
+        >>> print probe
+        [ 3.375  1.6    1.575]
+
+        """
+        from fipy.variables.cellProbeVariable import _CellProbeVariable
+        return _CellProbeVariable(var=self, points=points, order=order,
+                                  nearestCellIDs=nearestCellIDs)
 
     @property
     def cellVolumeAverage(self):
@@ -44,7 +44,7 @@
 
 __docformat__ = 'restructuredtext'
 
-from fipy.tools.numerix import random
+from fipy.tools import numerix
 from fipy.variables.noiseVariable import NoiseVariable
 
 __all__ = ["ExponentialNoiseVariable"]
@@ -124,8 +124,7 @@ class ExponentialNoiseVariable(NoiseVariable):
         self.mean = self._requires(mean)
 
     def random(self):
-        return random.exponential(scale = self.mean,
-                                  size = [self.mesh.globalNumberOfCells])
+        return -self.mean.value * numerix.log(self._uniform(stream=0))
 
 def _test():
     import fipy.tests.doctestPlus
@@ -44,7 +44,6 @@
 
 __docformat__ = 'restructuredtext'
 
-from fipy.tools.numerix import random
 from fipy.variables.noiseVariable import NoiseVariable
 
 __all__ = ["GammaNoiseVariable"]
@@ -132,8 +131,7 @@ class GammaNoiseVariable(NoiseVariable):
         self.rate = self._requires(rate)
 
     def random(self):
-        return random.gamma(shape=self.shapeParam, scale=self.rate,
-                            size=[self.mesh.globalNumberOfCells])
+        return self._standardGamma(shape=self.shapeParam.value, stream=0) * self.rate.value
 
 def _test():
     import fipy.tests.doctestPlus
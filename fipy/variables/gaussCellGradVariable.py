@@ -114,8 +114,9 @@ class _GaussCellGradVariable(CellVariable):
         return self._makeValue(value = val)
 
     def _calcValueNoInline(self, N, M, ids, orientations, volumes):
-        contributions = numerix.take(self.faceGradientContributions, ids, axis=-1)
-        grad = numerix.array(numerix.sum(orientations * contributions, -2))
+        connectivity = self.mesh.topology._cellFaceConnectivity
+        contributions = numerix.asarray(self.faceGradientContributions)[..., connectivity.indices]
+        grad = connectivity.sum(contributions, weights=connectivity.orientations)
         return grad / volumes
 
     def _calcValue(self):
@@ -46,7 +46,8 @@
 
 __docformat__ = 'restructuredtext'
 
-from fipy.tools.numerix import random, sqrt
+from fipy.tools import numerix
+from fipy.tools.numerix import sqrt
 from fipy.variables.noiseVariable import NoiseVariable
 
 __all__ = ["GaussianNoiseVariable"]
@@ -159,18 +160,8 @@ class GaussianNoiseVariable(NoiseVariable):
         self.variance = variance
         NoiseVariable.__init__(self, mesh = mesh, name = name, hasOld = hasOld)
 
-    def parallelRandom(self):
-
-        if hasattr(self.variance, 'globalValue'):
-            variance = self.variance.globalValue
-        else:
-            variance = self.variance
-
-        if self.mesh.communicator.procID == 0:
-            return random.normal(self.mean, sqrt(variance),
-                                 size = [self.mesh.globalNumberOfCells])
-        else:
-            return None
+    def random(self):
+        return self.mean + sqrt(numerix.array(self.variance)) * self._normal(stream=0)
 
 def _test():
     import fipy.tests.doctestPlus
@@ -44,6 +44,7 @@
 
 __docformat__ = 'restructuredtext'
 
+from fipy.tools import numerix
 from fipy.variables.cellVariable import CellVariable
 
 __all__ = ["NoiseVariable"]
@@ -61,6 +62,47 @@ class NoiseVariable(CellVariable):
     The `seed()` and `get_seed()` functions of the
     `fipy.tools.numerix.random` module can be set and query the random
     number generated used by all `NoiseVariable` objects.
+
+    Each new distribution draws a single key from
+    `fipy.tools.numerix.random`. Every process then generates the values
+    of its own cells from a counter-based stream, indexed by the key and by
+    the global ID of the cell, so that the noise does not depend on how
+    the mesh is partitioned.
+
+        >>> from fipy import Grid1D, UniformNoiseVariable, serialComm
+        >>> from fipy.tools import numerix
+        >>> mesh = Grid1D(nx=10, communicator=serialComm)
+        >>> numerix.random.seed(13)
+        >>> noise = UniformNoiseVariable(mesh=mesh)
+        >>> values = numerix.array(noise)
+        >>> print ((values > 0) & (values < 1)).all()
+        True
+        >>> noise.scramble()
+        >>> print (numerix.array(noise) != values).all()
+        True
+
+    The value of a cell does not depend on which other cells are
+    generated
+
+        >>> numerix.random.seed(13)
+        >>> noise.scramble()
+        >>> print numerix.allequal(numerix.array(noise), values)
+        True
+        >>> print numerix.allequal(noise._uniform(stream=0, ids=numerix.array([7, 3])),
+        ...                        values[[7, 3]])
+        True
+
+    Subclasses implement `random()` to return the values of the cells
+    `self._ids`, the global IDs of the overlapping cells of the process.
+    A subclass that still overrides the deprecated `parallelRandom()` to
+    return the values of every cell on process 0 draws them there and
+    broadcasts them, as before
+
+        >>> class _LegacyNoiseVariable(NoiseVariable):
+        ...     def parallelRandom(self):
+        ...         return numerix.arange(self.mesh.globalNumberOfCells, dtype='d')
+        >>> print numerix.allequal(_LegacyNoiseVariable(mesh=mesh), numerix.arange(10))
+        True
     """
     def __init__(self, mesh, name = '', hasOld = 0):
         if self.__class__ is NoiseVariable:
@@ -85,23 +127,133 @@ class NoiseVariable(CellVariable):
         self._markStale()
 
     def random(self):
+        """
+        Return random values for the cells `self._ids`, using the
+        `_uniform()`, `_normal()` and `_standardGamma()` streams.
+
+        .. note:: `random()` used to return the values of every cell of
+           the mesh, and was only called on process 0.
+        """
         pass
 
     def parallelRandom(self):
+        """
+        Return the values of every cell of the mesh on process 0 and
+        `None` on the others.
+
+        .. deprecated:: Each process now generates the values of its own
+           cells with `random()`.
+        """
+        import warnings
+        warnings.warn("parallelRandom() is deprecated; random() now returns the values of the cells self._ids",
+                      DeprecationWarning, stacklevel=2)
+
+        values = self.globalValue
 
         if self.mesh.communicator.procID == 0:
-            return self.random()
+            return values
         else:
             return None
 
+    def _uniform(self, stream, ids=None):
+        r"""
+        Return values uniformly distributed on :math:`(0, 1)` for the cells
+        `ids`, by default `self._ids`, from the `stream`-th draw of the
+        current key.
+
+        Each value is the output of the SplitMix64 generator at a position
+        given by the global cell ID and the stream, so it can be computed
+        independently of any other value.
+        """
+        if ids is None:
+            ids = self._ids
+
+        uint64 = numerix.uint64
+        counter = (numerix.array(ids, dtype=uint64)
+                   + uint64(stream) * uint64(self.mesh.globalNumberOfCells)
+                   + uint64(1))
+        z = self._key + counter * uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> uint64(30))) * uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> uint64(27))) * uint64(0x94D049BB133111EB)
+        z = z ^ (z >> uint64(31))
+
+        return ((z >> uint64(11)) + 0.5) * 2.**-53
+
+    def _normal(self, stream, ids=None):
+        """
+        Return standard normal values for the cells `ids`, by default
+        `self._ids`, consuming streams `stream` and `stream + 1`.
+        """
+        u1 = self._uniform(stream, ids=ids)
+        u2 = self._uniform(stream + 1, ids=ids)
+        return numerix.sqrt(-2. * numerix.log(u1)) * numerix.cos(2. * numerix.pi * u2)
+
+    def _standardGamma(self, shape, stream, ids=None):
+        """
+        Return values from the gamma distribution with unit scale for the
+        cells `ids`, by default `self._ids`, by the rejection method of
+        Marsaglia and Tsang. Every round of rejection consumes 4 streams,
+        starting at `stream`.
+        """
+        if ids is None:
+            ids = self._ids
+        shape = numerix.zeros(ids.shape, 'd') + shape
+        value = numerix.zeros(ids.shape, 'd')
+
+        # shapes below 1 are boosted by 1 and then scaled back down
+        small = shape < 1.
+        a = numerix.where(small, shape + 1., shape)
+        d = a - 1. / 3.
+        c = 1. / numerix.sqrt(9. * d)
+
+        pending = numerix.nonzero(shape > 0)[0]
+        attempt = 0
+        while len(pending) > 0:
+            x = self._normal(stream + 4 * attempt, ids=ids[pending])
+            u = self._uniform(stream + 4 * attempt + 2, ids=ids[pending])
+            v = (1. + c[pending] * x)**3
+            positive = v > 0
+            v = numerix.where(positive, v, 1.)
+            accept = positive & (numerix.log(u) < 0.5 * x**2 + d[pending]
+                                 - d[pending] * v + d[pending] * numerix.log(v))
+            value[pending[accept]] = (d[pending] * v)[accept]
+            pending = pending[~accept]
+            attempt += 1
+
+        boost = self._uniform(stream + 3, ids=ids)**(1. / numerix.where(small, shape, 1.))
+
+        return numerix.where(small, value * boost, value)
+
     def _calcValue(self):
-        from fipy.tools import parallelComm
+        comm = self.mesh.communicator
 
-        rnd = self.parallelRandom()
+        if type(self).parallelRandom.im_func is not NoiseVariable.parallelRandom.im_func:
+            ## a subclass written for the former interface
+            rnd = self.parallelRandom()
 
-        if parallelComm.Nproc > 1:
-            rnd = parallelComm.bcast(rnd, root=0)
+            if comm.Nproc > 1:
+                rnd = comm.bcast(rnd, root=0)
 
-            return rnd[self.mesh._globalOverlappingCellIDs]
+                return rnd[self.mesh._globalOverlappingCellIDs]
+            else:
+                return rnd
+
+        if comm.procID == 0:
+            key = numerix.random.randint(0, 2**31, size=2)
         else:
-            return rnd
+            key = None
+
+        if comm.Nproc > 1:
+            key = comm.bcast(key, root=0)
+
+        self._key = (numerix.uint64(key[0]) << numerix.uint64(32)) | numerix.uint64(key[1])
+        self._ids = self.mesh._globalOverlappingCellIDs
+
+        return self.random()
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -92,6 +92,8 @@ def _OperatorVariableClass(baseClass=object):
                 from fipy.tools import inline
                 if inline.doInline:
                     return self._execInline(comment=self.comment)
+                elif inline.doFuse:
+                    return self._execFused()
                 else:
                     return self._calcValue_()
 
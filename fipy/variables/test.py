@@ -60,12 +60,14 @@ def _suite():
             'fipy.variables.cellVariable',
             'fipy.variables.faceVariable',
             'fipy.variables.operatorVariable',
+            'fipy.variables.noiseVariable',
             'fipy.variables.betaNoiseVariable',
             'fipy.variables.exponentialNoiseVariable',
             'fipy.variables.gammaNoiseVariable',
             'fipy.variables.gaussianNoiseVariable',
             'fipy.variables.uniformNoiseVariable',
             'fipy.variables.cellVolumeAverageVariable',
+            'fipy.variables.cellProbeVariable',
             'fipy.variables.modularVariable',
             'fipy.variables.binaryOperatorVariable',
             'fipy.variables.unaryOperatorVariable',
@@ -44,7 +44,6 @@
 
 __docformat__ = 'restructuredtext'
 
-from fipy.tools.numerix import random
 from fipy.variables.noiseVariable import NoiseVariable
 
 __all__ = ["UniformNoiseVariable"]
@@ -97,8 +96,7 @@ class UniformNoiseVariable(NoiseVariable):
         NoiseVariable.__init__(self, mesh = mesh, name = name, hasOld = hasOld)
 
     def random(self):
-        return random.uniform(self.minimum, self.maximum,
-                              size=[self.mesh.globalNumberOfCells])
+        return self.minimum + (self.maximum - self.minimum) * self._uniform(stream=0)
 
 def _test():
     import fipy.tests.doctestPlus
@@ -972,6 +972,36 @@ class Variable(object):
 
         return argDict['result']
 
+    def _execFused(self):
+        """
+        Evaluate the expression tree of this `Variable` in a single pass
+        with :mod:`numexpr`, without the temporary arrays of evaluating it
+        one operation at a time. Expressions that :mod:`numexpr` does not
+        understand are evaluated with NumPy, which is reported when
+        `FIPY_INLINE_COMMENT` is set. Any other failure propagates.
+        """
+        try:
+            shape = self.opShape
+        except AttributeError:
+            shape = self.shape
+
+        if shape == ():
+            # nothing to gain for scalars
+            return self._calcValue_()
+
+        from fipy.tools import inline
+        argDict = {}
+        string = self._getCstring(argDict=argDict, freshen=True)
+
+        try:
+            return inline._evaluateFused(string, argDict)
+        except (KeyError, TypeError, ValueError, NotImplementedError), e:
+            # numexpr cannot evaluate this expression
+            if inline._inlineFrameComment:
+                import warnings
+                warnings.warn("evaluating %s with NumPy: %s" % (string, e), stacklevel=2)
+            return self._calcValue_()
+
     def _broadcastShape(self, other):
         ignore, ignore, broadcastshape = numerix._broadcastShapes(self.shape, numerix.getShape(other))
 